@@ -14,7 +14,9 @@ if __name__ == '__main__':
     #     player1 = MiniMaxPlayer(target_depth = 5),
     #     player2 = MiniMaxPlayer(target_depth = 5),
     #     print_games = False,
-    #     measure_performance = True
+    #     measure_performance = True,
+    #     profiler = 'sampling',
+    #     profile_output = 'stacks.txt'
     # )
     #
     # simulator.start()
@@ -2,4 +2,6 @@ from .test_caching import *
 from .test_graph_minimax import *
 from .test_graph_state_evaluator import *
 from .test_legal_moves import *
-from .test_graph_game_evaluator import *
\ No newline at end of file
+from .test_graph_game_evaluator import *
+from .test_game_server import *
+from .test_headless_imports import *
\ No newline at end of file
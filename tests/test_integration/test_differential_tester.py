@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.helpers import StateChecker
+from utils.verification import DifferentialTester, BoardTableBackend, BACKENDS, check_games, create_backends, replay
+
+
+StateChecker = StateChecker()
+
+
+class MissingMoveBackend(BoardTableBackend):
+    """ A board table backend that loses the last space of the middle board once the top-left board is played. """
+
+    def observe(self, prev_small_idx, sign):
+        observations = super().observe(prev_small_idx, sign)
+        if self.codes[0]:
+            observations['legal_moves'] = [move for move in observations['legal_moves'] if move != (5, 9)]
+        return observations
+
+
+class FailingBackend(BoardTableBackend):
+    """ A board table backend that can't play in the corners of the middle board. """
+
+    def play(self, big_idx, small_idx, sign):
+        if big_idx == 5 and small_idx in (1, 3, 7, 9):
+            raise ValueError('corner')
+        super().play(big_idx, small_idx, sign)
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    """ Reset the checked boards and any helper mocked on the instance by other tests, and register the broken backends. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    monkeypatch.setattr(MissingMoveBackend, 'name', 'missing_move')
+    monkeypatch.setattr(FailingBackend, 'name', 'failing')
+    monkeypatch.setitem(BACKENDS, 'missing_move', MissingMoveBackend)
+    monkeypatch.setitem(BACKENDS, 'failing', FailingBackend)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestDifferentialTester:
+    """ Integration tests for checking engine backends against the reference implementation. """
+
+    def test_backends_match_reference(self):
+        """ Every backend in the tree agrees with the reference over a few hundred games. """
+        with ThreadPoolExecutor(max_workers = 2) as executor:
+            tester = DifferentialTester(backends = ('move_generator', 'board_table', 'position_codec', 'playout_batch'),
+                                        chunk_size = 20, seed = 5, executor = executor)
+            stats = tester.run(100)
+
+        assert stats['divergence'] is None
+        assert stats['games'] == 100 and stats['moves'] > 100 * 20
+
+    @pytest.mark.parametrize("backend, observation, moves, error_msg", (
+            ('missing_move', 'legal_moves', [(1, 5)], "A missing legal move should shrink to the move exposing it."),
+            ('failing', 'error', [(5, 1)], "An error should shrink to the move raising it."),
+    ))
+    def test_divergence_is_shrunk(self, backend, observation, moves, error_msg):
+        """ The first divergence stops the run and is shrunk to the shortest game showing it. """
+        stats = check_games((backend,), seeds = list(range(20)))
+        divergence = stats['divergence']
+
+        assert stats['games'] == 1, "Games should stop at the first divergence."
+        assert (divergence['backend'], divergence['observation']) == (backend, observation)
+        assert divergence['moves'] == moves, error_msg
+        assert replay(create_backends((backend,)), moves)[0]['observation'] == observation, \
+            "The shrunk moves should reproduce the divergence."
+
+    def test_run_stops_at_divergence(self):
+        """ A run reports the divergence instead of playing every game. """
+        with ThreadPoolExecutor(max_workers = 1) as executor:
+            stats = DifferentialTester(backends = ('missing_move',), chunk_size = 5, seed = 0,
+                                       executor = executor).run(1000)
+
+        assert stats['divergence']['moves'] == [(1, 5)]
+        assert stats['games'] < 1000
+
+    def test_replay_rejects_illegal_moves(self):
+        """ Moves that break the rules of the game are not replayed. """
+        assert replay(create_backends(('board_table',)), [(5, 5), (1, 1)]) == (None, False)
+        assert replay(create_backends(('board_table',)), [(5, 5), (5, 1)]) == (None, True)
+
+    def test_unknown_backend(self):
+        """ Unknown backend names raise a ValueError. """
+        with pytest.raises(ValueError):
+            DifferentialTester(backends = ('bitboard',))
@@ -0,0 +1,114 @@
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.analysis.game_analyzer import GameAnalyzer, analyse_game, replay_game
+from utils.helpers import StateChecker
+
+
+StateChecker = StateChecker()
+
+
+class TestReplayGame:
+    """ Integration tests for replaying stored moves through StateUpdater. """
+
+    def test_positions(self):
+        """ Every position of the game is yielded, with the sign to move alternating. """
+        positions = list(replay_game([(5, 5), (5, 1), (1, 5)]))
+
+        assert len(positions) == 4
+        assert [sign for _, _, sign, _ in positions] == ['X', 'O', 'X', 'O']
+        assert [prev_small_idx for _, prev_small_idx, _, _ in positions] == [None, 5, 1, 5]
+        assert positions[-1][0][5]['X'] == (5,)
+
+    @pytest.mark.parametrize("moves, error_msg", (
+            ([(5, 5), (4, 1)], "A move outside the board sent to should be illegal."),
+            ([(5, 5), (5, 5)], "A move on an occupied square should be illegal."),
+    ))
+    def test_illegal_move(self, moves, error_msg):
+        """ Replaying an illegal move raises a ValueError. """
+        with pytest.raises(ValueError):
+            list(replay_game(moves))
+
+
+class TestAnalyseGame:
+    """ Integration tests for annotating a single game. """
+
+    def test_annotations(self):
+        """ Every move is annotated, consecutive evaluations line up and the best lines come first. """
+        game = analyse_game({'id': 7, 'moves': [[5, 5], [5, 1], [1, 5], [5, 9]]}, depth = 2, num_lines = 2)
+
+        assert game['id'] == 7
+        assert game['winner'] is None
+        assert [move['ply'] for move in game['moves']] == [1, 2, 3, 4]
+
+        for move, next_move in zip(game['moves'], game['moves'][1:]):
+            assert move['eval_after'] == next_move['eval_before']
+
+        for move in game['moves']:
+            assert len(move['lines']) == 2
+            assert move['best_move'] == move['lines'][0]['move']
+            assert move['eval_before'] == move['lines'][0]['score']
+            assert move['blunder'] == (move['loss'] >= 50)
+
+    @staticmethod
+    def play_random_game(seed: int) -> list[tuple[int, int]]:
+        """ Play random legal moves until the game is over. """
+        rng = random.Random(seed)
+        moves = []
+        while True:
+            *_, (state, prev_small_idx, _, player) = replay_game(moves)
+            if StateChecker.check_win(state, 0):
+                return moves
+            moves.append(rng.choice(player.get_current_legal_moves(prev_small_idx)))
+
+    def test_finished_game(self):
+        """ The last move gets the evaluation of the finished state. """
+        moves = self.play_random_game(3)
+        *_, (state, _, _, _) = replay_game(moves)
+
+        game = analyse_game({'moves': moves}, depth = 1, num_lines = 1)
+
+        assert len(game['moves']) == len(moves)
+        assert game['winner'] == StateChecker.check_win(state, 0)
+        assert game['moves'][-1]['eval_after'] == {'X': 1000, 'O': -1000, 'T': 0}[game['winner']]
+
+
+    def test_invalid_record(self):
+        """ A game with an illegal move is reported instead of annotated. """
+        game = analyse_game({'id': 'bad', 'moves': [[5, 5], [1, 1]]}, depth = 1)
+
+        assert game == {'id': 'bad', 'error': 'move 2 (1, 1) is illegal'}
+
+    def test_moves_after_finished_game(self):
+        """ A game with moves made after it is over is reported instead of silently cut short. """
+        moves = self.play_random_game(3)
+
+        game = analyse_game({'id': 'corrupt', 'moves': moves + [(1, 1), (1, 1)]}, depth = 1, num_lines = 1)
+
+        assert game == {'id': 'corrupt', 'error': f'move {len(moves) + 1} is made after the game is over'}
+
+
+class TestGameAnalyzer:
+    """ Integration tests for annotating stored games in bulk. """
+
+    def test_analyse_file(self, tmp_path):
+        """ Every game is written back annotated, in order, with the totals counted. """
+        records = [{'id': i, 'moves': [[5, 5], [5, i], [i, 5]]} for i in range(1, 10) if i != 5]
+        records.append({'id': 'bad', 'moves': [[5, 5], [1, 1]]})
+
+        input_path, output_path = tmp_path / 'games.jsonl', tmp_path / 'annotated.jsonl'
+        input_path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+
+        with ThreadPoolExecutor(max_workers = 1) as executor:
+            analyzer = GameAnalyzer(depth = 2, num_lines = 2, max_workers = 2, chunk_size = 3, executor = executor)
+            stats = analyzer.analyse_file(str(input_path), str(output_path))
+
+        games = [json.loads(line) for line in output_path.read_text().splitlines()]
+
+        assert [game['id'] for game in games] == [record['id'] for record in records]
+        assert stats['games'] == 9
+        assert stats['failed'] == 1
+        assert stats['positions'] == 24
@@ -0,0 +1,104 @@
+import pytest
+
+from utils.game import Game
+from utils.helpers import EngineContext, StateChecker
+from utils.players import MiniMaxPlayer, RandomPlayer
+from utils.players import minimax_player
+
+
+StateChecker = StateChecker()
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestGameHistory:
+    """ Integration tests for undoing, redoing and reviewing the moves of a game. """
+
+    @pytest.fixture
+    def game(self):
+        """ A finished game between two random players. """
+
+        game = Game(RandomPlayer(), RandomPlayer(), printing = False, wait_after_move = None)
+        game.play()
+
+        return game
+
+    def test_history_matches_play(self, game):
+        """ Every position of the game is kept, ending at the final one. """
+        assert game.history.ply == len(game.history.get_moves())
+        assert game.history.current() == (game.state, game.prev_small_idx, game.prev_move_made)
+        assert StateChecker.check_win(game.state, 0)
+
+    @pytest.mark.parametrize("ply, error_msg", (
+        (0, "The starting position should have every move legal."),
+        (7, "An early position should have the legal moves of that position."),
+        (-2, "A late position should have the legal moves of that position."),
+    ))
+    def test_go_to_ply_restores_legal_moves(self, game, ply, error_msg):
+        """ Going to a ply gives the same legal moves as playing up to it. """
+        moves = game.history.get_moves()
+        ply = ply % len(moves)
+        game.go_to_ply(ply)
+
+        context = EngineContext()
+        for big_idx, small_idx in moves[:ply]:
+            context.update_legal_moves(big_idx, small_idx, board_is_complete = False)
+
+        assert game.prev_move_made == (moves[ply - 1] if ply else None)
+        for big_idx in range(1, 10):
+            if game.state[0]['display'][big_idx] == '-':
+                assert game.context.legal_moves[big_idx] == context.legal_moves[big_idx], error_msg
+            else:
+                assert game.context.legal_moves[big_idx] == [], error_msg
+
+    def test_undo_then_continue(self, game):
+        """ Taking back moves and playing on finishes the game from the earlier position. """
+        moves = game.history.get_moves()
+        game.undo()
+        game.undo()
+        game.redo()
+
+        assert game.prev_move_made == moves[-2]
+        assert game.history.can_redo()
+
+        game.go_to_ply(10)
+        game.play()
+
+        assert game.history.get_moves()[:10] == moves[:10]
+        assert StateChecker.check_win(game.state, 0)
+
+    def test_undo_restores_dynamic_depth(self, monkeypatch):
+        """ Taking back moves gives a dynamic search the depth it had at that position. """
+        # Deepen the search from X's third move on, starting shallow and without premoves, to keep the game quick.
+        monkeypatch.setattr(minimax_player, 'THRESHOLD', 0)
+        monkeypatch.setattr(minimax_player, 'STEP', 2)
+        minimax = MiniMaxPlayer(target_depth = 'dynamic')
+        minimax.target_depth = 1
+        monkeypatch.setattr(minimax, 'get_premove', lambda *args: None)
+        game = Game(minimax, RandomPlayer(), printing = False, wait_after_move = None)
+
+        for _ in range(3):
+            game.make_move('X', game.player1)
+            game.make_move('O', game.player2)
+
+        assert (minimax.moves_made, minimax.target_depth) == (2, 2)
+
+        game.go_to_ply(2)
+        assert (minimax.moves_made, minimax.target_depth, minimax.counter) == (0, 1, 0), \
+            "Going back should restore the depth the player searched at that position."
+
+        game.make_move('X', game.player1)
+        assert (minimax.moves_made, minimax.target_depth) == (1, 1), \
+            "Playing on after going back should search at the depth of that position."
+
+        game.undo()
+        game.redo()
+        assert (minimax.moves_made, minimax.target_depth) == (1, 1)
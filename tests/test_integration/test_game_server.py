@@ -0,0 +1,166 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.server.game_server import GameServer, GameClient
+
+
+class TestGameServerClientIntegration:
+    """
+    Integration tests for GameServer sessions driven by GameClient over TCP.
+
+    BCC criteria:
+    A: client sign
+        1 - X (client opens), 2 - O (AI opens)
+    B: requested move
+        1 - legal, 2 - illegal, 3 - unknown session
+
+    Base choice (happy path): A1 B1
+    """
+
+    @staticmethod
+    def run_with_server(scenario):
+        """ Start a server on a free port, run the scenario against it and shut it down. """
+
+        async def runner():
+            server = GameServer(port = 0, max_workers = 2, executor = ThreadPoolExecutor(max_workers = 2),
+                                batch_window = 0.05)
+            await server.start()
+
+            client = GameClient(port = server.port)
+            await client.connect()
+
+            try:
+                return await scenario(server, client)
+            finally:
+                await client.close()
+                await server.close()
+                server.executor.shutdown()
+
+        return asyncio.run(runner())
+
+
+    # A1 B1 - Base choice (happy path)
+    def test_base_choice_client_x_legal_move(self):
+        async def scenario(server, client):
+            session = await client.request('new', player = 'minimax', depth = 2, sign = 'X')
+            reply = await client.request('move', session = session['session'], move = [5, 1])
+            return session, reply, await client.request('stats')
+
+        session, reply, stats = self.run_with_server(scenario)
+
+        assert session['ok'] and session['moves'] == 0, "Client playing X should open the game."
+        assert reply['ok'], "Legal move should be accepted."
+        assert reply['ai_move'][0] == 1, "AI should answer on the board it was sent to."
+        assert reply['moves'] == 2 and reply['turn'] == 'X', "Client move and AI reply should both be applied."
+        assert stats['moves'] == 1 and stats['latency_ms']['max'] >= 0, "AI move latency should be recorded."
+
+
+    # A2 B1
+    def test_vary_a_client_o_ai_opens(self):
+        async def scenario(server, client):
+            return await client.request('new', player = 'random', sign = 'O')
+
+        session = self.run_with_server(scenario)
+
+        assert session['ok'] and session['moves'] == 1, "AI playing X should open the game."
+        assert session['turn'] == 'O', "Client should be next to move."
+
+
+    # A1 B2
+    def test_vary_b_illegal_move_is_rejected(self):
+        async def scenario(server, client):
+            session = await client.request('new', player = 'random', sign = 'X')
+            first = await client.request('move', session = session['session'], move = [5, 1])
+
+            legal_moves = {tuple(move) for move in first['legal_moves']}
+            illegal_move = next([big_idx, small_idx] for big_idx in range(1, 10) for small_idx in range(1, 10)
+                                if (big_idx, small_idx) not in legal_moves)
+
+            reply = await client.request('move', session = session['session'], move = illegal_move)
+            return reply, await client.request('state', session = session['session'])
+
+        reply, state = self.run_with_server(scenario)
+
+        assert not reply['ok'] and 'illegal' in reply['error'], "Move outside the legal moves should be rejected."
+        assert state['moves'] == 2, "Rejected move should not change the session."
+
+
+    @pytest.mark.parametrize("depth", ('abc', -1, 0, 99, 2.5, True, None))
+    def test_vary_b_unsupported_depth_is_rejected(self, depth):
+        async def scenario(server, client):
+            return await client.request('new', player = 'minimax', depth = depth, sign = 'O'), server.sessions
+
+        reply, sessions = self.run_with_server(scenario)
+
+        assert not reply['ok'] and 'depth' in reply['error'], "Unsupported depth should be reported."
+        assert not sessions, "No session should be started with an unsupported depth."
+
+
+    def test_vary_b_failed_ai_move_is_taken_back(self):
+        async def scenario(server, client):
+            session = await client.request('new', player = 'minimax', depth = 2, sign = 'X')
+
+            async def failing_search(*args):
+                raise TypeError('search failed')
+
+            server.batcher.submit = failing_search
+            reply = await client.request('move', session = session['session'], move = [5, 1])
+            state = await client.request('state', session = session['session'])
+            return reply, state, server.sessions[session['session']]
+
+        reply, state, server_session = self.run_with_server(scenario)
+
+        assert not reply['ok'] and reply['error'] == 'search failed', "Failed AI move should be reported."
+        assert state['moves'] == 0 and state['turn'] == 'X', "Client move should be taken back with the AI's."
+        assert server_session.context.legal_moves[5] == list(range(1, 10)), "Legal moves should be restored."
+
+
+    # A1 B3
+    def test_vary_b_unknown_session(self):
+        async def scenario(server, client):
+            return await client.request('move', session = 42, move = [5, 5])
+
+        reply = self.run_with_server(scenario)
+
+        assert not reply['ok'] and 'unknown session' in reply['error'], "Unknown session should be reported."
+
+
+    def test_concurrent_sessions(self):
+        async def scenario(server, client):
+            clients = [GameClient(port = server.port) for _ in range(20)]
+            await asyncio.gather(*(c.connect() for c in clients))
+
+            sessions = await asyncio.gather(*(c.request('new', player = 'random', sign = 'X') for c in clients))
+            replies = await asyncio.gather(*(
+                c.request('move', session = s['session'], move = [5, 5]) for c, s in zip(clients, sessions)
+            ))
+
+            await asyncio.gather(*(c.close() for c in clients))
+            return sessions, replies
+
+        sessions, replies = self.run_with_server(scenario)
+
+        assert len({s['session'] for s in sessions}) == 20, "Every client should get its own session."
+        assert all(r['ok'] and r['moves'] == 2 for r in replies), "Every session should be played independently."
+
+
+    def test_concurrent_moves_are_batched(self):
+        async def scenario(server, client):
+            clients = [GameClient(port = server.port) for _ in range(8)]
+            await asyncio.gather(*(c.connect() for c in clients))
+
+            sessions = await asyncio.gather(*(c.request('new', player = 'minimax', depth = 2) for c in clients))
+            replies = await asyncio.gather(*(
+                c.request('move', session = s['session'], move = [5, 5]) for c, s in zip(clients, sessions)
+            ))
+
+            await asyncio.gather(*(c.close() for c in clients))
+            return replies, await client.request('stats')
+
+        replies, stats = self.run_with_server(scenario)
+
+        assert all(r['ok'] and r['ai_move'][0] == 5 for r in replies), "Batched moves should reach their sessions."
+        assert stats['moves'] == 8, "Every batched move should be counted."
+        assert stats['average_batch_size'] > 1, "Moves requested together should share a batch."
@@ -1,6 +1,7 @@
 import pytest
 
 from tests.state_generator import StateGenerator
+from utils.helpers import MoveGenerator, StateUpdater, MOVES
 from utils.helpers.game_evaluator import GameEvaluator
 from utils.players import RandomPlayer
 from utils.players.minimax_player import MiniMaxPlayer
@@ -370,4 +371,187 @@ class TestGameEvaluatorGetBestMovePrimePaths:
 
         assert result is not None
         assert isinstance(result, tuple)
-        assert len(result) == 2
\ No newline at end of file
+        assert len(result) == 2
+
+class TestGameEvaluatorStreamEvaluation:
+    """ Integration tests for the iterative deepening of GameEvaluator.stream_evaluation. """
+
+    @pytest.fixture(autouse=True)
+    def setup_evaluator(self):
+        """ Reset GameEvaluator singleton and Player legal moves before each test. """
+        GameEvaluator._instance = None
+        Player.reset_legal_moves()
+        yield
+        Player.reset_legal_moves()
+
+    def test_publishes_every_depth(self):
+        """ Each depth is published once, in order, ending with the same score as game_evaluation. """
+        algorithm = MiniMaxPlayer(target_depth=3)
+        evaluator = GameEvaluator(algorithm=algorithm, shared=False)
+        evaluator.is_first_move = False
+
+        player = MiniMaxPlayer(target_depth=3)
+        player.sign = 'O'
+
+        state = StateGenerator.generate(_0='---------', _1='X--------', _5='----X--O-')
+        Player.legal_moves[1] = [2, 3, 4, 5, 6, 7, 8, 9]
+
+        published = []
+        result = evaluator.stream_evaluation(state, 1, player, lambda depth, score: published.append((depth, score)))
+
+        assert [depth for depth, _ in published] == [1, 2, 3]
+        assert result == published[-1][1]
+        assert result == evaluator.game_evaluation(state, 1, player)
+
+    def test_cancelled_search_stops_publishing(self):
+        """ A cancelled search publishes nothing for the depth it was interrupted at. """
+        algorithm = MiniMaxPlayer(target_depth=3)
+        evaluator = GameEvaluator(algorithm=algorithm, shared=False)
+        evaluator.is_first_move = False
+
+        player = MiniMaxPlayer(target_depth=3)
+        player.sign = 'X'
+
+        state = StateGenerator.generate(_0='---------')
+
+        published = []
+
+        def publish(depth: int, score: float):
+            published.append(depth)
+            algorithm.cancel_search()
+
+        result = evaluator.stream_evaluation(state, None, player, publish)
+
+        assert result is None
+        assert published == [1]
+
+
+class TestGameEvaluatorAnalyse:
+    """ Integration tests for the single search of GameEvaluator.analyse. """
+
+    @pytest.fixture(autouse=True)
+    def setup_evaluator(self):
+        """ Reset GameEvaluator singleton and Player legal moves before each test. """
+        GameEvaluator._instance = None
+        Player.reset_legal_moves()
+        yield
+        Player.reset_legal_moves()
+
+    def test_evaluation_matches_best_move(self):
+        """ The evaluation is the score of the best move, and the top moves are sorted best first. """
+        algorithm = MiniMaxPlayer(target_depth=2)
+        evaluator = GameEvaluator(algorithm=algorithm, shared=False)
+
+        player = MiniMaxPlayer(target_depth=2)
+        player.sign = 'O'
+
+        state = StateGenerator.generate(_0='---------', _1='X--------', _5='----X--O-')
+        Player.legal_moves[1] = [2, 3, 4, 5, 6, 7, 8, 9]
+
+        analysis = evaluator.analyse(state, 1, player, top_n=3)
+        scores = [score for _, score in analysis['top_moves']]
+
+        assert len(analysis['top_moves']) == 3
+        assert scores == sorted(scores)
+        assert analysis['top_moves'][0] == (analysis['best_move'], analysis['evaluation'])
+        assert evaluator.get_best_move(state, 1, player) == analysis['best_move']
+
+    def test_cached_by_position(self):
+        """ Repeated requests for the same position reuse the finished analysis. """
+        algorithm = MiniMaxPlayer(target_depth=2)
+        evaluator = GameEvaluator(algorithm=algorithm, shared=False)
+        evaluator.is_first_move = False
+
+        player = MiniMaxPlayer(target_depth=2)
+        player.sign = 'X'
+
+        state = StateGenerator.generate(_0='---------', _5='X---O----')
+
+        score = evaluator.game_evaluation(state, 5, player)
+        algorithm.minimax_ab = None
+
+        assert len(evaluator.analyses) == 1
+        assert evaluator.game_evaluation(state, 5, player) == score
+        assert evaluator.get_best_move(state, 5, player) is not None
+
+    def test_algorithm_left_unchanged(self):
+        """ Analysing doesn't move the algorithm's depth or move counter. """
+        algorithm = MiniMaxPlayer(target_depth='dynamic')
+        evaluator = GameEvaluator(algorithm=algorithm, shared=False)
+
+        player = MiniMaxPlayer(target_depth=2)
+        player.sign = 'X'
+
+        state = StateGenerator.generate(_0='---------', _5='X---O----')
+
+        evaluator.analyse(state, 5, player, depth=1)
+
+        assert algorithm.target_depth == 5
+        assert algorithm.moves_made == -1
+        assert algorithm.transposition_table is None
+
+
+class TestGameEvaluatorAnalyseLines:
+    """ Integration tests for the multi-PV search of GameEvaluator.analyse_lines. """
+
+    @pytest.fixture(autouse=True)
+    def setup_evaluator(self):
+        """ Reset GameEvaluator singleton and Player legal moves before each test. """
+        GameEvaluator._instance = None
+        Player.reset_legal_moves()
+        yield
+        Player.reset_legal_moves()
+
+    @pytest.mark.parametrize("target_depth", (2, 3, 4))
+    def test_lines_match_full_analysis(self, target_depth):
+        """ The best lines have the same moves and scores as scoring every move with a full window. """
+        player = MiniMaxPlayer(target_depth=target_depth)
+        player.sign = 'O'
+
+        state = StateGenerator.generate(_0='---------', _1='X--------', _5='----X--O-')
+        Player.legal_moves[1] = [2, 3, 4, 5, 6, 7, 8, 9]
+
+        expected = GameEvaluator(algorithm=MiniMaxPlayer(target_depth=target_depth), shared=False)
+        expected = expected.analyse(state, 1, player, top_n=3)
+
+        evaluator = GameEvaluator(algorithm=MiniMaxPlayer(target_depth=target_depth), shared=False)
+        analysis = evaluator.analyse_lines(state, 1, player, num_lines=3)
+
+        assert [(line['move'], line['score']) for line in analysis['lines']] == expected['top_moves']
+        assert analysis['evaluation'] == expected['evaluation']
+
+    def test_principal_variations(self):
+        """ Every principal variation starts with its line's move and is a sequence of legal moves. """
+        player = MiniMaxPlayer(target_depth=4)
+        player.sign = 'X'
+
+        state = StateGenerator.generate(_0='---------', _5='X---O----')
+
+        evaluator = GameEvaluator(algorithm=MiniMaxPlayer(target_depth=4), shared=False)
+        analysis = evaluator.analyse_lines(state, 5, player, num_lines=2)
+
+        for line in analysis['lines']:
+            assert line['pv'][0] == line['move']
+            assert len(line['pv']) == 4
+
+            prev_small_idx, sign, curr_state = 5, 'X', state
+            for big_idx, small_idx in line['pv']:
+                assert (big_idx, small_idx) in [MOVES[move] for move in
+                                                MoveGenerator.get_legal_moves(curr_state, prev_small_idx)]
+                curr_state, _ = StateUpdater.update_state(curr_state, big_idx, small_idx, sign)
+                prev_small_idx, sign = small_idx, 'O' if sign == 'X' else 'X'
+
+    def test_no_legal_moves(self):
+        """ A finished game has no lines. """
+        evaluator = GameEvaluator(algorithm=MiniMaxPlayer(target_depth=2), shared=False)
+
+        player = MiniMaxPlayer(target_depth=2)
+        player.sign = 'X'
+
+        state = StateGenerator.generate(_0='---------')
+        Player.legal_moves[5] = []
+
+        analysis = evaluator.analyse_lines(state, 5, player)
+
+        assert analysis['lines'] == []
+        assert analysis['best_move'] is None
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+import pytest
+
+
+class TestHeadlessImports:
+    """ Integration tests making sure the engine side of the project never imports pygame, and the engine itself not NumPy. """
+
+    @pytest.mark.parametrize("statement, error_msg", (
+            ("from utils.game import Game", "Importing the console game should not import pygame."),
+            ("from utils.simulator import Simulator", "Importing the simulator should not import pygame."),
+            ("from utils.server import GameServer", "Importing the game server should not import pygame."),
+            ("from utils.analysis import GameAnalyzer", "Importing the game analyzer should not import pygame."),
+            ("from utils.self_play import SelfPlayGenerator", "Importing self-play should not import pygame."),
+            ("from utils.verification import DifferentialTester", "Importing the backend checks should not import pygame."),
+    ))
+    def test_import_without_pygame(self, statement, error_msg):
+        """ Tests whether the given import leaves pygame unloaded, in a fresh interpreter. """
+
+        result = subprocess.run(
+            [sys.executable, '-c', f"{statement}; import sys; print('pygame' in sys.modules)"],
+            capture_output = True, text = True, timeout = 60
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == 'False', error_msg
+
+
+    @pytest.mark.parametrize("statement, error_msg", (
+            ("from utils.game import Game", "Importing the console game should not import NumPy."),
+            ("from utils.helpers import EvaluatorRegistry", "Importing the engine helpers should not import NumPy."),
+            ("from utils.simulator import Simulator", "Importing the simulator should not import NumPy."),
+    ))
+    def test_import_without_numpy(self, statement, error_msg):
+        """ Tests whether the given import leaves NumPy unloaded, in a fresh interpreter. """
+
+        result = subprocess.run(
+            [sys.executable, '-c', f"{statement}; import sys; print('numpy' in sys.modules)"],
+            capture_output = True, text = True, timeout = 60
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == 'False', error_msg
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from utils.game import Game
+from utils.helpers import StateChecker
+from utils.players import RandomPlayer
+from utils.simulator import LatencyHistogram, MoveLatencies
+
+
+StateChecker = StateChecker()
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestLatencyHistogram:
+    """ Tests for counting latencies in fixed buckets. """
+
+    @pytest.fixture(scope = 'class')
+    @classmethod
+    def latencies(cls):
+        """ Latencies spread over several orders of magnitude. """
+        return np.random.default_rng(0).lognormal(mean = -5, sigma = 1.5, size = 20000)
+
+    @pytest.mark.parametrize("percentile, error_msg", (
+            (50, "The median should be within the bucket precision."),
+            (99, "The 99th percentile should be within the bucket precision."),
+            (99.9, "The 99.9th percentile should be within the bucket precision."),
+    ))
+    def test_percentiles(self, latencies, percentile, error_msg):
+        """ Percentiles are within the relative width of a bucket of the exact ones. """
+        histogram = LatencyHistogram()
+        size = len(histogram.counts)
+        for latency in latencies:
+            histogram.record(latency)
+
+        exact = np.percentile(latencies, percentile, method = 'inverted_cdf')
+        assert histogram.get_percentile(percentile) == pytest.approx(exact, rel = 0.05), error_msg
+        assert len(histogram.counts) == size, "Recording should not grow the histogram."
+
+    def test_merge(self, latencies):
+        """ Merging histograms gives the same counts as recording everything in one. """
+        whole, parts = LatencyHistogram(), [LatencyHistogram(), LatencyHistogram()]
+        for idx, latency in enumerate(latencies):
+            whole.record(latency)
+            parts[idx % 2].record(latency)
+        parts[0].merge(parts[1])
+
+        assert parts[0].counts == whole.counts
+        assert parts[0].get_summary() == pytest.approx(whole.get_summary())
+
+        with pytest.raises(ValueError):
+            whole.merge(LatencyHistogram(growth = 1.1))
+
+    def test_extremes_and_threshold(self):
+        """ Latencies outside the bucket range are still counted, and counted above thresholds. """
+        histogram = LatencyHistogram()
+        for latency in (0, 1e-9, 0.05, 0.2, 5000):
+            histogram.record(latency)
+
+        assert histogram.count == 5 and histogram.max == 5000
+        assert histogram.get_percentile(100) == 5000 and histogram.get_percentile(0) <= 1e-6
+        assert histogram.count_above(0.1) == 2
+        assert LatencyHistogram().get_summary()['p99'] is None
+
+
+class TestMoveLatencies:
+    """ Tests for collecting thinking times per player, move number and kind of move. """
+
+    def test_record_game(self):
+        """ Every thinking time of a game is counted for its player, once per category. """
+        game = Game(RandomPlayer(), RandomPlayer(), printing = False, wait_after_move = None,
+                    measure_thinking_time = True)
+        game.play()
+        game.player1_thinking_times = [0.2] + [0.001] * (len(game.player1_thinking_times) - 1)
+
+        latencies = MoveLatencies(budget = 0.1, move_group_size = 10)
+        latencies.record_game(game)
+
+        moves_x = len(game.player1_thinking_times)
+        assert latencies.get_histogram('X', 'all').count == moves_x
+        assert latencies.get_histogram('X', 'free').count + latencies.get_histogram('X', 'constrained').count == moves_x
+        assert latencies.get_histogram('X', 'moves 01-10').count == 5
+        assert latencies.get_histogram('X', 'free').max == 0.2, "The first move should be a free move."
+        assert latencies.over_budget == {'X': 1, 'O': 0}
+
+        other = MoveLatencies(budget = 0.1)
+        other.record('O', 12, False, 0.5)
+        latencies.merge(other)
+        assert latencies.over_budget == {'X': 1, 'O': 1}
+        assert latencies.get_histogram('O', 'moves 11-20').max == 0.5
+        assert '* X all' in latencies.format_report()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.server.move_batcher import MoveBatcher
+from utils.players import RandomPlayer, MiniMaxPlayer
+
+
+class SlowPlayer:
+    """ A player searching deeper than CHEAP_DEPTH, whose moves take a fixed time. """
+
+    target_depth = 6
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def make_move(self, state, prev_small_idx):
+        time.sleep(self.seconds)
+        return 5, 5
+
+
+class TestMoveBatcher:
+    """ Integration tests for dispatching batched move requests to an executor. """
+
+    @staticmethod
+    def run_batch(players: list, executor: ThreadPoolExecutor, workers: int = 2) -> tuple[list, list, list]:
+        """ Submit a move for every player at once, returning the results, finish times and tasks' request counts. """
+
+        state = tuple(
+            {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+        )
+        task_sizes = []
+
+        async def runner():
+            loop = asyncio.get_running_loop()
+            original_run_in_executor = loop.run_in_executor
+
+            def run_in_executor(executor, function, requests):
+                task_sizes.append(len(requests))
+                return original_run_in_executor(executor, function, requests)
+
+            loop.run_in_executor = run_in_executor
+            batcher = MoveBatcher(executor, workers = workers, batch_window = 0.05)
+            start_time = time.perf_counter()
+
+            async def timed_submit(player):
+                result = await batcher.submit(player, state, None)
+                return result, time.perf_counter() - start_time
+
+            return await asyncio.gather(*(timed_submit(player) for player in players))
+
+        results = asyncio.run(runner())
+        return [result for result, _ in results], [finished for _, finished in results], task_sizes
+
+
+    def test_deep_searches_get_their_own_tasks(self):
+        """ Every deep search is a task of its own, while quick moves are split into a chunk per worker. """
+
+        players = [MiniMaxPlayer(target_depth = 3) for _ in range(3)] + [RandomPlayer() for _ in range(6)]
+        for player in players:
+            player.set_sign('X')
+
+        with ThreadPoolExecutor(max_workers = 2) as executor:
+            results, _, task_sizes = self.run_batch(players, executor)
+
+        assert sorted(task_sizes) == [1, 1, 1, 3, 3], "Deep searches should not share a task."
+        assert all(move is not None and player is not None for move, player in results)
+
+
+    def test_slow_search_only_delays_itself(self):
+        """ Quick moves batched with a slow search are answered without waiting for it. """
+
+        players = [SlowPlayer(1.0)] + [RandomPlayer() for _ in range(3)]
+        for player in players[1:]:
+            player.set_sign('X')
+
+        with ThreadPoolExecutor(max_workers = 2) as executor:
+            _, finished, _ = self.run_batch(players, executor, workers = 1)
+
+        assert finished[0] >= 1.0
+        assert max(finished[1:]) < 0.5, "Quick moves should not wait for the slow search."
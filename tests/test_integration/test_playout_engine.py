@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from utils.simulator.playout_engine import PlayoutBatch, estimate_win_probabilities
+from utils.helpers import StateChecker, StateUpdater, MoveGenerator, MOVES
+
+
+StateChecker = StateChecker()
+
+EMPTY_STATE = tuple(
+    {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+)
+RESULTS = {'X': 1, 'O': 2, 'T': 3}
+
+
+def play_moves(moves: list[tuple[int, int]]) -> tuple[tuple[dict, ...], int | None, str]:
+    """ Play the given moves from the empty state, returning the state, previous small index and sign to move. """
+    state, prev_small_idx, sign = EMPTY_STATE, None, 'X'
+    for big_idx, small_idx in moves:
+        state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+        prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+        sign = 'O' if sign == 'X' else 'X'
+
+    return state, prev_small_idx, sign
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestPlayoutBatch:
+    """ Integration tests for playing out many random games at once. """
+
+    def test_matches_state_updater(self):
+        """ Every batched move is legal and the batch agrees with StateUpdater and StateChecker throughout. """
+        batch = PlayoutBatch.empty(24, seed = 5)
+        games = [[EMPTY_STATE, None, 'X'] for _ in range(24)]
+
+        while True:
+            legal = batch.get_legal_masks()
+            before = batch.cells.copy()
+
+            if not batch.step():
+                break
+
+            for n, game in enumerate(games):
+                state, prev_small_idx, sign = game
+                if StateChecker.check_win(state, 0):
+                    assert (batch.cells[n] == before[n]).all()
+                    continue
+
+                expected = MoveGenerator.get_legal_moves(state, prev_small_idx)
+                assert sorted(np.flatnonzero(legal[n]).tolist()) == sorted(expected)
+
+                move = int(np.flatnonzero(batch.cells[n] != before[n])[0])
+                big_idx, small_idx = MOVES[move]
+                state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+                prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+                game[:] = state, prev_small_idx, 'O' if sign == 'X' else 'X'
+
+                winner = StateChecker.check_win(state, 0)
+                assert batch.winners[n] == (RESULTS[winner] if winner else 0)
+
+        assert (batch.winners != 0).all()
+
+    def test_from_state(self):
+        """ Games continue from the given position, sent to the right board. """
+        state, prev_small_idx, sign = play_moves([(5, 5), (5, 1), (1, 5)])
+        batch = PlayoutBatch.from_state(state, prev_small_idx, sign, 8, seed = 1)
+
+        assert (batch.turns == 2).all()
+        assert (batch.targets == 4).all()
+        assert (batch.get_legal_masks() == [[move // 9 == 4 and move not in (36, 40) for move in range(81)]] * 8).all()
+
+        batch.step()
+        assert (batch.cells.reshape(-1, 9, 9)[:, 4] == 2).sum() == 8 * 2
+
+    @pytest.mark.parametrize("seed, error_msg", (
+            (0, "Playouts with the same seed should have the same results."),
+            (1, "Playouts with the same seed should have the same results."),
+    ))
+    def test_seeded(self, seed, error_msg):
+        """ Playouts are reproducible by seed. """
+        first, second = PlayoutBatch.empty(50, seed).play_out(), PlayoutBatch.empty(50, seed).play_out()
+        assert (first == second).all(), error_msg
+
+
+class TestEstimateWinProbabilities:
+    """ Integration tests for estimating results from random playouts. """
+
+    def test_probabilities(self):
+        """ The shares of each result add up to one. """
+        probabilities = estimate_win_probabilities(EMPTY_STATE, None, 'X', num_playouts = 500, seed = 2)
+
+        assert set(probabilities) == {'X', 'O', 'T'}
+        assert sum(probabilities.values()) == pytest.approx(1)
+
+    def test_finished_game(self):
+        """ A finished game has its actual result. """
+        rng = np.random.default_rng(4)
+        state, prev_small_idx, sign = EMPTY_STATE, None, 'X'
+        moves = []
+
+        while not StateChecker.check_win(state, 0):
+            moves.append(MOVES[rng.choice(MoveGenerator.get_legal_moves(state, prev_small_idx))])
+            state, prev_small_idx, sign = play_moves(moves)
+
+        winner = StateChecker.check_win(state, 0)
+        probabilities = estimate_win_probabilities(state, prev_small_idx, sign, num_playouts = 10)
+
+        assert probabilities == {result: float(result == winner) for result in ('X', 'O', 'T')}
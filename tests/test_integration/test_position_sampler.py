@@ -0,0 +1,68 @@
+import pytest
+
+from utils.simulator.position_sampler import PositionSampler
+from utils.simulator.playout_engine import PlayoutBatch
+from utils.helpers import StateChecker, MoveGenerator, PositionCodec
+
+
+StateChecker = StateChecker()
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestPositionSampler:
+    """ Integration tests for sampling reachable positions. """
+
+    def test_positions_are_stratified_and_ongoing(self):
+        """ Every ply gets the positions asked for, each with that many moves made and the right sign to move. """
+        positions = PositionSampler(seed = 0).sample([0, 1, 15, 40, 65], per_ply = 20)
+
+        for ply, ply_positions in positions.items():
+            assert len(ply_positions) == 20
+            for state, prev_small_idx, sign in ply_positions:
+                x_count = sum(state[big_idx]['display'].count('X') for big_idx in range(1, 10))
+                o_count = sum(state[big_idx]['display'].count('O') for big_idx in range(1, 10))
+
+                assert (x_count, o_count) == ((ply + 1) // 2, ply // 2), "Moves should alternate from X."
+                assert sign == ('X' if ply % 2 == 0 else 'O')
+                assert not StateChecker.check_win(state, 0), "Sampled games should not be over."
+                assert MoveGenerator.get_legal_moves(state, prev_small_idx), "Sampled positions should have moves."
+                if prev_small_idx is not None:
+                    assert state[0]['display'][prev_small_idx] == '-', "Moves should only be sent to open boards."
+
+    def test_seed_reproducible(self):
+        """ The same seed gives the same positions, and another seed gives other ones. """
+        texts = [[PositionCodec.format(*position) for position in PositionSampler(seed = seed).sample_list(50)]
+                 for seed in (3, 3, 4)]
+
+        assert texts[0] == texts[1]
+        assert texts[0] != texts[2]
+
+    @pytest.mark.parametrize("min_threats, error_msg", (
+            (1, "Every position should have a board one move from being won."),
+            (3, "Every position should have three boards one move from being won."),
+    ))
+    def test_min_threats(self, min_threats, error_msg):
+        """ Sharp positions have at least the asked for number of boards one move from being won. """
+        positions = PositionSampler(seed = 1, min_threats = min_threats).sample_list(30, min_ply = 20, max_ply = 50)
+
+        for state, prev_small_idx, sign in positions:
+            batch = PlayoutBatch.from_state(state, prev_small_idx, sign, num_games = 1)
+            assert PositionSampler.get_threats(batch)[0] >= min_threats, error_msg
+
+    @pytest.mark.parametrize("sampler, plies, error_msg", (
+            (PositionSampler(seed = 0), [81], "A ply after the last move should be rejected."),
+            (PositionSampler(seed = 0, min_threats = 1), [2], "Sharp positions can't be reached by ply 2."),
+    ))
+    def test_unreachable_plies(self, sampler, plies, error_msg):
+        """ Plies no game reaches raise a ValueError instead of sampling forever. """
+        with pytest.raises(ValueError):
+            sampler.sample(plies, per_ply = 1)
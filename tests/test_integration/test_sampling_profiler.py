@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from utils.simulator import SamplingProfiler, Simulator
+from utils.players import RandomPlayer, MiniMaxPlayer
+from utils.helpers import StateChecker
+
+
+StateChecker = StateChecker()
+
+
+def spin(seconds: float) -> int:
+    """ Keep the thread busy for the given time. """
+    end, count = time.perf_counter() + seconds, 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestSamplingProfiler:
+    """ Integration tests for profiling by sampling call stacks. """
+
+    def test_samples_busy_function(self):
+        """ Most samples land in the function keeping the thread busy, and every sample is in the collapsed stacks. """
+        profiler = SamplingProfiler(interval = 0.002)
+        assert profiler.runcall(spin, 0.2) > 0
+
+        top = profiler.get_top(1)[0]
+        assert profiler.samples > 20
+        assert top['function'].endswith(':spin') and top['own_percent'] > 50
+
+        lines = profiler.get_collapsed()
+        assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.samples
+        assert all(line.startswith('game;') for line in lines), "Unlabelled samples should be under the game."
+
+    def test_labels(self):
+        """ Samples taken during a wrapped call are counted under its label. """
+        profiler = SamplingProfiler(interval = 0.002)
+        labelled = profiler.wrap(spin, 'X Spinner')
+        profiler.runcall(lambda: (labelled(0.1), spin(0.1)))
+
+        assert profiler.get_top(1, label = 'X Spinner')[0]['function'].endswith(':spin')
+        assert {label for label, _ in profiler.stacks} == {'X Spinner', 'game'}
+        assert 'X Spinner' in profiler.format_summary(5)
+
+
+class TestSimulatorProfiling:
+    """ Integration tests for profiling simulations. """
+
+    def test_sampling_profiler(self, tmp_path, capsys):
+        """ Simulations profiled by sampling print a summary and write collapsed stacks per player. """
+        output = tmp_path / 'stacks.txt'
+        simulator = Simulator(2, MiniMaxPlayer(target_depth = 2), RandomPlayer(), profiler = 'sampling',
+                              sampling_interval = 0.001, profile_output = str(output))
+        simulator.start()
+
+        assert '--- Sampling Profile' in capsys.readouterr().out
+        labels = {line.split(';', 1)[0] for line in output.read_text().splitlines()}
+        assert 'X MiniMaxPlayer' in labels
+
+    def test_unknown_profiler(self):
+        """ Unknown profilers raise a ValueError. """
+        with pytest.raises(ValueError):
+            Simulator(1, RandomPlayer(), RandomPlayer(), profiler = 'perf')
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.self_play.self_play_generator import SelfPlayGenerator, create_player, load_shards, play_game
+from utils.players import MiniMaxPlayer, ExpectiMaxPlayer
+from utils.helpers import StateChecker, StateUpdater, MOVES
+
+
+StateChecker = StateChecker()
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestCreatePlayer:
+    """ Integration tests for creating players from their descriptions. """
+
+    def test_players(self):
+        """ Descriptions select the algorithm, depth and evaluator. """
+        player = create_player('minimax:3:v2')
+        assert isinstance(player, MiniMaxPlayer)
+        assert player.target_depth == 3
+        assert player.evaluator.name == 'v2'
+
+        assert isinstance(create_player('expectimax:2'), ExpectiMaxPlayer)
+        assert create_player('minimax').use_dynamic_depth
+        assert create_player('random') is None
+
+    @pytest.mark.parametrize("spec, error_msg", (
+            ("mcts:3", "An unsupported algorithm should be rejected."),
+            ("minimax:3:v9", "An unregistered evaluator should be rejected."),
+    ))
+    def test_unknown(self, spec, error_msg):
+        """ Unknown descriptions raise a ValueError. """
+        with pytest.raises(ValueError):
+            create_player(spec)
+
+
+class TestPlayGame:
+    """ Integration tests for recording the positions of a single game. """
+
+    def test_positions(self):
+        """ Consecutive positions differ by one move, only searched moves are scored and all share the result. """
+        columns = play_game(('minimax:1', 'random'), opening_moves = 3, seed = 2, game = 5)
+
+        state, prev_small_idx, sign = tuple(
+            {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+        ), None, 'X'
+
+        for ply in range(len(columns['cells'])):
+            assert columns['plies'][ply] == ply
+            assert columns['turns'][ply] == (1 if sign == 'X' else 2)
+            assert columns['targets'][ply] == (-1 if prev_small_idx is None else prev_small_idx - 1)
+
+            after = columns['cells'][ply + 1] if ply + 1 < len(columns['cells']) else None
+            if after is None:
+                break
+
+            (move,) = np.flatnonzero(after != columns['cells'][ply])
+            big_idx, small_idx = MOVES[move]
+            state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+            prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+            sign = 'O' if sign == 'X' else 'X'
+
+        assert np.isnan(columns['scores'][:3]).all()
+        assert not np.isnan(columns['scores'][4::2]).all()
+        assert np.isnan(columns['scores'][3::2]).all()
+        assert len(np.unique(columns['results'])) == 1
+        assert (columns['games'] == 5).all()
+
+
+class TestSelfPlayGenerator:
+    """ Integration tests for generating self-play positions in bulk. """
+
+    def test_generate_shards(self, tmp_path):
+        """ All positions are written to shards, readable back in the order of the games. """
+        with ThreadPoolExecutor(max_workers = 1) as executor:
+            generator = SelfPlayGenerator(players = ('minimax:1', 'random'), max_workers = 2, chunk_size = 2,
+                                          shard_size = 50, seed = 4, executor = executor)
+            stats = generator.generate_shards(5, str(tmp_path))
+
+        columns = load_shards(str(tmp_path))
+
+        assert stats['games'] == 5
+        assert stats['positions'] == len(columns['cells'])
+        assert stats['shards'] == len(list(tmp_path.glob('shard-*.npz'))) > 1
+        assert np.unique(columns['games']).tolist() == [0, 1, 2, 3, 4]
+        assert (np.diff(columns['games']) >= 0).all()
+
+    def test_seeded(self):
+        """ Generators with the same seed play the same games. """
+        chunks = []
+        for _ in range(2):
+            with ThreadPoolExecutor(max_workers = 1) as executor:
+                generator = SelfPlayGenerator(players = ('random', 'random'), seed = 1, executor = executor)
+                chunks.append(next(generator.generate(3)))
+
+        assert (chunks[0]['cells'] == chunks[1]['cells']).all()
+
+    def test_no_shards(self, tmp_path):
+        """ Loading an empty directory raises a FileNotFoundError. """
+        with pytest.raises(FileNotFoundError):
+            load_shards(str(tmp_path))
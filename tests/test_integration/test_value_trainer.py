@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.helpers import StateChecker, StateUpdater, MoveGenerator, MOVES
+from utils.helpers.learned_evaluator import LearnedEvaluator, ValueModel
+from utils.players import MiniMaxPlayer
+from utils.self_play import play_games
+from utils.tuning.value_trainer import ValueTrainer
+
+
+StateChecker = StateChecker()
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """ Reset the checked boards and any helper mocked on the instance by other tests. """
+
+    StateChecker._instance.checked_boards = {}
+    vars(StateChecker._instance).pop('check_win_helper', None)
+    yield
+    StateChecker._instance.checked_boards = {}
+
+
+class TestValueTrainer:
+    """ Integration tests for training the value model on self-play positions. """
+
+    @pytest.fixture(scope = 'class')
+    @classmethod
+    def columns(cls):
+        """ Positions from a few random games. """
+        return play_games(('random', 'random'), opening_moves = 0, seeds = list(range(30)), first_game = 0)
+
+    def test_split_games(self, columns):
+        """ Held out positions come from games that aren't trained on. """
+        train_positions, held_out_positions = ValueTrainer.split_games(columns, holdout = 0.2)
+
+        assert len(train_positions) + len(held_out_positions) == len(columns['results'])
+        assert not set(columns['games'][train_positions]) & set(columns['games'][held_out_positions])
+
+    def test_fit_lowers_loss(self, columns):
+        """ Fitting the model lowers its loss on the positions it is fitted to. """
+        inputs, results = ValueTrainer.get_inputs(columns)
+        model = ValueModel(embedding_size = 4, hidden_size = 8, seed = 0)
+        initial_loss = ValueTrainer.get_loss(model, inputs, results)
+
+        history = ValueTrainer(learning_rate = 0.01, epochs = 5, weight_decay = 0, seed = 0).fit(model, inputs, results)
+
+        assert len(history) == 5
+        assert ValueTrainer.get_loss(model, inputs, results) < initial_loss
+
+
+class TestBatchedSearch:
+    """ Integration tests for searching with a batched evaluator. """
+
+    @pytest.mark.parametrize("seed, error_msg", (
+            (3, "Batched leaves should give the same move and score (1/2)."),
+            (8, "Batched leaves should give the same move and score (2/2)."),
+    ))
+    def test_batched_matches_single(self, seed, error_msg):
+        """ Scoring the leaves of a node together leads to the same move as scoring them one by one. """
+        rng = random.Random(seed)
+        state = tuple(
+            {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+        )
+        prev_small_idx, sign = None, 'X'
+
+        for _ in range(24):
+            big_idx, small_idx = MOVES[rng.choice(MoveGenerator.get_legal_moves(state, prev_small_idx))]
+            state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+            prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+            sign = 'O' if sign == 'X' else 'X'
+
+        results = []
+        for batched in (True, False):
+            player = MiniMaxPlayer(target_depth = 3)
+            player.set_sign(sign)
+            player.moves_made = 20
+            player.evaluator = LearnedEvaluator(ValueModel(embedding_size = 2, hidden_size = 4, seed = 0))
+            player.evaluator.batched = batched
+
+            results.append((player.make_move(state, prev_small_idx), player.last_score))
+
+        assert results[0][1] is not None, "The move should be searched, not predefined."
+        assert results[0] == results[1], error_msg
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from utils.helpers import StateEvaluator
+from utils.tuning.weight_tuner import (FeatureExtractor, WeightTuner, generate_positions,
+                                       get_initial_weights, WEIGHTS, SCALES)
+
+
+StateEvaluator = StateEvaluator()
+
+
+class TestWeightTuner:
+    """ Integration tests for tuning the StateEvaluator weights to self-play results. """
+
+    @pytest.fixture(scope = 'class')
+    @classmethod
+    def positions(cls):
+        """ Positions from a few short self-play games. """
+        return generate_positions(num_games = 6, depth = 1, random_move_rate = 0.3, seed = 2)
+
+    def test_generate_positions(self, positions):
+        """ Every position gets the result of its game, and finished positions are left out. """
+        states, results = positions
+
+        assert len(states) == len(results) > 0
+        assert set(results) <= {0.0, 0.5, 1.0}
+
+    def test_features_match_heuristic(self, positions):
+        """ Weighing the features with the current constants gives the StateEvaluator heuristic. """
+        states, _ = positions
+        weights = get_initial_weights()
+
+        features = FeatureExtractor().extract(states)
+        heuristics = WeightTuner.predict(features, np.array([weights[name] for name in WEIGHTS]),
+                                         np.array([weights[name] for name in SCALES]))
+
+        expected = [StateEvaluator.heuristic(state, None, 'X') for state in states]
+        assert np.allclose(heuristics, expected)
+
+    def test_fit_lowers_loss(self, positions):
+        """ The tuned weights predict the results better than the current ones. """
+        states, results = positions
+        features, results = FeatureExtractor().extract(states), np.array(results)
+
+        tuner = WeightTuner(learning_rate = 0.05, batch_size = 64, epochs = 20, seed = 0)
+        initial_weights = get_initial_weights()
+        tuner.fit_scaling(features, results, initial_weights)
+        weights = tuner.fit(features, results, initial_weights)
+
+        assert set(weights) == set(WEIGHTS + SCALES)
+        assert all(value > 0 for value in weights.values())
+        assert tuner.get_loss(features, results, weights) < tuner.get_loss(features, results, initial_weights)
@@ -4,4 +4,5 @@ from .test_legal_moves_ui import *
 from .test_game_endings import *
 from .test_eval_bar import *
 from .test_small_board_completion import *
-from .test_grid_highlights import *
\ No newline at end of file
+from .test_grid_highlights import *
+from .test_hit_testing import *
\ No newline at end of file
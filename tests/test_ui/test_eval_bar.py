@@ -2,6 +2,9 @@ import time
 import pygame
 from tests.test_ui.ui_test_utils import BaseUITest, VisualTestReporter
 from utils.game.game_ui_assets import COLOR_BLUE, COLOR_YELLOW, X_MARGIN, Y_MARGIN
+from utils.game.game_ui_v2 import GameUI
+from utils.helpers import EngineContext, GameEvaluator
+from utils.players import UserPlayer
 
 
 class TestEvalBarUI(BaseUITest):
@@ -506,3 +509,19 @@ class TestEvalBarUI(BaseUITest):
         reporter.log_step("Test Complete", "A1-B1-C3 passed")
         print(f"\nA1-B1-C3 TEST COMPLETED in {time.time() - reporter.start_time:.2f}s")
 
+    def test_evaluator_without_algorithm(self):
+        """Test that the eval bar searches with a default algorithm when the game evaluator has none"""
+        pygame.init()
+
+        context = EngineContext()
+        context.game_evaluator = GameEvaluator(shared=False)
+
+        game_ui = GameUI(player1=UserPlayer(), player2=UserPlayer(), printing=False, use_eval_bar=True,
+                         context=context)
+        game_ui.reset_state()
+
+        assert game_ui.game_evaluator.algorithm is not None, "Eval bar should have an algorithm to search with"
+
+        game_ui.update_eval_bar(game_ui.player1)
+        game_ui.eval_job.result(timeout=30)
+        game_ui.ai_worker.stop(game_ui.eval_job)
@@ -0,0 +1,52 @@
+import pytest
+import pygame
+
+from utils.game.game_ui_v2 import GameUI, BUTTON_WIDGETS, CHOOSE_MENU_WIDGETS, BUTTON_HITS, CHOOSE_MENU_HITS
+from utils.game.game_ui_assets import *
+from utils.game.hit_map import HitMap
+
+
+class TestHitTesting:
+    """
+    Each Choice Coverage for mapping pixels to boxes and widgets
+
+    A: Pixel position
+       1 - Inside a box / widget, 2 - On its edge, 3 - Outside of all boxes / widgets
+    """
+
+    @pytest.mark.parametrize('x, y', [
+        (X_MARGIN + 30, Y_MARGIN + 30),
+        (X_MARGIN + 8 * SQUARE_SIZE + 59, Y_MARGIN + 4 * SQUARE_SIZE),
+        (X_MARGIN - 1, Y_MARGIN),
+        (X_MARGIN + 9 * SQUARE_SIZE, Y_MARGIN + 9 * SQUARE_SIZE - 1),
+        (0, 0),
+    ])
+    def test_get_box_at_pixel(self, x: int, y: int):
+        """ Tests whether the box at a pixel is the one whose rect contains the pixel. """
+
+        expected = (None, None)
+        for box_x in range(BOARD_WIDTH):
+            for box_y in range(BOARD_HEIGHT):
+                left, top = GameUI.top_left_coords_of_box(box_x, box_y)
+                if pygame.Rect(left, top, SQUARE_SIZE, SQUARE_SIZE).collidepoint(x, y):
+                    expected = (box_x, box_y)
+
+        assert GameUI.get_box_at_pixel(x, y) == expected, f"Wrong box found at pixel {(x, y)}."
+
+
+    @pytest.mark.parametrize('hit_map, widgets', [
+        (BUTTON_HITS, BUTTON_WIDGETS),
+        (CHOOSE_MENU_HITS, CHOOSE_MENU_WIDGETS),
+    ])
+    def test_widget_at(self, hit_map: HitMap, widgets: dict):
+        """ Tests whether every widget is found inside and on the edges of its rect and nowhere around it. """
+
+        for name, (left, top, width, height) in widgets.items():
+            for pos in ((left + width // 2, top + height // 2), (left, top), (left + width - 1, top + height - 1)):
+                assert hit_map.widget_at(pos) == name, f"{name} should be found at {pos}."
+
+            for pos in ((left + width, top), (left, top + height)):
+                assert hit_map.widget_at(pos) != name, f"{name} should not be found at {pos}."
+
+        assert hit_map.widget_at((-1, 5)) is None, "Pixels outside the window should have no widget."
+        assert hit_map.widget_at((WINDOW_WIDTH, 5)) is None, "Pixels outside the window should have no widget."
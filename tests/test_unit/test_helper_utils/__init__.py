@@ -1,3 +1,6 @@
 from .test_assets import *
 from .test_state_checker import *
-from .test_state_updater import *
\ No newline at end of file
+from .test_state_updater import *
+from .test_move_generator import *
+from .test_engine_context import *
+from .test_ai_worker import *
\ No newline at end of file
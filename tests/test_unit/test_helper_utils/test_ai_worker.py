@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from utils.helpers.ai_worker import AIWorker
+from tests.state_generator import StateGenerator
+from utils.players import MiniMaxPlayer
+
+
+class TestAIWorker:
+    """ Class to test the functionality of the AIWorker class. """
+
+    def test_jobs_run_in_order(self):
+        """ Tests whether jobs run one at a time in the order they were submitted. """
+
+        worker = AIWorker()
+        order = []
+
+        jobs = [worker.submit(order.append, i) for i in range(5)]
+        for job in jobs:
+            job.result(timeout = 5)
+
+        assert order == [0, 1, 2, 3, 4], "Jobs should run in submission order."
+        assert all(worker.is_current(job) for job in jobs), "Jobs should be current without cancelling."
+
+
+    def test_job_errors_reach_the_caller(self):
+        """ Tests whether an exception raised inside a job is raised when getting its result. """
+
+        worker = AIWorker()
+        job = worker.submit(int, 'not a number')
+
+        with pytest.raises(ValueError):
+            job.result(timeout = 5)
+
+        assert worker.submit(int, '7').result(timeout = 5) == 7, "Worker should keep running after an error."
+
+
+    def test_player_errors_reach_the_caller(self):
+        """ Tests whether a job with a missing or broken player fails on its own, leaving the worker running. """
+
+        class BrokenPlayer:
+            __slots__ = ()
+
+            def cancel_search(self):
+                pass
+
+        worker = AIWorker()
+
+        assert worker.submit(int, '3', players = (None,)).result(timeout = 5) == 3, "Missing players should be skipped."
+
+        with pytest.raises(AttributeError):
+            worker.submit(int, '5', players = (BrokenPlayer(),)).result(timeout = 5)
+
+        assert worker.submit(int, '7').result(timeout = 5) == 7, "Worker should keep running after a broken player."
+
+
+    def test_cancel_skips_queued_jobs(self):
+        """ Tests whether cancelling skips jobs that haven't started yet. """
+
+        worker = AIWorker()
+        release = threading.Event()
+
+        blocking_job = worker.submit(release.wait, 5)
+        queued_job = worker.submit(lambda: 'searched')
+
+        worker.cancel()
+        release.set()
+
+        assert blocking_job.result(timeout = 5) is None, "Skipped jobs should only return None."
+        assert queued_job.result(timeout = 5) is None, "Queued jobs should be skipped after cancelling."
+        assert not worker.is_current(queued_job), "Jobs from before cancelling should not be current."
+        assert worker.submit(lambda: 'searched').result(timeout = 5) == 'searched', \
+            "Jobs submitted after cancelling should run."
+
+
+    def test_cancel_stops_running_search(self):
+        """ Tests whether cancelling asks a running search to stop early. """
+
+        worker = AIWorker()
+        player = MiniMaxPlayer(target_depth = 12)
+        player.set_sign('X')
+        player.moves_made = 3
+
+        state = StateGenerator.generate(_0 = '---------', _1 = 'X-O------', _5 = '--X-O----', _9 = 'O---X----')
+        job = worker.submit(player.make_move, state, None, players = (player,))
+
+        time.sleep(0.2)
+        start_time = time.time()
+        worker.cancel()
+        job.result(timeout = 10)
+
+        assert time.time() - start_time < 5, "Search should stop soon after cancelling."
+        assert not player.search_cancelled, "Player should be able to search again after its job ends."
+
+
+    def test_stop_only_affects_its_job(self):
+        """ Tests whether stopping a job skips or interrupts only that job. """
+
+        worker = AIWorker()
+        release = threading.Event()
+
+        blocking_job = worker.submit(release.wait, 5)
+        stopped_job = worker.submit(lambda: 'searched')
+        other_job = worker.submit(lambda: 'searched')
+
+        worker.stop(stopped_job)
+        release.set()
+
+        assert blocking_job.result(timeout = 5), "Jobs before the stopped one should run."
+        assert stopped_job.cancelled(), "A stopped queued job should be skipped."
+        assert other_job.result(timeout = 5) == 'searched', "Jobs after the stopped one should run."
+        assert worker.is_current(other_job), "Stopping a job should not cancel the other jobs."
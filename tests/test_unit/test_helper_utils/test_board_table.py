@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from utils.helpers.board_table import BoardTable, OPEN, X_WON, O_WON, TIED, STATUS_SIGNS, NO_MOVE
+from utils.helpers.move_generator import MoveGenerator
+from utils.helpers.state_checker import StateChecker
+from utils.helpers.state_updater import StateUpdater
+from tests.state_generator import StateGenerator
+
+
+StateChecker = StateChecker()
+
+
+class TestBoardTable:
+    """ Class to test the functionality of the BoardTable class. """
+
+    @pytest.fixture(scope = 'class')
+    @classmethod
+    def table(cls):
+        """ Build the board table once for all tests. """
+
+        return BoardTable.build()
+
+
+    @pytest.mark.parametrize("display, expected, error_msg", (
+        ('---------', 0, "An empty board should be encoded as 0."),
+        ('X--------', 1, "X in the first position should be encoded as 1."),
+        ('O--------', 2, "O in the first position should be encoded as 2."),
+        ('--------O', 2 * 3 ** 8, "O in the last position should be encoded as 2 * 3 ** 8."),
+    ))
+    def test_encode_decode(self, display, expected, error_msg):
+        """ Tests whether boards are encoded and decoded consistently. """
+
+        board_display = ('/',) + tuple(display)
+
+        assert BoardTable.encode(board_display) == expected, error_msg
+        assert BoardTable.decode(expected) == board_display, "Decoding should return the original display."
+
+
+    @pytest.mark.parametrize("display, expected, error_msg", (
+        ('---------', OPEN, "An empty board should be open."),
+        ('XXX-OO---', X_WON, "A row of X should be won by X."),
+        ('OX-OX-O--', O_WON, "A column of O should be won by O."),
+        ('XOXXOOOXX', TIED, "A full board without a line should be tied."),
+    ))
+    def test_statuses(self, table, display, expected, error_msg):
+        """ Tests whether board statuses follow StateChecker. """
+
+        code = BoardTable.encode(('/',) + tuple(display))
+        state = StateGenerator.generate(_1 = display)
+
+        assert table.statuses[code] == expected, error_msg
+        assert STATUS_SIGNS[expected] == StateChecker.check_win(state, 1), "The status should match check_win."
+
+
+    def test_apply_move(self, table):
+        """ Tests whether random games played through the table match StateUpdater and MoveGenerator. """
+
+        rng = random.Random(4)
+
+        for _ in range(50):
+            state = StateGenerator.generate(_0 = '---------')
+            code, sign, status = 0, 'X', OPEN
+
+            while status == OPEN:
+                assert table.empty_masks[code] == MoveGenerator.get_empty_mask(state[5]['display'])
+
+                small_idx = rng.choice([i for i in range(1, 10) if state[5]['display'][i] == '-'])
+                state, board_is_complete = StateUpdater.update_state(state, 5, small_idx, sign)
+                code, status = table.apply_move(code, small_idx, sign)
+
+                assert BoardTable.decode(code) == state[5]['display']
+                assert (status != OPEN) == board_is_complete
+                sign = 'O' if sign == 'X' else 'X'
+
+            assert table.empty_masks[code] == 0, "A complete board should have no legal moves."
+
+
+    @pytest.mark.parametrize("display, small_idx, error_msg", (
+        ('X--------', 1, "A taken position should be illegal."),
+        ('XXX-OO---', 4, "A move on a complete board should be illegal."),
+    ))
+    def test_illegal_move(self, table, display, small_idx, error_msg):
+        """ Tests whether illegal moves have no transition. """
+
+        code = BoardTable.encode(('/',) + tuple(display))
+
+        assert table.next_codes[(code * 9 + small_idx - 1) * 2] == NO_MOVE, error_msg
+        with pytest.raises(ValueError):
+            table.apply_move(code, small_idx, 'X')
+
+
+    def test_save_load(self, table, tmp_path):
+        """ Tests whether a saved table is memory-mapped back with the same contents. """
+
+        path = tmp_path / 'boards.bin'
+        table.save(str(path))
+        loaded = BoardTable.load(str(path))
+
+        try:
+            assert bytes(loaded.next_codes) == bytes(table.next_codes)
+            assert bytes(loaded.empty_masks) == bytes(table.empty_masks)
+            assert bytes(loaded.statuses) == bytes(table.statuses)
+            assert loaded.apply_move(0, 5, 'O') == (2 * 3 ** 4, OPEN)
+
+        finally:
+            loaded.close()
+
+
+    def test_load_invalid_file(self, tmp_path):
+        """ Tests whether loading a file that isn't a board table raises a ValueError. """
+
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'not a board table')
+
+        with pytest.raises(ValueError):
+            BoardTable.load(str(path))
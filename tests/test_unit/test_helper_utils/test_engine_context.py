@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+from utils.helpers.engine_context import EngineContext
+from utils.helpers.game_evaluator import GameEvaluator
+from utils.helpers.state_checker import StateChecker
+from utils.helpers.state_updater import StateUpdater
+from tests.state_generator import StateGenerator
+from utils.players import Player, RandomPlayer, MiniMaxPlayer
+
+
+class TestEngineContext:
+    """ Class to test the functionality of the EngineContext class. """
+
+    @pytest.fixture(autouse=True)
+    def reset_state(self):
+        """ Reset the shared legal moves before and after each test. """
+
+        Player.reset_legal_moves()
+        yield
+        Player.reset_legal_moves()
+
+
+    def test_contexts_track_legal_moves_independently(self):
+        """ Tests whether updating one context leaves other contexts and the shared list untouched. """
+
+        context1, context2 = EngineContext(), EngineContext()
+
+        context1.update_legal_moves(5, 5)
+        context1.update_legal_moves(3, 1, board_is_complete = True)
+
+        assert 5 not in context1.legal_moves[5], "Move should be removed from the updated context."
+        assert context1.legal_moves[3] == [], "Completed board should be cleared in the updated context."
+        assert context2.legal_moves[5] == list(range(1, 10)), "Other contexts should not be affected."
+        assert Player.legal_moves[5] == list(range(1, 10)), "The shared legal moves should not be affected."
+
+
+    def test_bound_players_follow_context(self):
+        """ Tests whether bound players read and reset legal moves through their context. """
+
+        context = EngineContext()
+        player = RandomPlayer()
+        context.bind_players(player)
+
+        context.update_legal_moves(5, 1)
+        assert (5, 1) not in player.get_current_legal_moves(5), "Player should see the context's updates."
+
+        player.update_legal_moves(5, 2)
+        assert 2 not in context.legal_moves[5], "Player updates should go through the context."
+
+        context.reset_legal_moves()
+        assert len(player.get_current_legal_moves(5)) == 9, "Player should see the context being reset."
+
+
+    def test_game_evaluator_ownership(self):
+        """ Tests whether every context owns its evaluator, with the given algorithm or one of its own. """
+
+        algorithm = MiniMaxPlayer(target_depth = 2)
+        context1, context2 = EngineContext(), EngineContext(evaluator_algorithm = algorithm)
+
+        assert context1.game_evaluator is not EngineContext().game_evaluator, "Contexts should not share evaluators."
+        assert context2.game_evaluator.algorithm is algorithm, "Context evaluator should use the given algorithm."
+        assert isinstance(context1.game_evaluator.algorithm, MiniMaxPlayer), "Context evaluator should have an algorithm."
+
+
+    def test_game_evaluator_default_algorithm(self, monkeypatch):
+        """ Tests whether contexts copy the shared evaluator's algorithm without creating the shared instance. """
+
+        monkeypatch.setattr(GameEvaluator, '_instance', None)
+        EngineContext()
+        assert GameEvaluator._instance is None, "Creating a context should not create the shared instance."
+
+        shared_algorithm = MiniMaxPlayer(target_depth = 3)
+        GameEvaluator(algorithm = shared_algorithm)
+        algorithm1, algorithm2 = (EngineContext().game_evaluator.algorithm for _ in range(2))
+
+        assert algorithm1.target_depth == 3, "Contexts should use the shared evaluator's algorithm settings."
+        assert algorithm1 is not shared_algorithm and algorithm1 is not algorithm2, "Contexts should not share algorithms."
+
+
+    @staticmethod
+    def play_random_game(context: EngineContext, results: list):
+        """ Play a full game between two random players that share the given context. """
+
+        player1, player2 = RandomPlayer(), RandomPlayer()
+        player1.set_sign('X'), player2.set_sign('O')
+        context.bind_players(player1, player2)
+
+        state, prev_small_idx, player = StateGenerator.generate(), None, player1
+
+        while not StateChecker().check_win(state, 0):
+            big_idx, small_idx = player.make_move(state, prev_small_idx)
+            state, board_is_complete = StateUpdater.update_state(state, big_idx, small_idx, player.sign)
+            context.update_legal_moves(big_idx, small_idx, board_is_complete)
+
+            prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+            player = player2 if player is player1 else player1
+
+        results.append(state)
+
+
+    def test_concurrent_games(self):
+        """ Tests whether several games can run at the same time in separate threads. """
+
+        contexts = [EngineContext() for _ in range(8)]
+        results = [[] for _ in contexts]
+        threads = [
+            threading.Thread(target = self.play_random_game, args = (context, result))
+            for context, result in zip(contexts, results)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout = 30)
+
+        for context, result in zip(contexts, results):
+            assert len(result) == 1, "Every game should be finished without illegal moves."
+            state = result[0]
+            for big_idx in range(1, 10):
+                for small_idx in context.legal_moves[big_idx]:
+                    assert state[big_idx]['display'][small_idx] == '-', \
+                        "Tracked legal moves should only contain empty positions of that game."
+
+
+    def test_sync_legal_moves(self):
+        """ Tests whether legal moves rebuilt from a state keep the list shared with bound players. """
+
+        context = EngineContext()
+        player = RandomPlayer()
+        context.bind_players(player)
+
+        context.update_legal_moves(1, 1, board_is_complete = True)
+        context.sync_legal_moves(StateGenerator.generate(_0 = '-X-------', _2 = 'XXX------', _5 = 'XO-------'))
+
+        assert player.legal_moves is context.legal_moves, "The list should be rebuilt in place."
+        assert context.legal_moves[1] == list(range(1, 10)), "Empty boards should have every move."
+        assert context.legal_moves[2] == [], "Completed boards should have no moves."
+        assert context.legal_moves[5] == list(range(3, 10)), "Taken positions should not be legal."
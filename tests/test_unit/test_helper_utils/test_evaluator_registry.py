@@ -0,0 +1,101 @@
+import pickle
+import sys
+
+import pytest
+
+from utils.helpers.evaluator_registry import Evaluator, EvaluatorRegistry, DEFAULT_EVALUATOR
+from utils.helpers.state_evaluator import StateEvaluator
+from utils.helpers.state_evaluator_v2 import StateEvaluatorV2
+from utils.players.minimax_player import MiniMaxPlayer
+from tests.state_generator import StateGenerator
+
+
+class TestEvaluatorRegistry:
+    """ Class to test the functionality of the EvaluatorRegistry class. """
+
+    @pytest.mark.parametrize("name, expected_class, error_msg", (
+        ('v1', StateEvaluator, "The original heuristic should be registered as v1."),
+        ('v2', StateEvaluatorV2, "The second heuristic should be registered as v2."),
+    ))
+    def test_get_evaluator(self, name, expected_class, error_msg):
+        """ Tests whether registered evaluators are found by name and shared. """
+
+        evaluator = EvaluatorRegistry.get_evaluator(name)
+
+        assert isinstance(evaluator, expected_class), error_msg
+        assert evaluator is EvaluatorRegistry.get_evaluator(name), "Every lookup should return the same instance."
+        assert evaluator.name == name, "The evaluator should know the name it's registered under."
+
+
+    def test_unknown_evaluator(self):
+        """ Tests whether looking up an unregistered name raises a ValueError. """
+
+        with pytest.raises(ValueError):
+            EvaluatorRegistry.get_evaluator('unknown')
+
+
+    def test_register(self):
+        """ Tests whether a new evaluator can be registered, declare its capabilities and be used by players. """
+
+        @EvaluatorRegistry.register('test_material')
+        class MaterialEvaluator(Evaluator):
+            batched = True
+
+            def heuristic(self, state, next_big_idx, sign):
+                return len(state[0]['X']) - len(state[0]['O'])
+
+        try:
+            evaluator = EvaluatorRegistry.get_evaluator('test_material')
+            state = StateGenerator.generate(_0 = 'X--------')
+
+            assert 'test_material' in EvaluatorRegistry.get_names()
+            assert evaluator.get_capabilities() == {'incremental': False, 'batched': True, 'table_based': False}
+            assert evaluator.heuristic_batch([(state, None, 'X'), (state, 5, 'O')]) == [1, 1]
+            assert MiniMaxPlayer(target_depth = 1, evaluator = 'test_material').evaluator is evaluator
+
+            with pytest.raises(ValueError):
+                EvaluatorRegistry.register('test_material')(StateEvaluator)
+
+        finally:
+            EvaluatorRegistry.evaluators.pop('test_material', None)
+            EvaluatorRegistry.instances.pop('test_material', None)
+
+
+    def test_register_module(self, tmp_path, monkeypatch):
+        """ Tests whether an evaluator registered by module is listed, and only imported when first selected. """
+
+        (tmp_path / 'lazy_test_evaluator.py').write_text(
+            "from utils.helpers.evaluator_registry import Evaluator, EvaluatorRegistry\n"
+            "@EvaluatorRegistry.register('test_lazy')\n"
+            "class LazyEvaluator(Evaluator):\n"
+            "    def heuristic(self, state, next_big_idx, sign):\n"
+            "        return 7\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        EvaluatorRegistry.register_module('test_lazy', 'lazy_test_evaluator')
+
+        try:
+            assert 'test_lazy' in EvaluatorRegistry.get_names()
+            assert 'learned' in EvaluatorRegistry.get_names(), "The learned evaluator should be listed before it's imported."
+            assert 'lazy_test_evaluator' not in sys.modules, "Registering the module should not import it."
+
+            evaluator = EvaluatorRegistry.get_evaluator('test_lazy')
+
+            assert evaluator.heuristic(StateGenerator.generate(), None, 'X') == 7
+            assert EvaluatorRegistry.get_names().count('test_lazy') == 1
+
+        finally:
+            EvaluatorRegistry.modules.pop('test_lazy', None)
+            EvaluatorRegistry.evaluators.pop('test_lazy', None)
+            EvaluatorRegistry.instances.pop('test_lazy', None)
+            sys.modules.pop('lazy_test_evaluator', None)
+
+
+    def test_pickle(self):
+        """ Tests whether players sent to another process keep using the registered instance. """
+
+        player = MiniMaxPlayer(target_depth = 2, evaluator = 'v2')
+        copied_player = pickle.loads(pickle.dumps(player))
+
+        assert copied_player.evaluator is EvaluatorRegistry.get_evaluator('v2')
+        assert MiniMaxPlayer(target_depth = 2).evaluator.name == DEFAULT_EVALUATOR
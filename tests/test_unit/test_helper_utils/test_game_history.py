@@ -0,0 +1,113 @@
+import pytest
+
+from utils.helpers.game_history import GameHistory
+from utils.helpers.state_checker import StateChecker
+from utils.helpers.state_updater import StateUpdater
+from utils.players import MiniMaxPlayer, RandomPlayer
+from tests.state_generator import StateGenerator
+
+
+class TestGameHistory:
+    """ Class to test the functionality of the GameHistory class. """
+
+    @pytest.fixture
+    def history(self):
+        """ A history of three moves. """
+
+        StateChecker()._instance.checked_boards = {}
+        vars(StateChecker()._instance).pop('check_win_helper', None)
+
+        history = GameHistory()
+        state = StateGenerator.generate()
+        history.reset(state)
+
+        for big_idx, small_idx, sign in ((5, 1, 'X'), (1, 5, 'O'), (5, 9, 'X')):
+            state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+            history.push(state, small_idx, (big_idx, small_idx))
+
+        return history
+
+
+    def test_undo_redo(self, history):
+        """ Tests whether undoing and redoing move through the positions in order. """
+
+        state, prev_small_idx, move = history.undo()
+        assert (prev_small_idx, move) == (5, (1, 5)), "Undo should go back to the previous position."
+        assert state[5]['display'][9] == '-', "The undone move should not be on the board."
+
+        assert history.redo()[2] == (5, 9), "Redo should make the undone move again."
+        assert not history.can_redo()
+
+
+    @pytest.mark.parametrize("ply, move, error_msg", (
+        (0, None, "Ply 0 should be the starting position."),
+        (2, (1, 5), "Ply 2 should be the position after two moves."),
+        (3, (5, 9), "The last ply should be the current position."),
+    ))
+    def test_go_to(self, history, ply, move, error_msg):
+        """ Tests whether any ply can be jumped to. """
+
+        assert history.go_to(ply)[2] == move, error_msg
+        assert history.can_redo() == (ply < 3)
+        assert len(history.get_moves()) == ply
+
+
+    def test_push_drops_undone_moves(self, history):
+        """ Tests whether a move made after undoing replaces the undone moves. """
+
+        state = history.go_to(1)[0]
+        state, _ = StateUpdater.update_state(state, 1, 1, 'O')
+        history.push(state, 1, (1, 1))
+
+        assert history.get_moves() == [(5, 1), (1, 1)]
+        assert not history.can_redo()
+
+
+    @pytest.mark.parametrize("call, error_msg", (
+        (lambda history: history.go_to(4), "A ply after the last move should be rejected."),
+        (lambda history: history.go_to(-1), "A negative ply should be rejected."),
+        (lambda history: history.redo(), "Redo without undone moves should be rejected."),
+        (lambda history: [history.go_to(0), history.undo()], "Undo at the start should be rejected."),
+    ))
+    def test_invalid_moves(self, history, call, error_msg):
+        """ Tests whether moving outside the history raises an IndexError. """
+
+        with pytest.raises(IndexError):
+            call(history)
+
+
+    def test_states_share_boards(self, history):
+        """ Tests whether consecutive states share the boards the move between them didn't change. """
+
+        states = [history.go_to(ply)[0] for ply in range(4)]
+
+        for before, after, (big_idx, _) in zip(states, states[1:], history.get_moves()):
+            assert after[big_idx] is not before[big_idx], "The changed board should be a new dict."
+            assert all(after[idx] is before[idx] for idx in range(10) if idx != big_idx), \
+                "Unchanged boards should be shared between states."
+
+        assert states[0] == StateGenerator.generate(), "Updating should leave older states untouched."
+
+
+    def test_player_states(self):
+        """ Tests whether moving through the history gives the players their search state at each position back. """
+
+        minimax, random = MiniMaxPlayer(target_depth = 'dynamic'), RandomPlayer()
+        history = GameHistory()
+        history.reset(StateGenerator.generate(), (minimax, random))
+
+        for ply in range(1, 4):
+            minimax.moves_made, minimax.target_depth, minimax.counter = ply, 5 + ply, ply
+            history.push(StateGenerator.generate(), None, (ply, ply), (minimax, random))
+
+        history.go_to(1)
+        history.restore_player_states()
+        assert (minimax.moves_made, minimax.target_depth, minimax.counter) == (1, 6, 1), \
+            "Going back should restore the search state the player had at that position."
+
+        history.go_to(0)
+        history.restore_player_states()
+        assert (minimax.moves_made, minimax.target_depth, minimax.counter) == (-1, 5, 0), \
+            "The starting position should restore the search state the player started with."
+        assert random.get_search_state() == {}, "Players without a search state should be left alone."
+
@@ -0,0 +1,142 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from utils.helpers import learned_evaluator
+from utils.helpers.evaluator_registry import EvaluatorRegistry
+from utils.helpers.learned_evaluator import ValueModel, LearnedEvaluator, VALUE_SCALE
+from utils.helpers.state_checker import StateChecker
+from tests.state_generator import StateGenerator
+
+
+class TestValueModel:
+    """ Class to test the functionality of the ValueModel class. """
+
+    @pytest.fixture
+    def inputs(self):
+        """ Inputs and results of a few made-up positions. """
+
+        rng = np.random.default_rng(1)
+        cells = rng.integers(0, 3, (6, 81)).astype(np.int8)
+        inputs = ValueModel.get_inputs(cells, rng.integers(-1, 9, 6), rng.integers(1, 3, 6))
+
+        return inputs, rng.random(6).astype(np.float32)
+
+
+    @pytest.mark.parametrize("hidden_size, error_msg", (
+        (0, "Linear model gradients should match finite differences."),
+        (5, "Hidden layer gradients should match finite differences."),
+    ))
+    def test_gradients(self, inputs, hidden_size, error_msg):
+        """ Tests whether the gradients of the loss are correct. """
+
+        inputs, results = inputs
+        model = ValueModel(embedding_size = 3, hidden_size = hidden_size, seed = 0)
+        _, gradients = model.get_gradients(inputs, results)
+        model.params = {name: value.astype(np.float64) for name, value in model.params.items()}
+
+        for name, gradient in gradients.items():
+            param = model.params[name]
+            idx = np.unravel_index(np.argmax(np.abs(gradient)), param.shape)
+            original = param[idx]
+
+            param[idx] = original + 1e-5
+            loss_above = model.get_gradients(inputs, results)[0]
+            param[idx] = original - 1e-5
+            loss_below = model.get_gradients(inputs, results)[0]
+            param[idx] = original
+
+            assert gradient[idx] == pytest.approx((loss_above - loss_below) / 2e-5, rel = 1e-3), error_msg
+
+
+    def test_save_load(self, inputs, tmp_path):
+        """ Tests whether a saved model predicts the same after loading. """
+
+        inputs, _ = inputs
+        model = ValueModel(embedding_size = 2, hidden_size = 4, seed = 3)
+        model.save(str(tmp_path / 'model.npz'))
+        loaded = ValueModel.load(str(tmp_path / 'model.npz'))
+
+        assert loaded.hidden_size == 4
+        assert np.allclose(loaded.predict(inputs), model.predict(inputs))
+
+
+class TestLearnedEvaluator:
+    """ Class to test the functionality of the LearnedEvaluator class. """
+
+    @pytest.fixture
+    def evaluator(self):
+        """ An evaluator with an untrained model. """
+
+        StateChecker()._instance.checked_boards = {}
+        vars(StateChecker()._instance).pop('check_win_helper', None)
+
+        return LearnedEvaluator(ValueModel(embedding_size = 2, hidden_size = 4, seed = 0))
+
+
+    @pytest.mark.parametrize("state, expected, error_msg", (
+        (StateGenerator.generate('XXX------'), 1000, "A game won by X should be worth a win."),
+        (StateGenerator.generate('OOO------'), -1000, "A game won by O should be worth a loss."),
+        (StateGenerator.generate('XOXXOOOXX'), 0, "A tied game should be worth a tie."),
+    ))
+    def test_finished_games(self, evaluator, state, expected, error_msg):
+        """ Tests whether finished games get fixed scores instead of predictions. """
+
+        assert evaluator.heuristic(state, None, 'X') == expected, error_msg
+
+
+    def test_batch_matches_single(self, evaluator):
+        """ Tests whether batched evaluations match single ones and stay below a win. """
+
+        states = [
+            (StateGenerator.generate(_1 = 'X--------'), 1, 'O'),
+            (StateGenerator.generate(_1 = 'X--------'), None, 'O'),
+            (StateGenerator.generate(_5 = 'XO-------', _1 = 'O--------'), 2, 'X'),
+        ]
+
+        scores = evaluator.heuristic_batch(states)
+        evaluator.evaluations.clear()
+
+        assert scores == pytest.approx([evaluator.heuristic(*state) for state in states])
+        assert scores[0] != scores[1], "The target board should be part of the evaluation."
+        assert all(abs(score) < VALUE_SCALE for score in scores)
+
+
+    def test_pickle_model_file(self, tmp_path, monkeypatch):
+        """ Tests whether a pickled evaluator keeps the model it was loaded from. """
+
+        model_path = tmp_path / 'custom_model.npz'
+        ValueModel(embedding_size = 2, hidden_size = 4, seed = 1).save(str(model_path))
+        monkeypatch.setattr(LearnedEvaluator, 'loaded', {})
+
+        evaluator = LearnedEvaluator(model_path = str(model_path))
+        copied_evaluator = pickle.loads(pickle.dumps(evaluator))
+
+        assert copied_evaluator.model_path == str(model_path), "A custom model should not turn into the default one."
+        assert np.array_equal(copied_evaluator.model.params['embeddings'], evaluator.model.params['embeddings'])
+        assert pickle.loads(pickle.dumps(evaluator)) is copied_evaluator, "The model file should be loaded once."
+
+
+    def test_pickle_default_model(self, tmp_path, monkeypatch):
+        """ Tests whether an evaluator of the default model is sent as the registered instance. """
+
+        model_path = tmp_path / 'value_model.npz'
+        ValueModel(embedding_size = 2, hidden_size = 4, seed = 1).save(str(model_path))
+        monkeypatch.setattr(learned_evaluator, 'DEFAULT_MODEL_PATH', str(model_path))
+        monkeypatch.delitem(EvaluatorRegistry.instances, 'learned', raising = False)
+
+        try:
+            evaluator = LearnedEvaluator()
+
+            assert pickle.loads(pickle.dumps(evaluator)) is EvaluatorRegistry.get_evaluator('learned')
+
+        finally:
+            EvaluatorRegistry.instances.pop('learned', None)
+
+
+    def test_pickle_unsaved_model(self, evaluator):
+        """ Tests whether pickling an evaluator of a model that isn't in a file is refused. """
+
+        with pytest.raises(TypeError):
+            pickle.dumps(evaluator)
@@ -0,0 +1,106 @@
+import pytest
+
+from utils.helpers.move_generator import MoveGenerator, MOVES
+from tests.state_generator import StateGenerator
+
+
+class TestMoveGenerator:
+    """ Class to test the functionality of the MoveGenerator class. """
+
+    @staticmethod
+    def get_expected_moves(state, prev_small_idx):
+        """ Build the expected legal moves by scanning the state displays. """
+
+        if prev_small_idx is None or state[0]['display'][prev_small_idx] != '-':
+            boards = [big_idx for big_idx in range(1, 10) if state[0]['display'][big_idx] == '-']
+        else:
+            boards = [prev_small_idx]
+
+        return [
+            (big_idx, small_idx)
+            for big_idx in boards
+            for small_idx in range(1, 10) if state[big_idx]['display'][small_idx] == '-'
+        ]
+
+
+    @pytest.mark.parametrize("big_idx, small_idx, expected, error_msg", (
+        (1, 1, 0, "First position of the first board should be encoded as 0."),
+        (1, 9, 8, "Last position of the first board should be encoded as 8."),
+        (5, 5, 40, "Center of the center board should be encoded as 40."),
+        (9, 9, 80, "Last position of the last board should be encoded as 80."),
+    ))
+    def test_encode_decode_move(self, big_idx, small_idx, expected, error_msg):
+        """ Tests whether moves are encoded and decoded consistently. """
+
+        move = MoveGenerator.encode_move(big_idx, small_idx)
+
+        assert move == expected, error_msg
+        assert MoveGenerator.decode_move(move) == (big_idx, small_idx), "Decoding should return the original move."
+        assert MOVES[move] == (big_idx, small_idx), "Move table should match decode_move."
+
+
+    @pytest.mark.parametrize("board, expected, error_msg", (
+        ('---------', 0b111111111, "Empty board should have all positions set."),
+        ('XOXOXOOXO', 0, "Full board should have no positions set."),
+        ('X-------O', 0b011111110, "Only the corners should be cleared."),
+        ('-X-O-X-O-', 0b101010101, "Alternating board should have every other position set."),
+    ))
+    def test_get_empty_mask(self, board, expected, error_msg):
+        """ Tests whether the empty mask matches the board display. """
+
+        assert MoveGenerator.get_empty_mask(tuple(f'/{board}')) == expected, error_msg
+
+
+    # BCC criteria:
+    # A: prev_small_idx value
+    #   1 - points to an uncompleted board, 2 - points to a completed board, 3 - None
+    # B: board setup
+    #   1 - empty board, 2 - couple of moves made, 3 - couple of boards completed, 4 - couple of moves left
+    # happy path: A1 B2
+
+    @pytest.mark.parametrize("state, prev_small_idx, error_msg", (
+        # A1 B2 (happy path)
+        (StateGenerator.generate(_1='-O-------', _4='---X----O', _9='X--------'), 4,
+         "Should return the remaining moves on the started board."),
+        # A3 B2
+        (StateGenerator.generate(_1='-O-------', _4='---X----O', _9='X--------'), None,
+         "Should return the remaining moves on all boards."),
+        # A1 B1
+        (StateGenerator.generate(), 7, "Should return all 9 moves on an empty board."),
+        # A3 B1
+        (StateGenerator.generate(), None, "Should return all 81 moves on an empty game."),
+        # A2 B3
+        (StateGenerator.generate(_0='X---O----', _1='XXX------', _5='OOO------', _2='-X-------'), 5,
+         "Being sent to a completed board should allow moves on any uncompleted board."),
+        # A1 B3
+        (StateGenerator.generate(_0='X---O----', _1='XXX------', _5='OOO------', _2='-X-------'), 2,
+         "Should return the remaining moves on an uncompleted board."),
+        # A3 B4
+        (StateGenerator.generate(_0='XO---X-T-',
+                                 _1='---XXX---', _2='OOO------', _3='--XOX--OO',
+                                 _4='XOXOXOO--', _5='XOXOXOOX-', _6='X---X---X',
+                                 _7='-----XXOO', _8='XOOOXXXOO', _9='X-XOXOOXO'), None,
+         "Should only return moves on uncompleted boards."),
+    ))
+    def test_get_legal_moves(self, state, prev_small_idx, error_msg):
+        """ Tests whether legal move codes match the legal moves of the state. """
+
+        expected = self.get_expected_moves(state, prev_small_idx)
+
+        moves = MoveGenerator.get_legal_moves(state, prev_small_idx)
+        mask = MoveGenerator.get_legal_moves_mask(state, prev_small_idx)
+
+        assert [MOVES[move] for move in moves] == expected, error_msg
+        assert list(MoveGenerator.iter_mask(mask)) == list(moves), "Mask should contain the same moves."
+        assert mask.bit_count() == len(expected), "Mask should have one bit per legal move."
+
+
+    def test_get_legal_moves_ignores_tracked_moves(self):
+        """ Tests whether hypothetical states don't depend on the tracked legal moves. """
+
+        state = StateGenerator.generate(_0='----X----', _5='XXX------', _3='XO-------')
+
+        moves = [MOVES[move] for move in MoveGenerator.get_legal_moves(state, 5)]
+
+        assert (3, 1) not in moves and (3, 2) not in moves, "Occupied positions should never be legal."
+        assert all(big_idx != 5 for big_idx, _ in moves), "Completed boards should never be legal."
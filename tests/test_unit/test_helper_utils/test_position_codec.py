@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from utils.helpers.position_codec import PositionCodec, POSITION_BYTES
+from utils.helpers.move_generator import MoveGenerator, MOVES
+from utils.helpers.state_checker import StateChecker
+from utils.helpers.state_updater import StateUpdater
+from tests.state_generator import StateGenerator
+
+
+StateChecker = StateChecker()
+
+
+def canonical(position: tuple[tuple[dict, ...], int | None, str]) -> tuple:
+    """ Get a position with every board's positions sorted and the next board normalized. """
+
+    state, prev_small_idx, sign = position
+    boards = tuple((tuple(sorted(board['X'])), tuple(sorted(board['O'])), board['display']) for board in state)
+
+    return boards, PositionCodec.get_next_board(state, prev_small_idx), sign
+
+
+class TestPositionCodec:
+    """ Class to test the functionality of the PositionCodec class. """
+
+    @pytest.fixture(scope = 'class')
+    @classmethod
+    def positions(cls):
+        """ Every position of a few random games. """
+
+        StateChecker._instance.checked_boards = {}
+        vars(StateChecker._instance).pop('check_win_helper', None)
+
+        rng = random.Random(4)
+        positions = []
+
+        for _ in range(5):
+            state, prev_small_idx, sign = StateGenerator.generate(), None, 'X'
+            while not StateChecker.check_win(state, 0):
+                positions.append((state, prev_small_idx, sign))
+                big_idx, small_idx = MOVES[rng.choice(MoveGenerator.get_legal_moves(state, prev_small_idx))]
+                state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+                prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+                sign = 'O' if sign == 'X' else 'X'
+            positions.append((state, prev_small_idx, sign))
+
+        return positions
+
+
+    @pytest.mark.parametrize("encode, decode, error_msg", (
+        (PositionCodec.encode, PositionCodec.decode, "Integers should decode to the encoded position."),
+        (PositionCodec.to_bytes, PositionCodec.from_bytes, "Bytes should decode to the encoded position."),
+        (PositionCodec.format, PositionCodec.parse, "Text should parse to the formatted position."),
+        (PositionCodec.to_bitboard, lambda bitboard: PositionCodec.from_bitboard(*bitboard),
+         "Bitboards should convert back to the position."),
+    ))
+    def test_round_trip(self, positions, encode, decode, error_msg):
+        """ Tests whether every form converts back to the same position. """
+
+        for position in positions:
+            assert canonical(decode(encode(*position))) == canonical(position), error_msg
+
+
+    def test_forms(self, positions):
+        """ Tests whether the forms are compact and distinct positions get distinct integers. """
+
+        assert all(len(PositionCodec.to_bytes(*position)) == POSITION_BYTES for position in positions)
+        assert len({PositionCodec.encode(*position) for position in positions}) == \
+               len({canonical(position) for position in positions})
+
+
+    @pytest.mark.parametrize("text, prev_small_idx, sign, error_msg", (
+        ('9/9/9/9/9/9/9/9/9 - X', None, 'X', "The empty board should have a free move."),
+        ('9/9/9/9/4X4/9/9/9/9 5 O', 5, 'O', "The first move in the middle should send O there."),
+        ('XXX6/9/9/9/9/9/9/9/9 1 O', None, 'O', "Being sent to a won board should be a free move."),
+    ))
+    def test_parse(self, text, prev_small_idx, sign, error_msg):
+        """ Tests whether text notation is read correctly. """
+
+        state, parsed_prev_small_idx, parsed_sign = PositionCodec.parse(text)
+
+        assert (parsed_prev_small_idx, parsed_sign) == (prev_small_idx, sign), error_msg
+        assert PositionCodec.format(state, parsed_prev_small_idx, parsed_sign) == text.replace(' 1 O', ' - O')
+
+
+    def test_parse_big_board(self):
+        """ Tests whether the big board is worked out from the small boards. """
+
+        state, _, _ = PositionCodec.parse('XXX6/OOO6/XOXXOOOXX/9/9/9/9/9/9 - X')
+
+        assert state[0]['display'][1:4] == ('X', 'O', 'T')
+        assert state[0]['X'] == (2,) and state[0]['O'] == (7,)
+        assert state[1] == StateGenerator.generate(_1 = 'XXX------')[1]
+
+
+    @pytest.mark.parametrize("text, error_msg", (
+        ('9/9/9/9/9/9/9/9 - X', "Eight boards should be rejected."),
+        ('9/9/9/9/9/9/9/9/8 - X', "A board with eight spaces should be rejected."),
+        ('9/9/9/9/9/9/9/9/X9 - X', "A board with ten spaces should be rejected."),
+        ('9/9/9/9/9/9/9/9/9 0 X', "Board 0 should be rejected."),
+        ('9/9/9/9/9/9/9/9/9 - Y', "An unknown sign should be rejected."),
+        ('9/9/9/9/9/9/9/9/4Y4 - X', "An unknown space should be rejected."),
+        ('9/9/9/9/9/9/9/9/9', "Text without the next board and sign should be rejected."),
+    ))
+    def test_parse_invalid(self, text, error_msg):
+        """ Tests whether invalid text raises a ValueError. """
+
+        with pytest.raises(ValueError):
+            PositionCodec.parse(text)
+
+
+    @pytest.mark.parametrize("call, error_msg", (
+        (lambda: PositionCodec.decode(-1), "A negative integer should be rejected."),
+        (lambda: PositionCodec.decode(3 ** 81 * 20), "An integer out of range should be rejected."),
+        (lambda: PositionCodec.from_bytes(bytes(16)), "Too few bytes should be rejected."),
+        (lambda: PositionCodec.from_bitboard(1, 1, 0, 'X'), "A space taken by both signs should be rejected."),
+    ))
+    def test_invalid_forms(self, call, error_msg):
+        """ Tests whether invalid integers, bytes and bitboards raise a ValueError. """
+
+        with pytest.raises(ValueError):
+            call()
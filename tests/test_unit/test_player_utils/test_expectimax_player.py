@@ -1,6 +1,6 @@
 import copy
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 from tests.sample_generator import SampleGenerator
 from utils.players.expectimax_player import ExpectiMaxPlayer
@@ -226,10 +226,9 @@ class TestExpectiMaxPlayer:
                 # A4 B2 C1
                 (False, True, False, True, 'O', 3, 3, "Should return heuristic score at depth limit for minimizer when averaging."),
         ))
-    @patch('utils.players.expectimax_player.StateEvaluator')
     @patch('utils.players.expectimax_player.StateUpdater')
     @patch('utils.players.expectimax_player.StateChecker')
-    def test_expectimax(self, mock_checker, mock_updater, mock_evaluator, game_won, at_depth_limit,
+    def test_expectimax(self, mock_checker, mock_updater, game_won, at_depth_limit,
                         is_maximizing, is_averaging, player_sign, target_depth, curr_depth, error_msg):
         """ Test whether expectimax algorithm works correctly with averaging nodes. """
 
@@ -237,12 +236,14 @@ class TestExpectiMaxPlayer:
         legal_moves = self.test_get_legal_moves("couple_moves_left")
 
         mock_checker.check_win.return_value = game_won
+        mock_evaluator = MagicMock()
         mock_evaluator.heuristic.return_value = 100 if is_maximizing else -100
         mock_updater.update_state.return_value = (state, False)
 
         player = ExpectiMaxPlayer(target_depth=target_depth)
         player.sign = player_sign
         player.legal_moves = legal_moves
+        player.evaluator = mock_evaluator
 
         score = player.expectimax(state, 5, curr_depth, is_maximizing, is_averaging)
 
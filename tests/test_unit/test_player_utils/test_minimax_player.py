@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 
 from tests.sample_generator import SampleGenerator
+from tests.state_generator import StateGenerator
 from utils.players.minimax_player import MiniMaxPlayer
 
 
@@ -220,10 +221,9 @@ class TestMiniMaxPlayer:
             # A1 B2 C2
             (True, False, False, 'O', "Should return heuristic score when game is won for minimizer."),
     ))
-    @patch('utils.players.minimax_player.StateEvaluator')
     @patch('utils.players.minimax_player.StateUpdater')
     @patch('utils.players.minimax_player.StateChecker')
-    def test_minimax_ab(self, mock_checker, mock_updater, mock_evaluator, game_won, at_depth_limit,
+    def test_minimax_ab(self, mock_checker, mock_updater, game_won, at_depth_limit,
                         is_maximizing, player_sign, error_msg):
         """ Test whether minimax_ab algorithm works correctly. """
 
@@ -231,12 +231,14 @@ class TestMiniMaxPlayer:
         legal_moves = self.test_get_legal_moves("couple_moves_made")
 
         mock_checker.check_win.return_value = game_won
+        mock_evaluator = MagicMock(batched=False)
         mock_evaluator.heuristic.return_value = 100 if is_maximizing else -100
         mock_updater.update_state.return_value = (state, False)
 
         player = MiniMaxPlayer(target_depth=2 if at_depth_limit else 10)
         player.sign = player_sign
         player.legal_moves = legal_moves
+        player.evaluator = mock_evaluator
 
         depth = 2 if at_depth_limit else 0
         score = player.minimax_ab(state, 2, depth, float('-inf'), float('inf'), is_maximizing)
@@ -245,3 +247,59 @@ class TestMiniMaxPlayer:
 
         if game_won or at_depth_limit:
             assert mock_evaluator.heuristic.called, "Heuristic should be called at terminal nodes."
+
+
+    def test_search_children_cancelled_batched(self):
+        """ Test whether a cancelled search skips the batched evaluation of the leaves. """
+
+        mock_evaluator = MagicMock(batched=True)
+
+        player = MiniMaxPlayer(target_depth=2)
+        player.evaluator = mock_evaluator
+        player.cancel_search()
+
+        score = player.search_children(StateGenerator.generate(), None, 1, float('-inf'), float('inf'), True)
+
+        assert score == 0, "Cancelled search should return the same score as a cancelled minimax_ab."
+        assert not mock_evaluator.heuristic_batch.called, "Cancelled search should not evaluate the leaves."
+
+
+    @pytest.mark.parametrize("target_depth, error_msg", (
+            (3, "Transposition table should not change the chosen move at an odd depth."),
+            (4, "Transposition table should not change the chosen move at an even depth."),
+    ))
+    def test_transposition_table(self, target_depth, error_msg):
+        """ Test whether searching with a transposition table gives the same moves as without one. """
+
+        state = StateGenerator.generate(_0 = '---------', _1 = 'X-O------', _5 = '--X-O----', _9 = 'O---X----')
+        table = {}
+
+        player = MiniMaxPlayer(target_depth = target_depth)
+        player.set_sign('X')
+        player.moves_made = 3
+        expected_move = player.make_move(state, None)
+
+        player.transposition_table = table
+        player.moves_made = 3
+        assert player.make_move(state, None) == expected_move, error_msg
+        assert table, "Searched states should be stored in the table."
+
+        player.moves_made = 3
+        assert player.make_move(state, None) == expected_move, "Reusing a filled table should give the same move."
+
+
+    @pytest.mark.parametrize("moves_made, expected_depth, error_msg", (
+            (0, 5, "Depth should start at the initial dynamic depth."),
+            (20, 5, "Depth should not change before the threshold."),
+            (21, 6, "Depth should increase at the first step after the threshold."),
+            (24, 8, "Depth should keep increasing exponentially."),
+    ))
+    def test_get_dynamic_depth(self, moves_made, expected_depth, error_msg):
+        """ Test whether the dynamic depth matches updating the target depth once for every move made. """
+
+        player = MiniMaxPlayer(target_depth = 'dynamic')
+        for player.moves_made in range(moves_made + 1):
+            player.update_target_depth()
+
+        assert MiniMaxPlayer.get_dynamic_depth(moves_made) == expected_depth, error_msg
+        assert player.target_depth == expected_depth, error_msg
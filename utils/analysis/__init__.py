@@ -0,0 +1 @@
+from .game_analyzer import *
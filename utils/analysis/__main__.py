@@ -0,0 +1,26 @@
+import argparse
+
+from .game_analyzer import GameAnalyzer, BLUNDER_THRESHOLD
+from utils.helpers import EvaluatorRegistry, DEFAULT_EVALUATOR
+
+
+parser = argparse.ArgumentParser(description = 'Annotate stored games with evaluation swings, '
+                                               'blunders and the best alternatives.')
+parser.add_argument('input', help = 'JSON Lines file with one {"moves": [[big, small], ...]} record per line')
+parser.add_argument('output', help = 'JSON Lines file to write the annotated games to')
+parser.add_argument('--depth', default = '5', help = 'search depth, or "dynamic" / "timed"')
+parser.add_argument('--lines', type = int, default = 3, help = 'number of best lines per position')
+parser.add_argument('--blunder', type = float, default = BLUNDER_THRESHOLD, help = 'evaluation loss of a blunder')
+parser.add_argument('--evaluator', default = DEFAULT_EVALUATOR, choices = EvaluatorRegistry.get_names(),
+                    help = 'heuristic to score positions with')
+parser.add_argument('--workers', type = int, default = None, help = 'number of worker processes')
+args = parser.parse_args()
+
+analyzer = GameAnalyzer(
+    depth = int(args.depth) if args.depth.isdigit() else args.depth,
+    num_lines = args.lines,
+    blunder_threshold = args.blunder,
+    evaluator = args.evaluator,
+    max_workers = args.workers
+)
+print(f'[ ANALYZER ] : {analyzer.analyse_file(args.input, args.output)}')
@@ -0,0 +1,278 @@
+import collections
+import itertools
+import json
+import os
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+from utils.players import RandomPlayer, MiniMaxPlayer
+from utils.helpers import StateChecker, StateUpdater, GameEvaluator, DEFAULT_EVALUATOR
+
+
+StateChecker = StateChecker()
+
+BLUNDER_THRESHOLD = 50
+MAX_GAME_EVALUATORS = 4
+
+game_evaluators = {}
+
+
+def get_game_evaluator(depth: int | str, evaluator: str = DEFAULT_EVALUATOR) -> GameEvaluator:
+    """
+    Get the worker's game evaluator for the given depth and heuristic.
+
+    Evaluators are kept for the lifetime of the worker process, so every game it analyses
+    shares the same finished analyses and transposition table.
+
+    Arguments:
+        depth: The target depth value or option of the searching algorithm.
+        evaluator: The name of the registered evaluator to score states with.
+
+    Returns:
+        The game evaluator.
+    """
+
+    if (depth, evaluator) not in game_evaluators:
+        if len(game_evaluators) >= MAX_GAME_EVALUATORS:
+            del game_evaluators[next(iter(game_evaluators))]
+        algorithm = MiniMaxPlayer(target_depth = depth, evaluator = evaluator)
+        game_evaluators[depth, evaluator] = GameEvaluator(algorithm, shared = False)
+
+    return game_evaluators[depth, evaluator]
+
+
+def replay_game(moves: list[tuple[int, int]]) -> Iterator[tuple[tuple[dict, ...], int | None, str, RandomPlayer]]:
+    """
+    Replay a game move by move.
+
+    Arguments:
+        moves: The moves of the game in (big_idx, small_idx) format, X moving first.
+
+    Yields:
+        The state, the small index of the previous move made, the sign to move and a player tracking
+        the legal moves of the state, for every position of the game including the last one.
+
+    Raises:
+        ValueError: If a move is illegal or made after the game is over.
+    """
+
+    state = tuple(
+        {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+    )
+    prev_small_idx = None
+    sign = 'X'
+
+    # A player of its own keeps the replay's legal moves away from the shared class list.
+    player = RandomPlayer()
+    player.legal_moves = [[]] + [[i for i in range(1, 10)] for _ in range(1, 10)]
+
+    for ply, (big_idx, small_idx) in enumerate(moves, start = 1):
+        player.set_sign(sign)
+        yield state, prev_small_idx, sign, player
+
+        if StateChecker.check_win(state, 0):
+            raise ValueError(f'move {ply} is made after the game is over')
+
+        if (big_idx, small_idx) not in player.get_current_legal_moves(prev_small_idx):
+            raise ValueError(f'move {ply} ({big_idx}, {small_idx}) is illegal')
+
+        state, board_is_complete = StateUpdater.update_state(state, big_idx, small_idx, sign)
+        player.update_legal_moves(big_idx, small_idx, board_is_complete)
+
+        prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+        sign = 'O' if sign == 'X' else 'X'
+
+    player.set_sign(sign)
+    yield state, prev_small_idx, sign, player
+
+
+def analyse_game(record: dict, depth: int | str = 5, num_lines: int = 3,
+                 blunder_threshold: float = BLUNDER_THRESHOLD, evaluator: str = DEFAULT_EVALUATOR) -> dict:
+    """
+    Annotate every move of a game with the evaluation swing and the best alternatives.
+
+    Arguments:
+        record: The game record, with its moves under "moves" and optionally an "id".
+        depth: The target depth value or option of the searching algorithm.
+        num_lines: How many of the best lines to keep for every position.
+        blunder_threshold: How much a move has to lose, from the moving player's side, to be a blunder.
+        evaluator: The name of the registered evaluator to score states with.
+
+    Returns:
+        The annotated game.
+    """
+
+    game_evaluator = get_game_evaluator(depth, evaluator)
+    moves = [tuple(move) for move in record['moves']]
+    evaluations, analyses = [], []
+
+    try:
+        for state, prev_small_idx, sign, player in replay_game(moves):
+            # A finished game has nothing to analyse. Moves left after it make replay_game raise.
+            if StateChecker.check_win(state, 0):
+                evaluations.append(game_evaluator.algorithm.evaluator.heuristic(state, prev_small_idx, sign))
+                continue
+
+            analysis = game_evaluator.analyse_lines(state, prev_small_idx, player, num_lines)
+            evaluations.append(analysis['evaluation'])
+            analyses.append(analysis)
+
+    except ValueError as error:
+        return {'id': record.get('id'), 'error': str(error)}
+
+    annotated_moves = []
+    for ply, (move, analysis) in enumerate(zip(moves, analyses), start = 1):
+        sign = 'X' if ply % 2 else 'O'
+        eval_before, eval_after = evaluations[ply - 1], evaluations[ply]
+        loss = eval_before - eval_after if sign == 'X' else eval_after - eval_before
+
+        annotated_moves.append({
+            'ply': ply,
+            'sign': sign,
+            'move': move,
+            'eval_before': eval_before,
+            'eval_after': eval_after,
+            'loss': loss,
+            'blunder': loss >= blunder_threshold,
+            'best_move': analysis['best_move'],
+            'lines': analysis['lines'],
+        })
+
+    return {
+        'id': record.get('id'),
+        'winner': StateChecker.check_win(state, 0) or None,
+        'blunders': {sign: sum(move['blunder'] for move in annotated_moves if move['sign'] == sign)
+                     for sign in ('X', 'O')},
+        'moves': annotated_moves,
+    }
+
+
+def analyse_games(records: list[dict], depth: int | str = 5, num_lines: int = 3,
+                  blunder_threshold: float = BLUNDER_THRESHOLD, evaluator: str = DEFAULT_EVALUATOR) -> list[dict]:
+    """
+    Annotate several games, one after another. Runs inside a worker process.
+
+    Arguments:
+        records: The game records.
+        depth: The target depth value or option of the searching algorithm.
+        num_lines: How many of the best lines to keep for every position.
+        blunder_threshold: How much a move has to lose, from the moving player's side, to be a blunder.
+        evaluator: The name of the registered evaluator to score states with.
+
+    Returns:
+        The annotated games, in the order of the records.
+    """
+
+    return [analyse_game(record, depth, num_lines, blunder_threshold, evaluator) for record in records]
+
+
+class GameAnalyzer:
+    """
+    Class for annotating stored games in bulk across a pool of worker processes.
+
+    Games are sent to the workers in chunks, so every worker replays a whole chunk against its
+    warm caches, and only a few chunks per worker are in flight to keep the memory use flat
+    no matter how large the archive is.
+    """
+
+    def __init__(self, depth: int | str = 5, num_lines: int = 3, blunder_threshold: float = BLUNDER_THRESHOLD,
+                 evaluator: str = DEFAULT_EVALUATOR, max_workers: int = None, chunk_size: int = 16,
+                 executor: Executor = None):
+        """
+        Create an instance of the GameAnalyzer class.
+
+        Arguments:
+            depth: The target depth value or option of the searching algorithm.
+            num_lines: How many of the best lines to keep for every position.
+            blunder_threshold: How much a move has to lose, from the moving player's side, to be a blunder.
+            evaluator: The name of the registered evaluator to score states with.
+            max_workers: Number of worker processes, defaults to the CPU count.
+            chunk_size: Number of games sent to a worker at once.
+            executor: An executor to use instead of creating a process pool.
+        """
+
+        self.depth = depth
+        self.num_lines = num_lines
+        self.blunder_threshold = blunder_threshold
+        self.evaluator = evaluator
+        self.workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.owns_executor = executor is None
+
+
+    def analyse(self, records: Iterable[dict]) -> Iterator[dict]:
+        """
+        Annotate the given games.
+
+        Arguments:
+            records: The game records, with their moves under "moves" and optionally an "id".
+
+        Yields:
+            The annotated games, in the order of the records.
+        """
+
+        executor = self.executor or ProcessPoolExecutor(max_workers = self.workers)
+        records = iter(records)
+        in_flight = collections.deque()
+
+        try:
+            while True:
+                while len(in_flight) < self.workers * 2:
+                    chunk = list(itertools.islice(records, self.chunk_size))
+                    if not chunk:
+                        break
+                    in_flight.append(executor.submit(analyse_games, chunk, self.depth, self.num_lines,
+                                                     self.blunder_threshold, self.evaluator))
+
+                if not in_flight:
+                    break
+
+                yield from in_flight.popleft().result()
+
+        finally:
+            if self.owns_executor:
+                executor.shutdown(cancel_futures = True)
+
+
+    def analyse_file(self, input_path: str, output_path: str) -> dict:
+        """
+        Annotate every game in a JSON Lines file and write the annotated games to another one.
+
+        Arguments:
+            input_path: The file with one game record per line.
+            output_path: The file to write one annotated game per line to.
+
+        Returns:
+            The number of games, failed games, positions and blunders, and the time taken.
+        """
+
+        start_time = time.perf_counter()
+        stats = {'games': 0, 'failed': 0, 'positions': 0, 'blunders': 0}
+
+        with open(input_path) as input_file, open(output_path, 'w') as output_file:
+            records = (json.loads(line) for line in input_file if line.strip())
+            buffer = []
+
+            for game in self.analyse(records):
+                stats['games'] += 1
+                if 'error' in game:
+                    stats['failed'] += 1
+                else:
+                    stats['positions'] += len(game['moves'])
+                    stats['blunders'] += sum(game['blunders'].values())
+
+                buffer.append(json.dumps(game) + '\n')
+                if len(buffer) >= self.chunk_size:
+                    output_file.writelines(buffer)
+                    buffer.clear()
+
+            output_file.writelines(buffer)
+
+        stats['seconds'] = round(time.perf_counter() - start_time, 2)
+        return stats
+
+
+__all__ = ['GameAnalyzer', 'analyse_game', 'analyse_games', 'replay_game']
@@ -1,2 +1,17 @@
 from .game import *
-from .game_ui_v2 import *
+
+
+def __getattr__(name: str):
+    """
+    Import the pygame UI only when it's first used, so importing the console game,
+    e.g. from the simulator or a server worker, never initializes pygame.
+    """
+
+    if name == 'GameUI':
+        from .game_ui_v2 import GameUI
+        return GameUI
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+__all__ = ['Game', 'GameUI']
@@ -2,7 +2,7 @@ from os import system
 import time
 
 from utils.players import Player, UserPlayer
-from utils.helpers import StateChecker, StateEvaluator, StateUpdater, GameEvaluator
+from utils.helpers import StateChecker, StateEvaluator, StateUpdater, EngineContext, GameHistory
 
 
 StateChecker = StateChecker()
@@ -14,7 +14,8 @@ class Game:
 
     def __init__(self, player1: Player = UserPlayer(), player2: Player = UserPlayer(),
                  printing: bool = True, wait_after_move: int | str | None = 'input',
-                 show_evaluation: bool = False, measure_thinking_time: bool = False):
+                 show_evaluation: bool = False, measure_thinking_time: bool = False,
+                 context: EngineContext = None):
         """
         Create an instance of the Game class.
 
@@ -31,17 +32,23 @@ class Game:
              show_evaluation: Whether to show the heuristic evaluation throughout the game.
                 Printing needs to be turned on for this to work.
              measure_thinking_time: Whether to measure the time it takes for each player to make a move.
+             context: The engine context of the game. None creates a new one,
+                so that the game doesn't share legal moves with any other game.
         """
 
+        self.context = context if context is not None else EngineContext()
+
         self.state = None
         self.player1, self.player2 = player1, player2
         self.player1.set_sign('X'), self.player2.set_sign('O')
+        self.context.bind_players(self.player1, self.player2)
         self.prev_small_idx = None
         self.prev_move_made = None
+        self.history = GameHistory()
 
         self.printing = printing
         self.show_evaluation = show_evaluation
-        self.game_evaluator = GameEvaluator()
+        self.game_evaluator = self.context.game_evaluator
 
         self.measure_thinking_time = measure_thinking_time
         self.player1_thinking_times = []
@@ -68,6 +75,7 @@ class Game:
         """ Reset the current state to its starting form. """
 
         self.prev_small_idx = None
+        self.context.reset_legal_moves()
         self.state = (
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},  # Big board
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},  # Top-left small board
@@ -80,6 +88,8 @@ class Game:
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},
         )
+        self.prev_move_made = None
+        self.history.reset(self.state, (self.player1, self.player2))
 
 
     def print_board(self):
@@ -133,17 +143,70 @@ class Game:
             self.prev_small_idx = small_idx
 
         self.prev_move_made = (big_idx, small_idx)
+        self.history.push(self.state, self.prev_small_idx, self.prev_move_made, (self.player1, self.player2))
+
+        self.context.update_legal_moves(big_idx, small_idx, board_is_complete = board_is_complete)
+
+
+    def restore_position(self, position: tuple[tuple[dict, ...], int | None, tuple[int, int] | None]):
+        """
+        Make a position from the history the current one, with the search state of the players at it.
+
+        Arguments:
+            position: The state, the small index of the previous move made and the previous move made.
+        """
+
+        self.state, self.prev_small_idx, self.prev_move_made = position
+        self.context.sync_legal_moves(self.state)
+        self.history.restore_player_states()
+
+
+    def undo(self):
+        """
+        Take back the last move made.
+
+        Raises:
+            IndexError: If no moves were made.
+        """
 
-        player.update_legal_moves(big_idx, small_idx, board_is_complete = board_is_complete)
+        self.restore_position(self.history.undo())
+
+
+    def redo(self):
+        """
+        Make the last move taken back again.
+
+        Raises:
+            IndexError: If no moves were taken back.
+        """
+
+        self.restore_position(self.history.redo())
+
+
+    def go_to_ply(self, ply: int):
+        """
+        Go to the position after a number of moves. The moves after it can still be redone
+        until a new move is made.
+
+        Arguments:
+            ply: The number of moves made, 0 for the starting position.
+
+        Raises:
+            IndexError: If the game hasn't reached that ply.
+        """
+
+        self.restore_position(self.history.go_to(ply))
 
 
     def play(self):
-        """ Start the game. """
+        """ Start the game, or continue it from the current position. """
 
-        sign = 'X'
-        player = self.player1
+        sign = 'X' if self.history.ply % 2 == 0 else 'O'
+        player = self.player1 if sign == 'X' else self.player2
         move_start_time = None
 
+        self.context.bind_players(self.player1, self.player2)
+
         while not StateChecker.check_win(self.state, big_idx = 0):
             if self.printing:
                 system('cls')
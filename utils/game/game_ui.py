@@ -4,7 +4,7 @@ import sys
 from pygame.locals import *
 
 from utils.players import Player, UserPlayer
-from utils.helpers import StateChecker, StateEvaluator, StateUpdater, GameEvaluator
+from utils.helpers import StateChecker, StateEvaluator, StateUpdater, EngineContext, AIWorker
 
 import time
 
@@ -98,7 +98,7 @@ class GameUI:
                  printing: bool = True, wait_after_move: int | str | None = 'input',
                  show_evaluation: bool = False, measure_thinking_time: bool = False,
                  opaque_on_board_completion: bool = True, light_theme: bool = False,
-                 use_eval_bar: bool = False):
+                 use_eval_bar: bool = False, context: EngineContext = None):
         """
         Create an instance of the Game class.
 
@@ -118,8 +118,12 @@ class GameUI:
              opaque_on_board_completion: Whether to make the background of completed boards opaque.
              light_theme: Whether the UI will be dark or light theme.
              use_eval_bar: Whether to display the evaluation bar in the game UI.
+             context: The engine context of the game. None creates a new one,
+                so that the game doesn't share legal moves with any other game.
         """
 
+        self.context = context if context is not None else EngineContext()
+
         global DISPLAY_SURF
         DISPLAY_SURF = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption('Ultimate Tic Tac Toe')
@@ -133,12 +137,13 @@ class GameUI:
         self.state = None
         self.player1, self.player2 = player1, player2
         self.player1.set_sign('X'), self.player2.set_sign('O')
+        self.context.bind_players(self.player1, self.player2)
         self.prev_small_idx = None
         self.prev_move_made = None
 
         self.printing = printing
         self.show_evaluation = show_evaluation
-        self.game_evaluator = GameEvaluator()
+        self.game_evaluator = self.context.game_evaluator
 
         self.measure_thinking_time = measure_thinking_time
         self.player1_thinking_times = []
@@ -147,6 +152,9 @@ class GameUI:
         self.opaque_on_board_completion = opaque_on_board_completion
         self.use_eval_bar = use_eval_bar
 
+        self.ai_worker = AIWorker()
+        self.eval_job = None
+
         def waiting(start_time: float = None):
             if wait_after_move is None:
                 return
@@ -170,6 +178,7 @@ class GameUI:
         """ Reset the current state to its starting form. """
 
         self.prev_small_idx = None
+        self.context.reset_legal_moves()
         self.state = (
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},  # Big board
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},  # Top-left small board
@@ -224,6 +233,7 @@ class GameUI:
             waiting = True
             while waiting:
                 self.check_for_quit()
+                self.poll_background_jobs()
 
                 for event in pygame.event.get(pygame.MOUSEBUTTONUP):
 
@@ -240,19 +250,11 @@ class GameUI:
                         waiting = False
                         break
 
-        else:
-            if self.measure_thinking_time:
-                thinking_time_start = time.time()
-                big_idx, small_idx = player.make_move(self.state, self.prev_small_idx)
-
-                box_x, box_y = idx_to_rc[big_idx][small_idx]
+                FPS_CLOCK.tick(FPS)
 
-                thinking_times = self.player1_thinking_times if sign == 'X' else self.player2_thinking_times
-                thinking_times.append(time.time() - thinking_time_start)
-
-            else:
-                big_idx, small_idx = player.make_move(self.state, self.prev_small_idx)
-                box_x, box_y = idx_to_rc[big_idx][small_idx]
+        else:
+            big_idx, small_idx = self.wait_for_ai_move(sign, player)
+            box_x, box_y = idx_to_rc[big_idx][small_idx]
 
         state, board_is_complete = StateUpdater.update_state(self.state, big_idx, small_idx, sign)
 
@@ -274,7 +276,76 @@ class GameUI:
 
         self.prev_move_made = (big_idx, small_idx)
 
-        player.update_legal_moves(big_idx, small_idx, board_is_complete=board_is_complete)
+        self.context.update_legal_moves(big_idx, small_idx, board_is_complete=board_is_complete)
+
+
+    def wait_for_ai_move(self, sign: str, player: Player) -> tuple[int, int]:
+        """
+        Let an AI player search in the background while the window keeps responding.
+
+        Arguments:
+            sign: X or O.
+            player: The AI player whose turn it is.
+
+        Returns:
+            The AI player's move.
+        """
+
+        state, prev_small_idx = self.state, self.prev_small_idx
+
+        def search() -> tuple[tuple[int, int], float]:
+            thinking_time_start = time.time()
+            move = player.make_move(state, prev_small_idx)
+            return move, time.time() - thinking_time_start
+
+        job = self.ai_worker.submit(search, players = (player,))
+
+        while not job.done():
+            self.check_for_quit()
+            self.poll_background_jobs()
+            GameUI.draw_thinking_indicator(sign)
+            FPS_CLOCK.tick(FPS)
+
+        GameUI.draw_thinking_indicator(None)
+
+        move, thinking_time = job.result()
+
+        if self.measure_thinking_time:
+            thinking_times = self.player1_thinking_times if sign == 'X' else self.player2_thinking_times
+            thinking_times.append(thinking_time)
+
+        return move
+
+
+    def poll_background_jobs(self):
+        """ Draw the result of a finished eval bar job. """
+
+        if self.eval_job is not None and self.eval_job.done():
+            job, self.eval_job = self.eval_job, None
+            GameUI.draw_eval_bar(job.result())
+
+
+    @staticmethod
+    def draw_thinking_indicator(sign: str | None):
+        """
+        Draw the pulsing dots shown above the board while an AI player is thinking.
+
+        Arguments:
+            sign: The sign of the thinking player or None to clear the indicator.
+        """
+
+        center_x, center_y = WINDOW_WIDTH // 2, Y_MARGIN // 2
+        area = pygame.Rect(center_x - 40, center_y - 10, 80, 20)
+
+        pygame.draw.rect(DISPLAY_SURF, BG_COLOR, area)
+
+        if sign is not None:
+            lit_dot = int(time.time() * 4) % 3
+            for i in range(3):
+                color = SIGN_COLORS[sign] if i == lit_dot else SMALL_LINE_COLOR
+                pygame.draw.circle(DISPLAY_SURF, color, (center_x + (i - 1) * 25, center_y), 6)
+
+        pygame.display.update(area)
 
 
     def play(self):
@@ -284,6 +355,8 @@ class GameUI:
         player = self.player1
         move_start_time = None
 
+        self.context.bind_players(self.player1, self.player2)
+
         while not StateChecker.check_win(state = self.state, big_idx = 0):
             pygame.event.pump()
             self.check_for_quit()
@@ -311,8 +384,9 @@ class GameUI:
             move_start_time = time.time()
             self.make_move(sign, player)
 
+            # The bar evaluates the new state, where the other player makes the first move.
             if self.use_eval_bar:
-                self.update_eval_bar(player, already_evaluated)
+                self.update_eval_bar(self.player2 if player == self.player1 else self.player1, already_evaluated)
 
             if self.prev_small_idx is not None:
                 GameUI.draw_subgrid_at_board(self.prev_small_idx, OPPOSITE_SIGN_COLORS[sign])
@@ -348,19 +422,41 @@ class GameUI:
         wait_to_exit = True
         while wait_to_exit:
             self.check_for_quit()
+            self.poll_background_jobs()
+            FPS_CLOCK.tick(FPS)
 
 
     def update_eval_bar(self, player: Player, eval_score: int | bool = None):
         """
-        Update the game evaluation bar.
+        Update the game evaluation bar. Without a precalculated score, the state is evaluated
+        in the background and the bar is drawn once the evaluation is done.
 
         Arguments:
             player: The player object whose turn it is.
             eval_score: A precalculated evaluation score.
         """
 
-        game_score = eval_score if eval_score \
-            else self.game_evaluator.game_evaluation(self.state, self.prev_small_idx, player)
+        if eval_score:
+            GameUI.draw_eval_bar(eval_score)
+            return
+
+        # An evaluation still waiting in the queue would only be drawn over, so it's dropped.
+        if self.eval_job is not None:
+            self.eval_job.cancel()
+
+        self.eval_job = self.ai_worker.submit(self.game_evaluator.game_evaluation,
+                                              self.state, self.prev_small_idx, player)
+
+
+    @staticmethod
+    def draw_eval_bar(game_score: float):
+        """
+        Draw the game evaluation bar.
+
+        Arguments:
+            game_score: The evaluation score for the current state.
+        """
+
         yellow_h = int((game_score + 1000) / 2000 * 546)
 
         t, l = Y_MARGIN - 3, X_MARGIN - 100
@@ -423,13 +519,10 @@ class GameUI:
             The row and column of the box or None if not found.
         """
 
-        for box_x in range(BOARD_WIDTH):
-            for box_y in range(BOARD_HEIGHT):
-                left, top = GameUI.top_left_coords_of_box(box_x, box_y)
-                box_rect = pygame.Rect(left, top, SQUARE_SIZE, SQUARE_SIZE)
+        box_x, box_y = (y - Y_MARGIN) // SQUARE_SIZE, (x - X_MARGIN) // SQUARE_SIZE
 
-                if box_rect.collidepoint(x, y):
-                    return box_x, box_y
+        if 0 <= box_x < BOARD_WIDTH and 0 <= box_y < BOARD_HEIGHT:
+            return box_x, box_y
 
         return None, None
 
@@ -4,17 +4,49 @@ import sys
 from pygame.locals import *
 
 from utils.players import Player, UserPlayer, RandomPlayer, MiniMaxPlayer
-from utils.helpers import StateChecker, StateEvaluator, StateUpdater, GameEvaluator
+from utils.helpers import StateChecker, StateEvaluator, StateUpdater, EngineContext, AIWorker, GameHistory, GameEvaluator
 from .game_ui_assets import *
+from .renderer import Renderer
+from .surface_cache import SurfaceCache
+from .hit_map import HitMap
 
 import time
 
-# TODO: change eval bar so that it is animated :(
-
 pygame.init()
 
 FPS = 120
-FPS_CLOCK = pygame.time.Clock()
+
+# Fraction of the distance to the newest evaluation the eval bar covers each frame,
+# and the distance under which it stops animating.
+EVAL_BAR_EASING = 0.12
+EVAL_BAR_SNAP = 1
+RENDERER = Renderer(FPS)
+SURFACES = SurfaceCache()
+
+BUTTONS_LEFT, BUTTONS_TOP = WINDOW_WIDTH - X_MARGIN + 1 * SQUARE_SIZE, Y_MARGIN + 2 * SQUARE_SIZE
+
+BUTTON_WIDGETS = {
+    'hint': (BUTTONS_LEFT, BUTTONS_TOP, 60, 55),
+    'bar': (BUTTONS_LEFT, BUTTONS_TOP + 1 * SQUARE_SIZE, 60, 55),
+    'reset': (BUTTONS_LEFT, BUTTONS_TOP + 3 * SQUARE_SIZE, 60, 55),
+    'to_title': (BUTTONS_LEFT, BUTTONS_TOP + 4 * SQUARE_SIZE, 60, 55),
+}
+MAIN_MENU_WIDGETS = {
+    'one_player': (140, 510, 190, 41),
+    'two_player': (540, 510, 230, 41),
+}
+CHOOSE_MENU_WIDGETS = {
+    'X': (295, 225, 90, 90),
+    'O': (505, 225, 90, 90),
+    'easy': (145, 510, 110, 46),
+    'normal': (360, 510, 185, 46),
+    'hard': (630, 510, 130, 46),
+    'back': (0, 0, 60, 60),
+}
+
+BUTTON_HITS = HitMap(WINDOW_WIDTH, WINDOW_HEIGHT, BUTTON_WIDGETS)
+MAIN_MENU_HITS = HitMap(WINDOW_WIDTH, WINDOW_HEIGHT, MAIN_MENU_WIDGETS)
+CHOOSE_MENU_HITS = HitMap(WINDOW_WIDTH, WINDOW_HEIGHT, CHOOSE_MENU_WIDGETS)
 
 DISPLAY_SURF: pygame.Surface | None = None
 
@@ -30,7 +62,7 @@ class GameUI:
                  printing: bool = True, wait_after_move: int | str | None = 'input',
                  show_evaluation: bool = False, measure_thinking_time: bool = False,
                  opaque_on_board_completion: bool = True, light_theme: bool = False,
-                 use_eval_bar: bool = False):
+                 use_eval_bar: bool = False, context: EngineContext = None):
         """
         Create an instance of the Game class.
 
@@ -50,8 +82,12 @@ class GameUI:
              opaque_on_board_completion: Whether to make the background of completed boards opaque.
              light_theme: Whether the UI will be dark or light theme.
              use_eval_bar: Whether to display the evaluation bar in the game UI.
+             context: The engine context of the game. None creates a new one,
+                so that the game doesn't share legal moves with any other game.
         """
 
+        self.context = context if context is not None else EngineContext()
+
         global DISPLAY_SURF
         DISPLAY_SURF = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption('Ultimate Tic Tac Toe')
@@ -63,15 +99,25 @@ class GameUI:
             BIG_LINE_COLOR = COLOR_DARK_GRAY
             SMALL_LINE_COLOR = COLOR_LIGHT_GRAY
 
+        # Images can only be converted to the display's format once it exists.
+        globals().update(SURFACES.convert_images())
+        SURFACES.build(BG_COLOR, BIG_LINE_COLOR, SMALL_LINE_COLOR)
+
         self.state = None
         self.player1, self.player2 = player1, player2
         self.player1.set_sign('X'), self.player2.set_sign('O')
+        self.context.bind_players(self.player1, self.player2)
         self.prev_small_idx = None
         self.prev_move_made = None
+        self.history = GameHistory()
 
         self.printing = printing
         self.show_evaluation = show_evaluation
-        self.game_evaluator = GameEvaluator()
+        self.game_evaluator = self.context.game_evaluator
+
+        # The eval bar and hints search with the evaluator's algorithm, so one set up without it gets the default.
+        if self.game_evaluator.algorithm is None:
+            self.game_evaluator.setup(GameEvaluator.get_default_algorithm())
 
         self.measure_thinking_time = measure_thinking_time
         self.player1_thinking_times = []
@@ -82,12 +128,22 @@ class GameUI:
 
         self.hinted_move = None
         self.reset = False
+
+        self.ai_worker = AIWorker()
+        self.eval_job = None
+        self.hint_job = None
+
+        self.analysis_id = 0
+        self.eval_target = 0.0
+        self.eval_shown = 0.0
         self.selected_sign = None
         self.selected_difficulty = None
 
         def waiting(start_time: float = None):
             if wait_after_move is None:
                 return
+            # Show everything drawn so far before blocking.
+            RENDERER.present()
             if wait_after_move == 'input':
                 input('... waiting for input ...')
                 return
@@ -108,6 +164,8 @@ class GameUI:
         """ Reset the current state to its starting form. """
 
         self.prev_small_idx = None
+        self.eval_target = 0.0
+        self.context.reset_legal_moves()
         self.state = (
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},  # Big board
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},  # Top-left small board
@@ -120,6 +178,8 @@ class GameUI:
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},
             {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')},
         )
+        self.prev_move_made = None
+        self.history.reset(self.state, (self.player1, self.player2))
 
 
     def print_board(self):
@@ -163,6 +223,7 @@ class GameUI:
             while waiting:
                 self.check_for_quit()
                 self.update_buttons()
+                self.poll_background_jobs()
 
                 for event in pygame.event.get(pygame.MOUSEBUTTONUP):
                     click_sound.play()
@@ -184,19 +245,14 @@ class GameUI:
                         waiting = False
                         break
 
-        else:
-            if self.measure_thinking_time:
-                thinking_time_start = time.time()
-                big_idx, small_idx = player.make_move(self.state, self.prev_small_idx)
-
-                box_x, box_y = idx_to_rc[big_idx][small_idx]
+                RENDERER.end_frame()
 
-                thinking_times = self.player1_thinking_times if sign == 'X' else self.player2_thinking_times
-                thinking_times.append(time.time() - thinking_time_start)
+        else:
+            big_idx, small_idx = self.wait_for_ai_move(sign, player)
+            if self.reset:
+                return
 
-            else:
-                big_idx, small_idx = player.make_move(self.state, self.prev_small_idx)
-                box_x, box_y = idx_to_rc[big_idx][small_idx]
+            box_x, box_y = idx_to_rc[big_idx][small_idx]
 
         state, board_is_complete = StateUpdater.update_state(self.state, big_idx, small_idx, sign)
 
@@ -220,8 +276,173 @@ class GameUI:
             self.prev_small_idx = small_idx
 
         self.prev_move_made = (big_idx, small_idx)
+        self.history.push(self.state, self.prev_small_idx, self.prev_move_made, (self.player1, self.player2))
+
+        self.context.update_legal_moves(big_idx, small_idx, board_is_complete=board_is_complete)
+
+
+    def restore_position(self, position: tuple[tuple[dict, ...], int | None, tuple[int, int] | None]):
+        """
+        Make a position from the history the current one, with the search state of the players at it, and redraw
+        the board.
+
+        Arguments:
+            position: The state, the small index of the previous move made and the previous move made.
+        """
+
+        self.cancel_background_jobs()
+        self.hinted_move = None
+
+        self.state, self.prev_small_idx, self.prev_move_made = position
+        self.context.sync_legal_moves(self.state)
+        self.history.restore_player_states()
+
+        self.draw_position()
+
+
+    def undo(self):
+        """
+        Take back the last move made.
+
+        Raises:
+            IndexError: If no moves were made.
+        """
+
+        self.restore_position(self.history.undo())
+
+
+    def redo(self):
+        """
+        Make the last move taken back again.
+
+        Raises:
+            IndexError: If no moves were taken back.
+        """
+
+        self.restore_position(self.history.redo())
+
+
+    def go_to_ply(self, ply: int):
+        """
+        Go to the position after a number of moves. The moves after it can still be redone
+        until a new move is made.
+
+        Arguments:
+            ply: The number of moves made, 0 for the starting position.
+
+        Raises:
+            IndexError: If the game hasn't reached that ply.
+        """
+
+        self.restore_position(self.history.go_to(ply))
+
+
+    def wait_for_ai_move(self, sign: str, player: Player) -> tuple[int, int] | tuple[None, None]:
+        """
+        Let an AI player search in the background while the window keeps responding.
+
+        Arguments:
+            sign: X or O.
+            player: The AI player whose turn it is.
+
+        Returns:
+            The AI player's move or None if the game was reset while it was thinking.
+        """
+
+        state, prev_small_idx = self.state, self.prev_small_idx
+
+        def search() -> tuple[tuple[int, int], float]:
+            thinking_time_start = time.time()
+            move = player.make_move(state, prev_small_idx)
+            return move, time.time() - thinking_time_start
+
+        job = self.ai_worker.submit(search, players = (player,))
+
+        while not job.done():
+            self.check_for_quit()
+            self.update_buttons()
+            self.poll_background_jobs()
+
+            for event in pygame.event.get(pygame.MOUSEBUTTONUP):
+                click_sound.play()
+
+                self.check_for_button_click(event.pos, player)
+                if self.reset:
+                    return None, None
+
+            self.draw_thinking_indicator(sign)
+            RENDERER.end_frame()
+
+        self.draw_thinking_indicator(None)
+
+        if not self.ai_worker.is_current(job):
+            return None, None
+
+        move, thinking_time = job.result()
+
+        if self.measure_thinking_time:
+            thinking_times = self.player1_thinking_times if sign == 'X' else self.player2_thinking_times
+            thinking_times.append(thinking_time)
+
+        return move
+
+
+    def poll_background_jobs(self):
+        """
+        Animate the eval bar towards the newest evaluation and draw the results of finished hint jobs.
+        Hints are only drawn if they still match the current state.
+        """
+
+        if self.eval_job is not None and self.eval_job.done():
+            job, self.eval_job = self.eval_job, None
+
+            # Evaluations arrive through the analysis stream, the result only raises the analysis' errors.
+            if not job.cancelled():
+                job.result()
 
-        player.update_legal_moves(big_idx, small_idx, board_is_complete=board_is_complete)
+        self.animate_eval_bar()
+
+        if self.hint_job is not None and self.hint_job.done():
+            job, self.hint_job = self.hint_job, None
+
+            if self.ai_worker.is_current(job) and job.state is self.state and job.result():
+                b_idx, s_idx = job.result()
+                box_x, box_y = idx_to_rc[b_idx][s_idx]
+                self.hinted_move = (box_x, box_y)
+                self.draw_sign_on_box(box_x, box_y, job.sign)
+                self.cover_box(box_x, box_y, transparent = True)
+
+
+    def cancel_background_jobs(self):
+        """ Stop the AI's search and drop all pending eval bar and hint jobs. """
+
+        self.ai_worker.cancel()
+        self.analysis_id += 1
+        self.eval_job = None
+        self.hint_job = None
+
+
+    @staticmethod
+    def draw_thinking_indicator(sign: str | None):
+        """
+        Draw the pulsing dots shown above the board while an AI player is thinking.
+
+        Arguments:
+            sign: The sign of the thinking player or None to clear the indicator.
+        """
+
+        center_x, center_y = WINDOW_WIDTH // 2, Y_MARGIN // 2
+        area = pygame.Rect(center_x - 40, center_y - 10, 80, 20)
+
+        pygame.draw.rect(DISPLAY_SURF, BG_COLOR, area)
+
+        if sign is not None:
+            lit_dot = int(time.time() * 4) % 3
+            for i in range(3):
+                color = SIGN_COLORS[sign] if i == lit_dot else SMALL_LINE_COLOR
+                pygame.draw.circle(DISPLAY_SURF, color, (center_x + (i - 1) * 25, center_y), 6)
+
+        RENDERER.mark_dirty(area)
 
 
     def play(self):
@@ -232,10 +453,12 @@ class GameUI:
         else:
             self.reset = False
 
-        sign = 'X'
-        player = self.player1
+        sign = 'X' if self.history.ply % 2 == 0 else 'O'
+        player = self.player1 if sign == 'X' else self.player2
         move_start_time = None
 
+        self.context.bind_players(self.player1, self.player2)
+
         while not StateChecker.check_win(state = self.state, big_idx = 0):
             pygame.event.pump()
             self.check_for_quit()
@@ -273,8 +496,9 @@ class GameUI:
                 self.reset = False
                 continue
 
+            # The bar evaluates the new state, where the other player makes the first move.
             if self.use_eval_bar:
-                self.update_eval_bar(player, already_evaluated)
+                self.update_eval_bar(self.player2 if player == self.player1 else self.player1, already_evaluated)
 
             if self.prev_small_idx is not None:
                 self.draw_subgrid_at_board(self.prev_small_idx, OPPOSITE_SIGN_COLORS[sign])
@@ -285,8 +509,7 @@ class GameUI:
             sign = 'O' if sign == 'X' else 'X'
             player = self.player2 if player == self.player1 else self.player1
 
-            pygame.display.update()
-            FPS_CLOCK.tick(FPS)
+            RENDERER.end_frame()
 
         winning_sign = StateChecker.check_win(self.state, big_idx = 0)
 
@@ -298,19 +521,23 @@ class GameUI:
 
         for i in range(3):
             self.draw_big_grid(SIGN_COLORS[winning_sign])
+            RENDERER.present()
             pygame.time.wait(300)
             self.draw_big_grid(BIG_LINE_COLOR)
+            RENDERER.present()
             pygame.time.wait(300)
 
         if self.printing:
             self.print_board()
             print(f'WINNER: {winning_sign}')
+            print(f'Frame stats: {self.get_frame_stats()}')
 
         # Wait to quit:
         wait_to_exit = True
         while wait_to_exit:
             self.check_for_quit()
             self.update_buttons()
+            self.poll_background_jobs()
 
             for event in pygame.event.get(MOUSEBUTTONUP):
                 click_sound.play()
@@ -318,6 +545,8 @@ class GameUI:
                 if self.reset:
                     self.play()
 
+            RENDERER.end_frame()
+
 
     def reset_players(self):
         self.player1 = UserPlayer()
@@ -341,78 +570,62 @@ class GameUI:
             self.player1 = player_to_alter
             self.player1.set_sign('X')
 
+        self.context.bind_players(self.player1, self.player2)
+
 
     def show_title_screen(self):
         """ Displays the title and menu screens. """
 
         DISPLAY_SURF.blit(title_image, (0, 0))
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_all_dirty()
+
+        back_rect = pygame.Rect(CHOOSE_MENU_WIDGETS['back'])
 
         on_main_menu = True
         while on_main_menu:
-            one_player_rect = pygame.Rect(140, 510, 190, 41)
-            two_player_rect = pygame.Rect(540, 510, 230, 41)
-            # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, one_player_rect)
-            # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, two_player_rect)
-
             self.check_for_quit()
 
             for event in pygame.event.get(pygame.MOUSEMOTION):
-                mouse_x, mouse_y = event.pos
-                if one_player_rect.collidepoint(mouse_x, mouse_y):
+                widget = MAIN_MENU_HITS.widget_at(event.pos)
+                if widget == 'one_player':
                     DISPLAY_SURF.blit(title_image1, (0, 0))
-                elif two_player_rect.collidepoint(mouse_x, mouse_y):
+                elif widget == 'two_player':
                     DISPLAY_SURF.blit(title_image2, (0, 0))
                 else:
                     DISPLAY_SURF.blit(title_image, (0, 0))
 
-                pygame.display.update()
-                FPS_CLOCK.tick(FPS)
+                RENDERER.mark_all_dirty()
 
             for event in pygame.event.get(MOUSEBUTTONUP):
                 click_sound.play()
 
-                mouse_x, mouse_y = event.pos
-                if one_player_rect.collidepoint(mouse_x, mouse_y):
+                widget = MAIN_MENU_HITS.widget_at(event.pos)
+                if widget == 'one_player':
                     # user vs bot
                     on_choose_menu = True
                     selected_sign = None
                     selected_difficulty = None
                     DISPLAY_SURF.blit(choose_image, (0, 0))
                     DISPLAY_SURF.blit(button_back, (0, 0))
+                    RENDERER.mark_all_dirty()
                     while on_choose_menu:
                         self.check_for_quit()
 
-                        x_rect = pygame.Rect(295, 225, 90, 90)
-                        o_rect = pygame.Rect(505, 225, 90, 90)
-
-                        easy_rect = pygame.Rect(145, 510, 110, 46)
-                        normal_rect = pygame.Rect(360, 510, 185, 46)
-                        hard_rect = pygame.Rect(630, 510, 130, 46)
-
-                        back_rect = pygame.Rect(0, 0, 60, 60)
-                        # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, easy_rect)
-                        # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, normal_rect)
-                        # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, harf_rect)
-                        # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, x_rect)
-                        # pygame.draw.rect(DISPLAY_SURF, COLOR_WHITE, o_rect)
-
                         for event in pygame.event.get(MOUSEMOTION):
-                            mouse_x, mouse_y = event.pos
-                            if x_rect.collidepoint(mouse_x, mouse_y) and selected_sign is None:
+                            widget = CHOOSE_MENU_HITS.widget_at(event.pos)
+                            if widget == 'X' and selected_sign is None:
                                 DISPLAY_SURF.blit(choose_image_top_x, (0, 0))
                                 pygame.draw.rect(DISPLAY_SURF, BG_COLOR, back_rect)
                                 DISPLAY_SURF.blit(button_back, (0, 0))
-                            elif o_rect.collidepoint(mouse_x, mouse_y) and selected_sign is None:
+                            elif widget == 'O' and selected_sign is None:
                                 DISPLAY_SURF.blit(choose_image_top_o, (0, 0))
                                 pygame.draw.rect(DISPLAY_SURF, BG_COLOR, back_rect)
                                 DISPLAY_SURF.blit(button_back, (0, 0))
-                            elif easy_rect.collidepoint(mouse_x, mouse_y) and selected_difficulty is None:
+                            elif widget == 'easy' and selected_difficulty is None:
                                 DISPLAY_SURF.blit(choose_image_bottom_easy, (0, 351))
-                            elif normal_rect.collidepoint(mouse_x, mouse_y) and selected_difficulty is None:
+                            elif widget == 'normal' and selected_difficulty is None:
                                 DISPLAY_SURF.blit(choose_image_bottom_normal, (0, 351))
-                            elif hard_rect.collidepoint(mouse_x, mouse_y) and selected_difficulty is None:
+                            elif widget == 'hard' and selected_difficulty is None:
                                 DISPLAY_SURF.blit(choose_image_bottom_hard, (0, 351))
                             else:
                                 if selected_sign is None:
@@ -422,46 +635,48 @@ class GameUI:
                                 if selected_difficulty is None:
                                     DISPLAY_SURF.blit(choose_image_bottom, (0, 351))
 
-                                if back_rect.collidepoint(mouse_x, mouse_y):
+                                if widget == 'back':
                                     pygame.draw.rect(DISPLAY_SURF, BG_COLOR, back_rect)
                                     DISPLAY_SURF.blit(button_back_hover, (0, 0))
                                 else:
                                     pygame.draw.rect(DISPLAY_SURF, BG_COLOR, back_rect)
                                     DISPLAY_SURF.blit(button_back, (0, 0))
 
+                            RENDERER.mark_all_dirty()
+
                         for event in pygame.event.get(MOUSEBUTTONUP):
                             click_sound.play()
 
-                            mouse_x, mouse_y = event.pos
-                            if x_rect.collidepoint(mouse_x, mouse_y):
+                            widget = CHOOSE_MENU_HITS.widget_at(event.pos)
+                            if widget == 'X':
                                 selected_sign = 'X'
                                 DISPLAY_SURF.blit(choose_image_top_x, (0, 0))
                                 pygame.draw.rect(DISPLAY_SURF, BG_COLOR, back_rect)
                                 DISPLAY_SURF.blit(button_back, (0, 0))
-                            elif o_rect.collidepoint(mouse_x, mouse_y):
+                            elif widget == 'O':
                                 selected_sign = 'O'
                                 DISPLAY_SURF.blit(choose_image_top_o, (0, 0))
                                 pygame.draw.rect(DISPLAY_SURF, BG_COLOR, back_rect)
                                 DISPLAY_SURF.blit(button_back, (0, 0))
-                            elif easy_rect.collidepoint(mouse_x, mouse_y):
+                            elif widget == 'easy':
                                 selected_difficulty = 'easy'
                                 DISPLAY_SURF.blit(choose_image_bottom_easy, (0, 351))
-                            elif normal_rect.collidepoint(mouse_x, mouse_y):
+                            elif widget == 'normal':
                                 selected_difficulty = 'normal'
                                 DISPLAY_SURF.blit(choose_image_bottom_normal, (0, 351))
-                            elif hard_rect.collidepoint(mouse_x, mouse_y):
+                            elif widget == 'hard':
                                 selected_difficulty = 'hard'
                                 DISPLAY_SURF.blit(choose_image_bottom_hard, (0, 351))
-                            elif back_rect.collidepoint(mouse_x, mouse_y):
+                            elif widget == 'back':
                                 on_choose_menu = False
                                 on_main_menu = True
                                 DISPLAY_SURF.blit(title_image, (0, 0))
-                                pygame.display.update()
-                                FPS_CLOCK.tick(FPS)
+                                RENDERER.mark_all_dirty()
                                 break
 
-                        pygame.display.update()
-                        FPS_CLOCK.tick(FPS)
+                            RENDERER.mark_all_dirty()
+
+                        RENDERER.end_frame()
 
                         if selected_sign and selected_difficulty:
                             self.selected_sign = selected_sign
@@ -469,27 +684,31 @@ class GameUI:
 
                             self.reset_players()
 
+                            RENDERER.present()
                             pygame.time.wait(100)
                             self.draw_board()
                             on_choose_menu = False
                             on_main_menu = False
 
-                elif two_player_rect.collidepoint(mouse_x, mouse_y):
+                elif widget == 'two_player':
                     # user vs user
                     self.player1 = UserPlayer()
                     self.player1.set_sign('X')
                     self.player2 = UserPlayer()
                     self.player2.set_sign('O')
+                    self.context.bind_players(self.player1, self.player2)
 
                     self.draw_board()
                     on_main_menu = False
 
+            RENDERER.end_frame()
+
 
     @staticmethod
     def draw_buttons():
         """ Displays the buttons on the game screen. """
 
-        t, l = Y_MARGIN + 2 * SQUARE_SIZE, WINDOW_WIDTH - X_MARGIN + 1 * SQUARE_SIZE
+        t, l = BUTTONS_TOP, BUTTONS_LEFT
 
         bg_rect = pygame.Rect(l, t, SQUARE_SIZE, 5 * SQUARE_SIZE)
         pygame.draw.rect(DISPLAY_SURF, BG_COLOR, bg_rect)
@@ -503,37 +722,27 @@ class GameUI:
         DISPLAY_SURF.blit(button_reset, (l, t + 3 * SQUARE_SIZE))
         DISPLAY_SURF.blit(button_to_title, (l, t + 4 * SQUARE_SIZE))
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty(bg_rect)
 
 
     def update_buttons(self):
         """ Updates the buttons on the game screen. """
 
-        t, l = Y_MARGIN + 2 * SQUARE_SIZE, WINDOW_WIDTH - X_MARGIN + 1 * SQUARE_SIZE
-
-        hint_rect = pygame.Rect(l, t, 60, 55)
-        bar_rect = pygame.Rect(l, t + 1 * SQUARE_SIZE, 60, 55)
-
-        reset_rect = pygame.Rect(l, t + 3 * SQUARE_SIZE, 60, 55)
-        to_title_rect = pygame.Rect(l, t + 4 * SQUARE_SIZE, 60, 55)
+        t, l = BUTTONS_TOP, BUTTONS_LEFT
 
         for event in pygame.event.get(MOUSEMOTION):
-            mouse_x, mouse_y = event.pos
-            if hint_rect.collidepoint(mouse_x, mouse_y):
-                DISPLAY_SURF.blit(button_hint_hover, (l, t))
-            elif bar_rect.collidepoint(mouse_x, mouse_y):
-                DISPLAY_SURF.blit(button_bar_hover, (l, t + 1 * SQUARE_SIZE))
-            elif reset_rect.collidepoint(mouse_x, mouse_y):
-                DISPLAY_SURF.blit(button_reset_hover, (l, t + 3 * SQUARE_SIZE))
-            elif to_title_rect.collidepoint(mouse_x, mouse_y):
-                DISPLAY_SURF.blit(button_to_title_hover, (l, t + 4 * SQUARE_SIZE))
+            button = BUTTON_HITS.widget_at(event.pos)
+            if button == 'hint':
+                RENDERER.mark_dirty(DISPLAY_SURF.blit(button_hint_hover, (l, t)))
+            elif button == 'bar':
+                RENDERER.mark_dirty(DISPLAY_SURF.blit(button_bar_hover, (l, t + 1 * SQUARE_SIZE)))
+            elif button == 'reset':
+                RENDERER.mark_dirty(DISPLAY_SURF.blit(button_reset_hover, (l, t + 3 * SQUARE_SIZE)))
+            elif button == 'to_title':
+                RENDERER.mark_dirty(DISPLAY_SURF.blit(button_to_title_hover, (l, t + 4 * SQUARE_SIZE)))
             else:
                 self.draw_buttons()
 
-            pygame.display.update()
-            FPS_CLOCK.tick(FPS)
-
 
     def check_for_button_click(self, mouse_pos: tuple[int, int], player: Player):
         """ Checks weather a button was clicked and handles events accordingly.
@@ -543,51 +752,38 @@ class GameUI:
             player: Player whose turn it is.
         """
 
-        t, l = Y_MARGIN + 2 * SQUARE_SIZE, WINDOW_WIDTH - X_MARGIN + 1 * SQUARE_SIZE
-
-        hint_rect = pygame.Rect(l, t, 60, 55)
-        bar_rect = pygame.Rect(l, t + 1 * SQUARE_SIZE, 60, 55)
-
-        reset_rect = pygame.Rect(l, t + 3 * SQUARE_SIZE, 60, 55)
-        to_title_rect = pygame.Rect(l, t + 4 * SQUARE_SIZE, 60, 55)
+        button = BUTTON_HITS.widget_at(mouse_pos)
 
-        if bar_rect.collidepoint(mouse_pos):
+        if button == 'bar':
             self.use_eval_bar = False if self.use_eval_bar else True
             if self.use_eval_bar:
-                game_eval_score = self.game_evaluator.game_evaluation(self.state, self.prev_small_idx, player)
-                already_evaluated = game_eval_score or False
-                self.update_eval_bar(player, already_evaluated)
+                self.draw_eval_bar(self.eval_shown)
+                self.update_eval_bar(player)
             else:
                 GameUI.hide_eval_bar()
 
-        elif hint_rect.collidepoint(mouse_pos) and not StateChecker.check_win(self.state, big_idx = 0):
-            b_idx, s_idx = self.game_evaluator.get_best_move(self.state, self.prev_small_idx, player)
-            box_x, box_y = idx_to_rc[b_idx][s_idx]
-            self.hinted_move = (box_x, box_y)
-            self.draw_sign_on_box(box_x, box_y, player.sign)
-            self.cover_box(box_x, box_y, transparent = True)
+        elif button == 'hint' and isinstance(player, UserPlayer) \
+                and not StateChecker.check_win(self.state, big_idx = 0):
+            self.hint_job = self.ai_worker.submit(self.game_evaluator.get_best_move,
+                                                  self.state, self.prev_small_idx, player)
+            self.hint_job.state = self.state
+            self.hint_job.sign = player.sign
 
-        elif reset_rect.collidepoint(mouse_pos):
-            self.player1.reset_legal_moves()
-            self.player2.reset_legal_moves()
+        elif button == 'reset':
+            self.cancel_background_jobs()
             self.reset_players()
             self.reset_state()
             self.reset_board()
             self.reset = True
 
-        elif to_title_rect.collidepoint(mouse_pos):
-            self.player1.reset_legal_moves()
-            self.player2.reset_legal_moves()
+        elif button == 'to_title':
+            self.cancel_background_jobs()
             self.reset_state()
             self.use_eval_bar = False
             self.selected_sign = None
             self.selected_difficulty = None
             self.play()
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
-
-
 
     @staticmethod
     def hide_eval_bar():
@@ -598,23 +794,64 @@ class GameUI:
         W = 16
         H = 546
 
-        pygame.draw.rect(DISPLAY_SURF, BG_COLOR, (l, t, W, H))
-
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty(pygame.draw.rect(DISPLAY_SURF, BG_COLOR, (l, t, W, H)))
 
 
     def update_eval_bar(self, player: Player, eval_score: int | bool = None):
         """
-        Update the game evaluation bar.
+        Update the target of the game evaluation bar. Without a precalculated score, the state is analysed
+        in the background with iterative deepening and the target moves to each deeper evaluation as it completes.
 
         Arguments:
             player: The player object whose turn it is.
             eval_score: A precalculated evaluation score.
         """
 
-        game_score = eval_score if eval_score \
-            else self.game_evaluator.game_evaluation(self.state, self.prev_small_idx, player)
+        # The analysis of the previous state is outdated, so it's stopped and its evaluations are ignored.
+        if self.eval_job is not None:
+            self.ai_worker.stop(self.eval_job)
+            self.eval_job = None
+
+        self.analysis_id += 1
+        analysis_id = self.analysis_id
+
+        if eval_score:
+            self.eval_target = eval_score
+            return
+
+        def publish(depth: int, score: float):
+            if self.analysis_id == analysis_id:
+                self.eval_target = score
+
+        self.eval_job = self.ai_worker.submit(self.game_evaluator.stream_evaluation,
+                                              self.state, self.prev_small_idx, player, publish,
+                                              players = (self.game_evaluator.algorithm,))
+
+
+    def animate_eval_bar(self):
+        """ Move the eval bar a step closer to the newest evaluation. """
+
+        if not self.use_eval_bar or self.eval_shown == self.eval_target:
+            return
+
+        step = (self.eval_target - self.eval_shown) * EVAL_BAR_EASING
+        if abs(step) < EVAL_BAR_SNAP:
+            self.eval_shown = self.eval_target
+        else:
+            self.eval_shown += step
+
+        self.draw_eval_bar(self.eval_shown)
+
+
+    @staticmethod
+    def draw_eval_bar(game_score: float):
+        """
+        Draw the game evaluation bar.
+
+        Arguments:
+            game_score: The evaluation score for the current state.
+        """
+
         yellow_h = int((game_score + 1000) / 2000 * 546)
 
         t, l = Y_MARGIN - 3, X_MARGIN - 100
@@ -625,8 +862,7 @@ class GameUI:
         pygame.draw.rect(DISPLAY_SURF, COLOR_BLUE, (l, t, W, H))
         pygame.draw.rect(DISPLAY_SURF, COLOR_YELLOW, (l, t, W, yellow_h))
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty((l, t, W, H))
 
 
     def reset_board(self):
@@ -636,6 +872,19 @@ class GameUI:
         self.draw_buttons()
 
 
+    @staticmethod
+    def get_frame_stats() -> dict:
+        """
+        Get the frame time statistics of the window.
+
+        Returns:
+            The mean and maximum frame times in milliseconds, the number of frames that updated
+            the screen and the current frame rate.
+        """
+
+        return RENDERER.get_frame_stats()
+
+
     @staticmethod
     def check_for_quit():
         """ Check for quit event. """
@@ -684,13 +933,10 @@ class GameUI:
             The row and column of the box or None if not found.
         """
 
-        for box_x in range(BOARD_WIDTH):
-            for box_y in range(BOARD_HEIGHT):
-                left, top = GameUI.top_left_coords_of_box(box_x, box_y)
-                box_rect = pygame.Rect(left, top, SQUARE_SIZE, SQUARE_SIZE)
+        box_x, box_y = (y - Y_MARGIN) // SQUARE_SIZE, (x - X_MARGIN) // SQUARE_SIZE
 
-                if box_rect.collidepoint(x, y):
-                    return box_x, box_y
+        if 0 <= box_x < BOARD_WIDTH and 0 <= box_y < BOARD_HEIGHT:
+            return box_x, box_y
 
         return None, None
 
@@ -704,40 +950,14 @@ class GameUI:
             color: An RGB value of the grid color.
         """
 
-        WIDTH = 6
-        LENGTH = 9 * SQUARE_SIZE
-
-        # Big grid:
-        pygame.draw.rect(DISPLAY_SURF, color, (X_MARGIN + 3 * SQUARE_SIZE - 3, Y_MARGIN, WIDTH, LENGTH))
-        pygame.draw.rect(DISPLAY_SURF, color, (X_MARGIN + 6 * SQUARE_SIZE - 3, Y_MARGIN, WIDTH, LENGTH))
-        pygame.draw.rect(DISPLAY_SURF, color, (X_MARGIN, Y_MARGIN + 3 * SQUARE_SIZE - 3, LENGTH, WIDTH))
-        pygame.draw.rect(DISPLAY_SURF, color, (X_MARGIN, Y_MARGIN + 6 * SQUARE_SIZE - 3, LENGTH, WIDTH))
-
-        # Borders :
-        pygame.draw.rect(DISPLAY_SURF, color, (X_MARGIN - 3, Y_MARGIN - 3, LENGTH + 6, LENGTH + 6), WIDTH)
-
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty(DISPLAY_SURF.blit(SURFACES.get_big_grid(color), (X_MARGIN - 3, Y_MARGIN - 3)))
 
 
     @staticmethod
     def draw_grid():
         """ Update the surface display by drawing all the small grids and the big grid. """
 
-        # Sub-grids:
-        SUB_WIDTH = 4
-        SUB_LENGTH = 9 * SQUARE_SIZE
-
-        for i in (1, 2, 4, 5, 7, 8):
-            pygame.draw.rect(DISPLAY_SURF, SMALL_LINE_COLOR,
-                             (X_MARGIN + i * SQUARE_SIZE - 2, Y_MARGIN, SUB_WIDTH, SUB_LENGTH))
-            pygame.draw.rect(DISPLAY_SURF, SMALL_LINE_COLOR,
-                             (X_MARGIN, Y_MARGIN + i * SQUARE_SIZE - 2, SUB_LENGTH, SUB_WIDTH))
-
-        GameUI.draw_big_grid(BIG_LINE_COLOR)
-
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty(DISPLAY_SURF.blit(SURFACES.grid, (X_MARGIN - 3, Y_MARGIN - 3)))
 
 
     @staticmethod
@@ -747,9 +967,23 @@ class GameUI:
         DISPLAY_SURF.fill(BG_COLOR)
 
         GameUI.draw_grid()
+        RENDERER.mark_all_dirty()
+
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+    def draw_position(self):
+        """ Redraw the board with every sign of the current state, e.g. after going back in the history. """
+
+        self.draw_board()
+        self.draw_buttons()
+
+        for big_idx in range(1, 10):
+            for small_idx in range(1, 10):
+                sign = self.state[big_idx]['display'][small_idx]
+                if sign != '-':
+                    self.draw_sign_on_box(*idx_to_rc[big_idx][small_idx], sign)
+
+            if self.state[0]['display'][big_idx] != '-':
+                self.draw_sign_on_big_board(big_idx, self.state[0]['display'][big_idx], wait = False)
 
 
     @staticmethod
@@ -767,12 +1001,9 @@ class GameUI:
         if not transparent:
             pygame.draw.rect(DISPLAY_SURF, BG_COLOR, (l + 3, t + 3, SQUARE_SIZE - 6, SQUARE_SIZE - 6))
         else:
-            s = pygame.Surface((SQUARE_SIZE - 6, SQUARE_SIZE - 6), pygame.SRCALPHA)
-            s.fill((BG_COLOR[0], BG_COLOR[1], BG_COLOR[2], 200))
-            DISPLAY_SURF.blit(s, (l + 3, t + 3))
+            DISPLAY_SURF.blit(SURFACES.box_overlay, (l + 3, t + 3))
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty((l + 3, t + 3, SQUARE_SIZE - 6, SQUARE_SIZE - 6))
 
 
     def draw_sign_on_box(self, box_x: int, box_y: int, sign: str):
@@ -790,14 +1021,10 @@ class GameUI:
 
         l, t = GameUI.top_left_coords_of_box(box_x, box_y)
 
-        DISPLAY_SURF.blit(small_images[sign], (l + 2 + 5, t + 2 + 5))
-
-        if not self.hinted_move:
-            pygame.display.update()
-            FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty(DISPLAY_SURF.blit(small_images[sign], (l + 2 + 5, t + 2 + 5)))
 
 
-    def draw_sign_on_big_board(self, big_idx: int, sign: str):
+    def draw_sign_on_big_board(self, big_idx: int, sign: str, wait: bool = True):
         """
         Update the display surface by drawing the given sign on the specified board
         or dimming the board if it's tied.
@@ -805,10 +1032,12 @@ class GameUI:
         Arguments:
             big_idx: Board index.
             sign: The sign: X, O, or T.
+            wait: Whether to wait after the move before drawing.
         """
 
         # print(f"Drawing big {sign} on board: {big_idx}")
-        self.wait_after_move()
+        if wait:
+            self.wait_after_move()
 
         box_x, box_y = idx_to_rc[big_idx][1]
 
@@ -818,15 +1047,12 @@ class GameUI:
             pygame.draw.rect(DISPLAY_SURF, BG_COLOR, (l + 3, t + 3, 3 * SQUARE_SIZE - 6, 3 * SQUARE_SIZE - 6))
 
         else:
-            s = pygame.Surface((3 * SQUARE_SIZE - 6, 3 * SQUARE_SIZE - 6), pygame.SRCALPHA)
-            s.fill((BG_COLOR[0], BG_COLOR[1], BG_COLOR[2], 200))
-            DISPLAY_SURF.blit(s, (l + 3, t + 3))
+            DISPLAY_SURF.blit(SURFACES.board_overlay, (l + 3, t + 3))
 
         if sign != 'T':
             DISPLAY_SURF.blit(big_images[sign], (l + 3 + 10, t + 3 + 10))
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty((l + 3, t + 3, 3 * SQUARE_SIZE - 6, 3 * SQUARE_SIZE - 6))
 
 
     @staticmethod
@@ -842,17 +1068,15 @@ class GameUI:
         box_x, box_y = idx_to_rc[big_idx][1]
         l, t = GameUI.top_left_coords_of_box(box_x, box_y)
 
-        SUB_WIDTH = 4
         SUB_LENGTH = SQUARE_SIZE * 3
 
-        for i in (1, 2):
-            pygame.draw.rect(DISPLAY_SURF, color, (l + i * SQUARE_SIZE - 2, t, SUB_WIDTH, SUB_LENGTH))
-            pygame.draw.rect(DISPLAY_SURF, color, (l, t + i * SQUARE_SIZE - 2, SUB_LENGTH, SUB_WIDTH))
+        DISPLAY_SURF.blit(SURFACES.get_sub_grid(color), (l, t))
 
-        GameUI.draw_big_grid(BIG_LINE_COLOR)
+        # The sub-grid lines run into the big grid, so only the big grid around this board is redrawn.
+        area = SURFACES.grid_area(l - 3, t - 3, SUB_LENGTH + 6, SUB_LENGTH + 6)
+        DISPLAY_SURF.blit(SURFACES.get_big_grid(BIG_LINE_COLOR), (l - 3, t - 3), area)
 
-        pygame.display.update()
-        FPS_CLOCK.tick(FPS)
+        RENDERER.mark_dirty((l - 3, t - 3, SUB_LENGTH + 6, SUB_LENGTH + 6))
 
 
 __all__ = ['GameUI']
\ No newline at end of file
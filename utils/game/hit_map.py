@@ -0,0 +1,52 @@
+class HitMap:
+    """
+    Class mapping pixels of the window to the widgets drawn over them.
+
+    Every pixel holds the index of its widget in a precomputed lookup grid,
+    so finding the widget under the mouse takes a single lookup regardless of the number of widgets.
+    """
+
+    def __init__(self, width: int, height: int, widgets: dict[str, tuple[int, int, int, int]]):
+        """
+        Create an instance of the HitMap class.
+
+        Arguments:
+            width: Width of the window.
+            height: Height of the window.
+            widgets: The areas of the widgets, in (left, top, width, height) format, by their names.
+                Widgets listed later are on top of the ones listed earlier.
+        """
+
+        self.width = width
+        self.height = height
+
+        self.names = [None, *widgets]
+        self.grid = bytearray(width * height)
+
+        for widget_idx, (left, top, w, h) in enumerate(widgets.values(), start = 1):
+            left, right = max(left, 0), min(left + w, width)
+            row = bytes([widget_idx]) * (right - left)
+
+            for y in range(max(top, 0), min(top + h, height)):
+                self.grid[y * width + left:y * width + right] = row
+
+
+    def widget_at(self, pos: tuple[int, int]) -> str | None:
+        """
+        Get the widget at the given pixel.
+
+        Arguments:
+            pos: The pixel coordinates.
+
+        Returns:
+            The name of the widget or None if there's no widget at the pixel.
+        """
+
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.names[self.grid[y * self.width + x]]
+
+        return None
+
+
+__all__ = ['HitMap']
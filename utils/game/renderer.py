@@ -0,0 +1,104 @@
+import collections
+import time
+
+import pygame
+
+
+FRAME_TIME_WINDOW = 240
+
+
+class Renderer:
+    """
+    Class collecting the areas of the window drawn during a frame and presenting them at once.
+
+    Drawing helpers only mark the rects they changed, the game loop calls end_frame once per
+    iteration to push all of them to the screen with a single display update and keep the
+    loop at the target frame rate.
+    """
+
+    def __init__(self, fps: int):
+        """
+        Create an instance of the Renderer class.
+
+        Arguments:
+            fps: The target frame rate.
+        """
+
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+        self.dirty_rects = []
+        self.full_update = False
+
+        self.frame_times = collections.deque(maxlen = FRAME_TIME_WINDOW)
+        self.frames_presented = 0
+        self.frame_start_time = time.perf_counter()
+
+
+    def mark_dirty(self, *rects: pygame.Rect | tuple[int, int, int, int]):
+        """
+        Mark areas of the window as changed in the current frame.
+
+        Arguments:
+            rects: The changed areas.
+        """
+
+        self.dirty_rects.extend(rects)
+
+
+    def mark_all_dirty(self):
+        """ Mark the whole window as changed in the current frame. """
+
+        self.full_update = True
+
+
+    def present(self):
+        """ Push the changed areas to the screen. """
+
+        if self.full_update:
+            pygame.display.update()
+
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+
+        else:
+            return
+
+        self.dirty_rects.clear()
+        self.full_update = False
+        self.frames_presented += 1
+
+
+    def end_frame(self):
+        """ Present the frame, record how long it took and wait for the next one. """
+
+        self.present()
+        self.frame_times.append(time.perf_counter() - self.frame_start_time)
+
+        self.clock.tick(self.fps)
+        self.frame_start_time = time.perf_counter()
+
+
+    def get_frame_stats(self) -> dict:
+        """
+        Summarize the most recent frames.
+
+        Returns:
+            The mean and maximum time spent in a frame, without waiting for the next one,
+            in milliseconds, the number of frames that updated the screen and the current frame rate.
+        """
+
+        if not self.frame_times:
+            return {'frame_ms': None, 'frames_presented': self.frames_presented, 'fps': 0.0}
+
+        return {
+            'frame_ms': {
+                'mean': round(sum(self.frame_times) / len(self.frame_times) * 1000, 3),
+                'max': round(max(self.frame_times) * 1000, 3),
+            },
+            'frames_presented': self.frames_presented,
+            'fps': round(self.clock.get_fps(), 1),
+        }
+
+
+__all__ = ['Renderer']
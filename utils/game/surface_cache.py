@@ -0,0 +1,194 @@
+import pygame
+
+from . import game_ui_assets
+from .game_ui_assets import SQUARE_SIZE, X_MARGIN, Y_MARGIN
+
+
+BOARD_LENGTH = 9 * SQUARE_SIZE
+OVERLAY_ALPHA = 200
+
+# Fills the transparent parts of the grid layers, whose blits are run-length encoded.
+COLOR_KEY = (255, 0, 255)
+
+
+class SurfaceCache:
+    """
+    Class holding the surfaces the game UI composites its frames from.
+
+    Images are converted to the display's pixel format once and the static parts of the board,
+    the grid, the dimming overlays and the colored sub-grids, are rendered once per theme,
+    so drawing them during the game only takes a blit.
+    """
+
+    def __init__(self):
+        """ Create an instance of the SurfaceCache class. """
+
+        self.grid = None
+        self.big_grids = {}
+        self.sub_grids = {}
+
+        self.box_overlay = None
+        self.board_overlay = None
+
+        self.bg_color = None
+        self.big_line_color = None
+        self.small_line_color = None
+
+
+    @staticmethod
+    def convert_images() -> dict:
+        """
+        Convert all images loaded by the assets module to the display's pixel format.
+        The display has to be created first.
+
+        Returns:
+            The converted images by their names in the assets module.
+        """
+
+        images = {
+            name: value.convert_alpha()
+            for name, value in vars(game_ui_assets).items() if isinstance(value, pygame.Surface)
+        }
+
+        images['big_images'] = {'X': images['x_img_big'], 'O': images['o_img_big']}
+        images['small_images'] = {'X': images['x_img_small'], 'O': images['o_img_small']}
+
+        return images
+
+
+    def build(self, bg_color: tuple[int, int, int], big_line_color: tuple[int, int, int],
+              small_line_color: tuple[int, int, int]):
+        """
+        Render the static board layers for the given theme.
+
+        Arguments:
+            bg_color: An RGB value of the background color.
+            big_line_color: An RGB value of the big grid color.
+            small_line_color: An RGB value of the small grids color.
+        """
+
+        self.bg_color = bg_color
+        self.big_line_color = big_line_color
+        self.small_line_color = small_line_color
+
+        self.big_grids.clear()
+        self.sub_grids.clear()
+
+        self.box_overlay = self.render_overlay(SQUARE_SIZE - 6)
+        self.board_overlay = self.render_overlay(3 * SQUARE_SIZE - 6)
+
+        # Sub-grids, then the big grid over them, offset by the width of the border:
+        self.grid = pygame.Surface((BOARD_LENGTH + 6, BOARD_LENGTH + 6)).convert()
+        self.grid.fill(bg_color)
+
+        for i in (1, 2, 4, 5, 7, 8):
+            pygame.draw.rect(self.grid, small_line_color, (3 + i * SQUARE_SIZE - 2, 3, 4, BOARD_LENGTH))
+            pygame.draw.rect(self.grid, small_line_color, (3, 3 + i * SQUARE_SIZE - 2, BOARD_LENGTH, 4))
+
+        self.grid.blit(self.get_big_grid(big_line_color), (0, 0))
+
+
+    def render_overlay(self, length: int) -> pygame.Surface:
+        """
+        Render a translucent square in the background color, used for dimming boxes and boards.
+
+        Arguments:
+            length: The side length of the square.
+
+        Returns:
+            The overlay surface.
+        """
+
+        overlay = pygame.Surface((length, length), pygame.SRCALPHA)
+        overlay.fill((self.bg_color[0], self.bg_color[1], self.bg_color[2], OVERLAY_ALPHA))
+
+        return overlay.convert_alpha()
+
+
+    @staticmethod
+    def render_keyed(size: tuple[int, int]) -> pygame.Surface:
+        """
+        Create a surface in the display's format whose unpainted parts are left out when it's blitted.
+
+        Arguments:
+            size: The width and height of the surface.
+
+        Returns:
+            The empty surface.
+        """
+
+        surface = pygame.Surface(size).convert()
+        surface.fill(COLOR_KEY)
+        surface.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+
+        return surface
+
+
+    def get_big_grid(self, color: tuple[int, int, int]) -> pygame.Surface:
+        """
+        Get the big grid and its border in the given color, rendered on a transparent surface
+        whose top left corner is 3 pixels above and to the left of the board.
+
+        Arguments:
+            color: An RGB value of the grid color.
+
+        Returns:
+            The big grid surface.
+        """
+
+        if color not in self.big_grids:
+            big_grid = self.render_keyed((BOARD_LENGTH + 6, BOARD_LENGTH + 6))
+
+            for i in (3, 6):
+                pygame.draw.rect(big_grid, color, (i * SQUARE_SIZE, 3, 6, BOARD_LENGTH))
+                pygame.draw.rect(big_grid, color, (3, i * SQUARE_SIZE, BOARD_LENGTH, 6))
+
+            pygame.draw.rect(big_grid, color, (0, 0, BOARD_LENGTH + 6, BOARD_LENGTH + 6), 6)
+
+            self.big_grids[color] = big_grid
+
+        return self.big_grids[color]
+
+
+    def get_sub_grid(self, color: tuple[int, int, int]) -> pygame.Surface:
+        """
+        Get the lines of a small board's grid in the given color, rendered on a transparent surface.
+
+        Arguments:
+            color: An RGB value of the grid color.
+
+        Returns:
+            The sub-grid surface.
+        """
+
+        if color not in self.sub_grids:
+            sub_grid = self.render_keyed((3 * SQUARE_SIZE, 3 * SQUARE_SIZE))
+
+            for i in (1, 2):
+                pygame.draw.rect(sub_grid, color, (i * SQUARE_SIZE - 2, 0, 4, 3 * SQUARE_SIZE))
+                pygame.draw.rect(sub_grid, color, (0, i * SQUARE_SIZE - 2, 3 * SQUARE_SIZE, 4))
+
+            self.sub_grids[color] = sub_grid
+
+        return self.sub_grids[color]
+
+
+    @staticmethod
+    def grid_area(left: int, top: int, width: int, height: int) -> pygame.Rect:
+        """
+        Get the part of a grid layer covering the given area of the window.
+
+        Arguments:
+            left: X-coordinate of the area.
+            top: Y-coordinate of the area.
+            width: Width of the area.
+            height: Height of the area.
+
+        Returns:
+            The area in the grid layer's coordinates.
+        """
+
+        return pygame.Rect(left - X_MARGIN + 3, top - Y_MARGIN + 3, width, height)
+
+
+__all__ = ['SurfaceCache']
@@ -1,6 +1,13 @@
 from .assets import *
+from .evaluator_registry import *
 from .state_checker import *
 from .state_evaluator import *
 from .state_evaluator_v2 import *
 from .state_updater import *
+from .move_generator import *
+from .board_table import *
+from .position_codec import *
+from .game_history import *
 from .game_evaluator import *
+from .engine_context import *
+from .ai_worker import *
@@ -0,0 +1,132 @@
+import queue
+import threading
+
+from concurrent.futures import Future
+from typing import Callable
+
+from utils.players import Player
+
+
+class AIWorker:
+    """
+    Class for running AI searches and evaluations in a background thread.
+
+    Jobs run one at a time in the order they were submitted, so a game loop can keep drawing
+    frames and handling events while waiting for them. Cancelling bumps the worker's generation:
+    queued jobs from an older generation are skipped, a running search is asked to stop early,
+    and their results can be told apart from current ones with is_current.
+    """
+
+    def __init__(self):
+        """ Create an instance of the AIWorker class and start its thread. """
+
+        self.jobs = queue.SimpleQueue()
+        self.generation = 0
+        self.active_job = None
+        self.active_players = ()
+
+        # Guards the active job, so stopping one job never reaches the players of the next.
+        self.lock = threading.Lock()
+
+        # A daemon thread, so quitting the game in the middle of a deep search doesn't hang.
+        self.thread = threading.Thread(target = self.run, name = 'ai-worker', daemon = True)
+        self.thread.start()
+
+
+    def submit(self, function: Callable, *args, players: tuple[Player, ...] = ()) -> Future:
+        """
+        Queue a job for the background thread.
+
+        Arguments:
+            function: The function to run.
+            args: The arguments for the function.
+            players: The players searching during the job, they are asked to stop when cancelling. None is skipped.
+
+        Returns:
+            A future holding the function's result, or None if the job was skipped.
+        """
+
+        future = Future()
+        future.generation = self.generation
+        self.jobs.put((future, function, args, tuple(player for player in players if player is not None)))
+
+        return future
+
+
+    def is_current(self, future: Future) -> bool:
+        """
+        Check whether a job was submitted after the last cancellation.
+
+        Arguments:
+            future: The future returned when submitting the job.
+
+        Returns:
+            True if the job's result is still wanted, False otherwise.
+        """
+
+        return future.generation == self.generation
+
+
+    def cancel(self):
+        """ Skip all queued jobs and ask the running search to stop early. """
+
+        self.generation += 1
+
+        with self.lock:
+            for player in self.active_players:
+                player.cancel_search()
+
+
+    def stop(self, future: Future):
+        """
+        Skip a single queued job or ask it to stop early if it's running, leaving the other jobs alone.
+
+        Arguments:
+            future: The future returned when submitting the job.
+        """
+
+        if future.cancel():
+            return
+
+        with self.lock:
+            if self.active_job is future:
+                for player in self.active_players:
+                    player.cancel_search()
+
+
+    def run(self):
+        """ Run queued jobs until the program exits. """
+
+        while True:
+            future, function, args, players = self.jobs.get()
+
+            # Anything failing from here on is the job's result, an exception escaping would end the thread for good.
+            try:
+                with self.lock:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    self.active_job, self.active_players = future, players
+                    for player in players:
+                        player.search_cancelled = False
+
+                if self.is_current(future):
+                    future.set_result(function(*args))
+                else:
+                    future.set_result(None)
+
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+
+            finally:
+                with self.lock:
+                    self.active_job, self.active_players = None, ()
+                    for player in players:
+                        try:
+                            player.search_cancelled = False
+                        except Exception:
+                            pass
+
+
+__all__ = ['AIWorker']
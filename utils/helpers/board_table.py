@@ -0,0 +1,242 @@
+import array
+import mmap
+import sys
+
+from .assets import magic_square
+from .state_checker import StateChecker
+
+
+BOARD_CODES = 3 ** 9
+POWERS = (None,) + tuple(3 ** (small_idx - 1) for small_idx in range(1, 10))
+DIGITS = {'-': 0, 'X': 1, 'O': 2}
+SIGNS = ('-', 'X', 'O')
+
+# Board statuses, the same order as the digits of the winning sign.
+OPEN, X_WON, O_WON, TIED = 0, 1, 2, 3
+STATUS_SIGNS = (False, 'X', 'O', 'T')
+
+NO_MOVE = 0xFFFF
+
+FILE_MAGIC = b'UTTTBT01'
+HEADER_SIZE = 16
+
+
+class BoardTable:
+    """
+    Class holding every small board configuration and the transitions between them.
+
+    A board is encoded as the integer sum of digit * 3 ** (small_idx - 1), where a digit is 0 for an
+    empty space, 1 for X and 2 for O. All tables are flat arrays indexed by codes:
+        - next_codes[(code * 9 + small_idx - 1) * 2 + (sign == 'O')] | The code after the move, NO_MOVE
+          if the space is taken or the board is complete.
+        - empty_masks[code] | A 9-bit mask where bit (small_idx - 1) is set if the position is empty,
+          0 if the board is complete.
+        - statuses[code] | OPEN, X_WON, O_WON or TIED.
+    """
+
+    default = None
+
+
+    def __init__(self, next_codes, empty_masks, statuses, source: mmap.mmap = None):
+        """
+        Create an instance of the BoardTable class.
+
+        Arguments:
+            next_codes: The transition table.
+            empty_masks: The empty spaces of every board.
+            statuses: The status of every board.
+            source: The memory-mapped file the tables are read from, if any.
+        """
+
+        self.next_codes = next_codes
+        self.empty_masks = empty_masks
+        self.statuses = statuses
+        self.source = source
+
+
+    @staticmethod
+    def encode(board_display: tuple[str, ...]) -> int:
+        """
+        Encode a board display.
+
+        Arguments:
+            board_display: The board display, with an unused element at index 0.
+
+        Returns:
+            The board code.
+        """
+
+        return sum(DIGITS[board_display[small_idx]] * POWERS[small_idx] for small_idx in range(1, 10))
+
+
+    @staticmethod
+    def decode(code: int) -> tuple[str, ...]:
+        """
+        Decode a board code.
+
+        Arguments:
+            code: The board code.
+
+        Returns:
+            The board display, with "/" at index 0.
+        """
+
+        return ('/',) + tuple(SIGNS[code // POWERS[small_idx] % 3] for small_idx in range(1, 10))
+
+
+    @staticmethod
+    def get_status(code: int) -> int:
+        """
+        Work out the status of a board with the same rules as StateChecker.check_win.
+
+        Arguments:
+            code: The board code.
+
+        Returns:
+            OPEN, X_WON, O_WON or TIED.
+        """
+
+        display = BoardTable.decode(code)
+        positions = {sign: tuple(magic_square[small_idx] for small_idx in range(1, 10) if display[small_idx] == sign)
+                     for sign in ('X', 'O')}
+
+        for sign, status in (('X', X_WON), ('O', O_WON)):
+            if len(positions[sign]) >= 3 and StateChecker.check_win_helper(sign, positions[sign]):
+                return status
+
+        return OPEN if '-' in display else TIED
+
+
+    @staticmethod
+    def build() -> 'BoardTable':
+        """
+        Compute the tables for every board configuration.
+
+        Returns:
+            The board table, held in memory.
+        """
+
+        statuses = array.array('B', (BoardTable.get_status(code) for code in range(BOARD_CODES)))
+        empty_masks = array.array('H', bytes(2 * BOARD_CODES))
+        next_codes = array.array('H', [NO_MOVE]) * (BOARD_CODES * 18)
+
+        for code in range(BOARD_CODES):
+            if statuses[code] != OPEN:
+                continue
+
+            for small_idx in range(1, 10):
+                if code // POWERS[small_idx] % 3:
+                    continue
+
+                empty_masks[code] |= 1 << (small_idx - 1)
+                idx = (code * 9 + small_idx - 1) * 2
+                next_codes[idx] = code + POWERS[small_idx]
+                next_codes[idx + 1] = code + 2 * POWERS[small_idx]
+
+        return BoardTable(next_codes, empty_masks, statuses)
+
+
+    def save(self, path: str):
+        """
+        Write the tables to a file that can be memory-mapped with load.
+
+        Arguments:
+            path: The file path.
+        """
+
+        header = FILE_MAGIC + (b'L' if sys.byteorder == 'little' else b'B')
+
+        with open(path, 'wb') as table_file:
+            table_file.write(header.ljust(HEADER_SIZE, b'\0'))
+            for table in (self.next_codes, self.empty_masks, self.statuses):
+                table_file.write(bytes(table))
+
+
+    @staticmethod
+    def load(path: str) -> 'BoardTable':
+        """
+        Memory-map the tables written by save. The file's pages are shared by every process loading it.
+
+        Arguments:
+            path: The file path.
+
+        Returns:
+            The board table, read from the file.
+
+        Raises:
+            ValueError: If the file isn't a board table or was written on a machine with another byte order.
+        """
+
+        with open(path, 'rb') as table_file:
+            source = mmap.mmap(table_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        header = source[:HEADER_SIZE]
+        expected_size = HEADER_SIZE + BOARD_CODES * (18 * 2 + 2 + 1)
+
+        if not header.startswith(FILE_MAGIC) or len(source) != expected_size:
+            source.close()
+            raise ValueError(f'{path} is not a board table')
+
+        if header[len(FILE_MAGIC):len(FILE_MAGIC) + 1] != (b'L' if sys.byteorder == 'little' else b'B'):
+            source.close()
+            raise ValueError(f'{path} was written with another byte order')
+
+        view = memoryview(source)
+        masks_start = HEADER_SIZE + BOARD_CODES * 18 * 2
+        statuses_start = masks_start + BOARD_CODES * 2
+
+        return BoardTable(view[HEADER_SIZE:masks_start].cast('H'),
+                          view[masks_start:statuses_start].cast('H'),
+                          view[statuses_start:], source)
+
+
+    def close(self):
+        """ Release the memory-mapped file, if the tables are read from one. """
+
+        if self.source is not None:
+            for table in (self.next_codes, self.empty_masks, self.statuses):
+                table.release()
+
+            self.source.close()
+            self.source = None
+
+
+    @staticmethod
+    def get_default() -> 'BoardTable':
+        """
+        Get the shared board table, building it on first use.
+
+        Returns:
+            The board table.
+        """
+
+        if BoardTable.default is None:
+            BoardTable.default = BoardTable.build()
+
+        return BoardTable.default
+
+
+    def apply_move(self, code: int, small_idx: int, sign: str) -> tuple[int, int]:
+        """
+        Make a move on a board.
+
+        Arguments:
+            code: The board code.
+            small_idx: Position of the move on the board.
+            sign: Sign of the player making the move.
+
+        Returns:
+            The board code after the move and its status.
+
+        Raises:
+            ValueError: If the position is taken or the board is complete.
+        """
+
+        next_code = self.next_codes[(code * 9 + small_idx - 1) * 2 + (sign == 'O')]
+        if next_code == NO_MOVE:
+            raise ValueError(f'illegal move at {small_idx} on board {code}')
+
+        return next_code, self.statuses[next_code]
+
+
+__all__ = ['BoardTable', 'OPEN', 'X_WON', 'O_WON', 'TIED', 'STATUS_SIGNS', 'NO_MOVE']
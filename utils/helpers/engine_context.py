@@ -0,0 +1,83 @@
+from .game_evaluator import GameEvaluator
+from utils.players import Player
+
+
+class EngineContext:
+    """
+    Class holding the engine state of a single game.
+
+    Every game gets its own legal moves tracking and its own game evaluator,
+    so several games can run in separate threads or tasks without interfering.
+    The StateChecker and StateEvaluator caches stay shared between contexts since they only
+    memoize pure functions of a board display and are safe to read and fill from any game.
+    """
+
+    def __init__(self, evaluator_algorithm: Player = None):
+        """
+        Create an instance of the EngineContext class.
+
+        Arguments:
+            evaluator_algorithm: Which algorithm this context's GameEvaluator uses.
+                None uses GameEvaluator.get_default_algorithm.
+        """
+
+        self.legal_moves = []
+        self.reset_legal_moves()
+
+        if evaluator_algorithm is None:
+            evaluator_algorithm = GameEvaluator.get_default_algorithm()
+
+        self.game_evaluator = GameEvaluator(evaluator_algorithm, shared = False)
+
+
+    def reset_legal_moves(self):
+        """ Reset the legal moves list in place, keeping it shared with the bound players. """
+
+        self.legal_moves[:] = [[]] + [[i for i in range(1, 10)] for _ in range(1, 10)]
+
+
+    def sync_legal_moves(self, state: tuple[dict, ...]):
+        """
+        Rebuild the legal moves list in place from a state, e.g. after going back in a game's history.
+
+        Arguments:
+            state: The state to take the legal moves from.
+        """
+
+        self.legal_moves[:] = [[]] + [
+            [] if state[0]['display'][big_idx] != '-' else
+            [small_idx for small_idx in range(1, 10) if state[big_idx]['display'][small_idx] == '-']
+            for big_idx in range(1, 10)
+        ]
+
+
+    def update_legal_moves(self, big_idx: int, small_idx: int, board_is_complete: bool = False):
+        """
+        Remove all moves that will be illegal for the rest of the game.
+
+        Arguments:
+             big_idx: Board index.
+             small_idx: Position index.
+             board_is_complete: Whether the board at big_idx is completed.
+        """
+
+        if board_is_complete:
+            self.legal_moves[big_idx].clear()
+
+        else:
+            self.legal_moves[big_idx].remove(small_idx)
+
+
+    def bind_players(self, *players: Player):
+        """
+        Make the given players track legal moves through this context.
+
+        Arguments:
+            players: The players taking part in the game.
+        """
+
+        for player in players:
+            player.set_context(self)
+
+
+__all__ = ['EngineContext']
@@ -0,0 +1,164 @@
+import importlib
+
+from abc import ABC, abstractmethod
+from typing import Callable
+
+
+DEFAULT_EVALUATOR = 'v1'
+
+
+class Evaluator(ABC):
+    """
+    Abstract class representing a heuristic for game states.
+
+    Capabilities:
+        - incremental | The evaluation can be updated from the previous state's after a single move.
+        - batched | Many states are evaluated faster together than one by one with heuristic_batch.
+        - table_based | Evaluations are looked up in precomputed or memoized tables.
+    """
+
+    name = None
+    incremental = False
+    batched = False
+    table_based = False
+
+
+    @abstractmethod
+    def heuristic(self, state: tuple[dict, ...], next_big_idx: int | None, sign: str) -> float:
+        """
+        Evaluate the given state.
+
+        Arguments:
+            state: A game state.
+            next_big_idx: Board index where the next player makes a move, or None if any move is possible.
+            sign: The sign to evaluate for.
+
+        Returns:
+            The heuristic value for the state being evaluated, positive if it favors X.
+        """
+
+
+    def heuristic_batch(self, states: list[tuple[tuple[dict, ...], int | None, str]]) -> list[float]:
+        """
+        Evaluate several states.
+
+        Arguments:
+            states: The states, each with its next board index and the sign to evaluate for.
+
+        Returns:
+            The heuristic values, in the order of the states.
+        """
+
+        return [self.heuristic(state, next_big_idx, sign) for state, next_big_idx, sign in states]
+
+
+    def get_capabilities(self) -> dict:
+        """
+        Get the capabilities the evaluator declares.
+
+        Returns:
+            Whether the evaluator is incremental, batched and table-based.
+        """
+
+        return {'incremental': self.incremental, 'batched': self.batched, 'table_based': self.table_based}
+
+
+    def __reduce__(self):
+        # Evaluators are sent to worker processes with the players using them. Only the name is sent,
+        # so the worker uses its own instance and tables instead of a copy of this process' ones.
+        return EvaluatorRegistry.get_evaluator, (self.name,)
+
+
+class EvaluatorRegistry:
+    """ Helper class for selecting evaluators by name. """
+
+    evaluators = {}
+    instances = {}
+    modules = {}
+
+
+    @staticmethod
+    def register(name: str) -> Callable[[type], type]:
+        """
+        Register an evaluator class under the given name.
+
+        Arguments:
+            name: The name to select the evaluator with.
+
+        Returns:
+            A class decorator registering the decorated class.
+
+        Raises:
+            ValueError: If the name is already taken by another class.
+        """
+
+        def decorator(evaluator_class: type) -> type:
+            if EvaluatorRegistry.evaluators.get(name, evaluator_class) is not evaluator_class:
+                raise ValueError(f'evaluator {name!r} is already registered')
+
+            evaluator_class.name = name
+            EvaluatorRegistry.evaluators[name] = evaluator_class
+            return evaluator_class
+
+        return decorator
+
+
+    @staticmethod
+    def register_module(name: str, module: str):
+        """
+        Register an evaluator by the module defining it, which is only imported when the evaluator is first selected.
+        Keeps heavy dependencies, e.g. NumPy, from being imported with the engine.
+
+        Arguments:
+            name: The name to select the evaluator with.
+            module: The absolute name of the module registering the evaluator class under the name.
+        """
+
+        EvaluatorRegistry.modules[name] = module
+
+
+    @staticmethod
+    def get_evaluator(name: str = DEFAULT_EVALUATOR) -> Evaluator:
+        """
+        Get the instance of the evaluator registered under the given name.
+
+        Arguments:
+            name: The name of the evaluator.
+
+        Returns:
+            The evaluator, shared by everyone selecting it.
+
+        Raises:
+            ValueError: If no evaluator is registered under the name.
+        """
+
+        if name not in EvaluatorRegistry.instances:
+            if name not in EvaluatorRegistry.evaluators and name in EvaluatorRegistry.modules:
+                importlib.import_module(EvaluatorRegistry.modules[name])
+
+            if name not in EvaluatorRegistry.evaluators:
+                raise ValueError(f'unknown evaluator {name!r}, '
+                                 f'choose one of {", ".join(EvaluatorRegistry.get_names())}')
+
+            EvaluatorRegistry.instances[name] = EvaluatorRegistry.evaluators[name]()
+
+        return EvaluatorRegistry.instances[name]
+
+
+    @staticmethod
+    def get_names() -> list[str]:
+        """
+        Get the names of all registered evaluators.
+
+        Returns:
+            The names, in the order they were registered, followed by the ones whose module isn't imported yet.
+        """
+
+        return list(EvaluatorRegistry.evaluators) + \
+            [name for name in EvaluatorRegistry.modules if name not in EvaluatorRegistry.evaluators]
+
+
+EvaluatorRegistry.register_module('learned', 'utils.helpers.learned_evaluator')
+
+
+__all__ = ['Evaluator', 'EvaluatorRegistry', 'DEFAULT_EVALUATOR']
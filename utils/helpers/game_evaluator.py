@@ -1,9 +1,19 @@
-from .state_evaluator import StateEvaluator
+import copy
+import time
+
+from typing import Callable
+
+from .state_checker import StateChecker
 from .state_updater import StateUpdater
+from .move_generator import MoveGenerator, MOVES
 from utils.players import Player
 
 
-StateEvaluator = StateEvaluator()
+StateChecker = StateChecker()
+
+TOP_MOVES = 3
+MAX_CACHED_ANALYSES = 4096
+MAX_TABLE_ENTRIES = 1_000_000
 
 
 class GameEvaluator:
@@ -12,71 +22,325 @@ class GameEvaluator:
     _instance = None
 
 
-    def __new__(cls, algorithm: Player = None) -> 'GameEvaluator':
+    def __new__(cls, algorithm: Player = None, shared: bool = True) -> 'GameEvaluator':
         """
         Create a new instance of the GameEvaluator class if it doesn't already exist.
 
         Arguments:
             algorithm: Which algorithm to use when evaluating.
+            shared: Whether to return the shared instance or a new one owned by the caller,
+                e.g. an EngineContext running its own game.
 
         Returns:
             Instance of the GameEvaluator class.
         """
 
+        if not shared:
+            instance = super(GameEvaluator, cls).__new__(cls)
+            instance.setup(algorithm)
+            return instance
+
         if cls._instance is None:
             cls._instance = super(GameEvaluator, cls).__new__(cls)
-            cls._instance.algorithm = algorithm
-            cls._instance.is_first_move = True
+            cls._instance.setup(algorithm)
 
         return cls._instance
 
 
-    def game_evaluation(self, state: tuple[dict, ...], prev_small_idx: int, player: Player) -> float:
+    @staticmethod
+    def get_default_algorithm() -> Player:
         """
-        Evaluate the given game state by looking into the future.
+        Get the algorithm for a GameEvaluator of its own, without creating the shared instance.
+
+        Returns:
+            A copy of the shared instance's algorithm, e.g. the one set up in main.py, or a dynamic depth
+            MiniMaxPlayer if there's none.
+        """
+
+        if GameEvaluator._instance is not None and GameEvaluator._instance.algorithm is not None:
+            return copy.copy(GameEvaluator._instance.algorithm)
+
+        # Imported here, the players package imports the helpers while it's being initialized.
+        from utils.players import MiniMaxPlayer
+        return MiniMaxPlayer(target_depth = 'dynamic')
+
+
+    def setup(self, algorithm: Player):
+        """
+        Set the instance's algorithm and empty its caches.
+
+        Arguments:
+            algorithm: Which algorithm to use when evaluating.
+        """
+
+        self.algorithm = algorithm
+        self.is_first_move = True
+
+        # Finished analyses by position, side to move and depth, and the algorithm's transposition
+        # table, kept between analyses so deeper searches reuse the work of shallower ones.
+        self.analyses = {}
+        self.line_analyses = {}
+        self.transposition_table = {}
+
+
+    def get_search_depth(self, state: tuple[dict, ...]) -> int:
+        """
+        Get the algorithm's searching depth for the given state, without changing the algorithm.
+
+        The dynamic depth follows the number of moves played in the state rather than the number of
+        evaluations made so far, since evaluations running in the background can be dropped or cancelled.
 
         Arguments:
             state: The state to evaluate.
+
+        Returns:
+            The number of moves to look ahead from the given state.
+        """
+
+        if self.algorithm.use_dynamic_depth:
+            moves_played = sum(len(board['X']) + len(board['O']) for board in state[1:])
+            return self.algorithm.get_dynamic_depth(moves_played // 2)
+
+        return self.algorithm.target_depth
+
+
+    def analyse(self, state: tuple[dict, ...], prev_small_idx: int, player: Player,
+                depth: int = None, top_n: int = TOP_MOVES) -> dict | None:
+        """
+        Search the given game state once, scoring every legal move.
+
+        Arguments:
+            state: The state to analyse.
             prev_small_idx: The small index of the previous move made.
             player: The player making the first move from the given state.
+            depth: The number of moves to look ahead. None uses the algorithm's depth for the state.
+            top_n: How many of the best moves to return with their scores.
 
         Returns:
-            The evaluation score for the given state.
+            The evaluation of the state, the best move and the top scored moves, best first,
+            or None if the search was cancelled.
         """
 
-        if self._instance.is_first_move:
-            self._instance.is_first_move = False
-            return 0.0
+        legal_moves = player.get_current_legal_moves(prev_small_idx)
+        if len(legal_moves) == 0:
+            return {'evaluation': 0, 'best_move': None, 'top_moves': [], 'depth': 0}
+
+        if not hasattr(self.algorithm, 'minimax_ab'):
+            raise TypeError(f'Cannot analyse with {self.algorithm.__class__.__name__}, '
+                            f'the algorithm has no minimax_ab search.')
+
+        if depth is None:
+            depth = self.get_search_depth(state)
+
+        key = (tuple(board['display'] for board in state), prev_small_idx, player.sign, depth)
+        analysis = self.analyses.get(key)
+        if analysis is not None:
+            return {**analysis, 'top_moves': analysis['top_moves'][:top_n]}
+
+        if self.algorithm.use_timed_depth:
+            self.algorithm.start_time = time.time()
+
+        if len(self.transposition_table) > MAX_TABLE_ENTRIES:
+            self.transposition_table.clear()
+
+        is_maximizing = True if player.sign == 'X' else False
+
+        # The search stops once it reaches the algorithm's target depth,
+        # so starting further away from the target looks further ahead.
+        start_depth = self.algorithm.target_depth - depth + 1
+
+        scored_moves = []
+        self.algorithm.transposition_table = self.transposition_table
+        try:
+            for big_idx, small_idx in legal_moves:
+                updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, player.sign)
+                score = self.algorithm.minimax_ab(updated_state, small_idx, curr_depth = start_depth,
+                                                  alpha = float('-inf'), beta = float('inf'),
+                                                  is_maximizing = not is_maximizing)
+                scored_moves.append(((big_idx, small_idx), score))
+
+        finally:
+            self.algorithm.transposition_table = None
+
+        if self.algorithm.search_cancelled:
+            return None
 
-        if self._instance.algorithm.__class__.__name__ == 'MiniMaxPlayer':
-            self._instance.algorithm.moves_made += 0.5
+        scored_moves.sort(key = lambda scored_move: scored_move[1], reverse = is_maximizing)
 
-            init_alpha = float('-inf')
-            init_beta = float('inf')
+        analysis = {
+            'evaluation': scored_moves[0][1],
+            'best_move': scored_moves[0][0],
+            'top_moves': scored_moves,
+            'depth': depth,
+        }
 
-            is_maximizing = True if player.sign == 'X' else False
+        if len(self.analyses) >= MAX_CACHED_ANALYSES:
+            del self.analyses[next(iter(self.analyses))]
+        self.analyses[key] = analysis
 
-            self._instance.algorithm.update_target_depth()
+        return {**analysis, 'top_moves': scored_moves[:top_n]}
 
-            run_algorithm = self._instance.algorithm.minimax_ab
-            algorithm_args = {'curr_depth' : 1, 'alpha' : init_alpha, 'beta' : init_beta,
-                              'is_maximizing' : not is_maximizing}
+
+    def analyse_lines(self, state: tuple[dict, ...], prev_small_idx: int, player: Player,
+                      num_lines: int = TOP_MOVES, depth: int = None) -> dict | None:
+        """
+        Search the best few lines from the given game state (multi-PV).
+
+        Only the best moves get exact scores, every other move is searched with a window at the score
+        of the worst line kept so far and dropped as soon as it can't beat it.
+
+        Arguments:
+            state: The state to analyse.
+            prev_small_idx: The small index of the previous move made.
+            player: The player making the first move from the given state.
+            num_lines: How many of the best lines to search.
+            depth: The number of moves to look ahead. None uses the algorithm's depth for the state.
+
+        Returns:
+            The evaluation of the state, the best move and the best lines, best first, each with its
+            first move, score and principal variation, or None if the search was cancelled.
+        """
 
         legal_moves = player.get_current_legal_moves(prev_small_idx)
         if len(legal_moves) == 0:
-            return 0
+            return {'evaluation': 0, 'best_move': None, 'lines': [], 'depth': 0}
 
-        score = 0
-        for big_idx, small_idx in legal_moves:
-            updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, player.sign)
-            score += run_algorithm(updated_state, small_idx, **algorithm_args)
+        if not hasattr(self.algorithm, 'minimax_ab'):
+            raise TypeError(f'Cannot analyse with {self.algorithm.__class__.__name__}, '
+                            f'the algorithm has no minimax_ab search.')
 
-        return score / len(legal_moves)
+        if depth is None:
+            depth = self.get_search_depth(state)
 
+        position = (tuple(board['display'] for board in state), prev_small_idx, player.sign)
+        analysis = self.line_analyses.get((*position, depth, num_lines))
+        if analysis is not None:
+            return analysis
 
-    def get_best_move(self, state: tuple[dict, ...], prev_small_idx: int, player: Player) -> tuple[int, int] | None:
+        if self.algorithm.use_timed_depth:
+            self.algorithm.start_time = time.time()
+
+        if len(self.transposition_table) > MAX_TABLE_ENTRIES:
+            self.transposition_table.clear()
+
+        is_maximizing = True if player.sign == 'X' else False
+        start_depth = self.algorithm.target_depth - depth + 1
+
+        # The lines of a shallower search are searched first, so the window closes in sooner.
+        shallower = self.line_analyses.get((*position, depth - 1, num_lines))
+        if shallower is not None:
+            first_moves = [line['move'] for line in shallower['lines']]
+            legal_moves = first_moves + [move for move in legal_moves if move not in first_moves]
+
+        lines = []
+        self.algorithm.transposition_table = self.transposition_table
+        try:
+            for big_idx, small_idx in legal_moves:
+                alpha, beta = float('-inf'), float('inf')
+                if len(lines) == num_lines:
+                    if is_maximizing:
+                        alpha = lines[-1]['score']
+                    else:
+                        beta = lines[-1]['score']
+
+                updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, player.sign)
+                score = self.algorithm.minimax_ab(updated_state, small_idx, curr_depth = start_depth,
+                                                  alpha = alpha, beta = beta, is_maximizing = not is_maximizing)
+
+                if self.algorithm.search_cancelled:
+                    return None
+
+                # A score outside the window is only a bound, but it's no better than the worst line.
+                if score <= alpha or score >= beta:
+                    continue
+
+                lines.append({'move': (big_idx, small_idx), 'score': score})
+                lines.sort(key = lambda line: line['score'], reverse = is_maximizing)
+                del lines[num_lines:]
+
+            for line in lines:
+                line['pv'] = self.get_principal_variation(state, line['move'], player.sign,
+                                                          line['score'], depth)
+
+        finally:
+            self.algorithm.transposition_table = None
+
+        analysis = {
+            'evaluation': lines[0]['score'],
+            'best_move': lines[0]['move'],
+            'lines': lines,
+            'depth': depth,
+        }
+
+        if len(self.line_analyses) >= MAX_CACHED_ANALYSES:
+            del self.line_analyses[next(iter(self.line_analyses))]
+        self.line_analyses[(*position, depth, num_lines)] = analysis
+
+        return analysis
+
+
+    def get_principal_variation(self, state: tuple[dict, ...], move: tuple[int, int], sign: str,
+                                score: float, depth: int) -> list[tuple[int, int]]:
         """
-        Finds the best move for a given state.
+        Follow a searched line through the transposition table.
+
+        The line continues with the move whose exact score matches the line's score and ends early
+        wherever the table doesn't hold one, e.g. with timed depth.
+
+        Arguments:
+            state: The state the line starts from.
+            move: The first move of the line.
+            sign: The sign of the player making the first move.
+            score: The score of the line.
+            depth: The number of moves searched in the line.
+
+        Returns:
+            The moves of the line, starting with the given one.
+        """
+
+        # Imported here since the players import the helpers package while it's still loading.
+        from utils.players.minimax_player import EXACT
+
+        pv = [move]
+        state, _ = StateUpdater.update_state(state, *move, sign)
+        prev_small_idx = move[1]
+
+        for remaining in range(depth - 1, 0, -1):
+            if StateChecker.check_win(state, 0):
+                break
+
+            # The moves from here are made by the other player, so their states are searched for this one.
+            sign = 'O' if sign == 'X' else 'X'
+            child_is_maximizing = sign == 'O'
+
+            for move_code in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move_code]
+                updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+
+                if remaining == 1 or StateChecker.check_win(updated_state, 0):
+                    child_score = self.algorithm.evaluator.heuristic(updated_state, small_idx,
+                                                                     'X' if child_is_maximizing else 'O')
+                else:
+                    key = (tuple(board['display'] for board in updated_state), small_idx,
+                           remaining - 1, child_is_maximizing)
+                    child_score, bound = self.transposition_table.get(key, (None, None))
+                    if bound != EXACT:
+                        continue
+
+                if child_score == score:
+                    pv.append((big_idx, small_idx))
+                    state, prev_small_idx = updated_state, small_idx
+                    break
+
+            else:
+                break
+
+        return pv
+
+
+    def game_evaluation(self, state: tuple[dict, ...], prev_small_idx: int, player: Player) -> float:
+        """
+        Evaluate the given game state by looking into the future.
 
         Arguments:
             state: The state to evaluate.
@@ -84,34 +348,67 @@ class GameEvaluator:
             player: The player making the first move from the given state.
 
         Returns:
-            The best move from the given state or None if there are no legal moves.
+            The evaluation score for the given state.
         """
 
-        if self._instance.algorithm.__class__.__name__ == 'MiniMaxPlayer':
-            self._instance.algorithm.moves_made += 0.5
+        if self.is_first_move:
+            self.is_first_move = False
+            return 0.0
 
-            init_alpha = float('-inf')
-            init_beta = float('inf')
+        analysis = self.analyse(state, prev_small_idx, player)
 
-            is_maximizing = True if player.sign == 'X' else False
+        return analysis['evaluation'] if analysis is not None else 0.0
 
-            self._instance.algorithm.update_target_depth()
 
-            run_algorithm = self._instance.algorithm.minimax_ab
-            algorithm_args = {'curr_depth' : 1, 'alpha' : init_alpha, 'beta' : init_beta,
-                              'is_maximizing' : not is_maximizing}
+    def stream_evaluation(self, state: tuple[dict, ...], prev_small_idx: int, player: Player,
+                          publish: Callable[[int, float], None]) -> float | None:
+        """
+        Evaluate the given game state with iterative deepening, publishing the evaluation at each completed depth.
+        The last evaluation published is the same as the one from game_evaluation.
 
-        legal_moves = player.get_current_legal_moves(prev_small_idx)
-        best_move = None
-        best_score = float('-inf') if player.sign == 'X' else float('inf')
+        Arguments:
+            state: The state to evaluate.
+            prev_small_idx: The small index of the previous move made.
+            player: The player making the first move from the given state.
+            publish: Called with the depth and the evaluation score after each completed depth.
+
+        Returns:
+            The evaluation score at the deepest depth or None if the search was cancelled before finishing it.
+        """
+
+        if self.is_first_move:
+            score = self.game_evaluation(state, prev_small_idx, player)
+            publish(1, score)
+            return score
+
+        score = None
+        for depth in range(1, self.get_search_depth(state) + 1):
+            analysis = self.analyse(state, prev_small_idx, player, depth)
+            if analysis is None:
+                return None
+
+            score = analysis['evaluation']
+            publish(depth, score)
+
+        return score
+
+
+    def get_best_move(self, state: tuple[dict, ...], prev_small_idx: int, player: Player) -> tuple[int, int] | None:
+        """
+        Finds the best move for a given state.
+
+        Arguments:
+            state: The state to evaluate.
+            prev_small_idx: The small index of the previous move made.
+            player: The player making the first move from the given state.
+
+        Returns:
+            The best move from the given state or None if there are no legal moves.
+        """
+
+        analysis = self.analyse(state, prev_small_idx, player)
 
-        for big_idx, small_idx in legal_moves:
-            updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, player.sign)
-            score = run_algorithm(updated_state, small_idx, **algorithm_args)
-            if (score > best_score and player.sign == 'X') or (score<best_score and player.sign == 'O'):
-                best_move = (big_idx, small_idx)
-                best_score = score
+        return analysis['best_move'] if analysis is not None else None
 
-        return best_move
 
 __all__ = ['GameEvaluator']
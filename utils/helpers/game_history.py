@@ -0,0 +1,175 @@
+from utils.players import Player
+
+
+class GameHistory:
+    """
+    Class holding every position of a game, for undoing, redoing and reviewing moves.
+
+    An entry is a state with the small index of the previous move made and that move, or None for the
+    starting position. States share their unchanged boards (see StateUpdater), so keeping all of them
+    costs one or two board dicts per move, and moving through the history never replays any moves.
+    Making a move after undoing drops the undone moves, like in any editor.
+
+    Next to every entry the history keeps the search state of the players at that position (see
+    Player.get_search_state), so that going back to it also takes back e.g. a dynamic search depth.
+    The states are kept with their players, so players swapped in mid-game are left alone.
+    """
+
+    def __init__(self):
+        """ Create an instance of the GameHistory class. """
+
+        self.entries = []
+        self.player_states = []
+        self.ply = -1
+
+
+    def reset(self, state: tuple[dict, ...], players: tuple[Player, ...] = ()):
+        """
+        Start a new history from a starting position.
+
+        Arguments:
+            state: The starting state.
+            players: The players whose search state to keep with the starting position.
+        """
+
+        self.entries = [(state, None, None)]
+        self.player_states = [self.get_search_states(players)]
+        self.ply = 0
+
+
+    def push(self, state: tuple[dict, ...], prev_small_idx: int | None, move: tuple[int, int],
+             players: tuple[Player, ...] = ()):
+        """
+        Add the position reached by a move, dropping any undone moves.
+
+        Arguments:
+            state: The state after the move.
+            prev_small_idx: The small index of the move, None if the next move can be on any board.
+            move: The big and small index of the move.
+            players: The players whose search state to keep with the position after the move.
+        """
+
+        del self.entries[self.ply + 1:]
+        del self.player_states[self.ply + 1:]
+        self.entries.append((state, prev_small_idx, move))
+        self.player_states.append(self.get_search_states(players))
+        self.ply += 1
+
+
+    def current(self) -> tuple[tuple[dict, ...], int | None, tuple[int, int] | None]:
+        """
+        Get the current position.
+
+        Returns:
+            The state, the small index of the previous move made and the previous move made.
+        """
+
+        return self.entries[self.ply]
+
+
+    @staticmethod
+    def get_search_states(players: tuple[Player, ...]) -> tuple[tuple[Player, dict], ...]:
+        """
+        Get the search state of some players.
+
+        Arguments:
+            players: The players.
+
+        Returns:
+            Every player with its search state.
+        """
+
+        return tuple((player, player.get_search_state()) for player in players)
+
+
+    def restore_player_states(self):
+        """ Give the players kept with the current position their search state at that position back. """
+
+        for player, search_state in self.player_states[self.ply]:
+            player.set_search_state(search_state)
+
+
+    def can_undo(self) -> bool:
+        """ Check whether there is a move to undo. """
+
+        return self.ply > 0
+
+
+    def can_redo(self) -> bool:
+        """ Check whether there is an undone move to redo. """
+
+        return self.ply < len(self.entries) - 1
+
+
+    def undo(self) -> tuple[tuple[dict, ...], int | None, tuple[int, int] | None]:
+        """
+        Go back one move.
+
+        Returns:
+            The position before the current one.
+
+        Raises:
+            IndexError: If there are no moves to undo.
+        """
+
+        if not self.can_undo():
+            raise IndexError('no moves to undo')
+
+        self.ply -= 1
+
+        return self.current()
+
+
+    def redo(self) -> tuple[tuple[dict, ...], int | None, tuple[int, int] | None]:
+        """
+        Go forward one undone move.
+
+        Returns:
+            The position after the current one.
+
+        Raises:
+            IndexError: If there are no moves to redo.
+        """
+
+        if not self.can_redo():
+            raise IndexError('no moves to redo')
+
+        self.ply += 1
+
+        return self.current()
+
+
+    def go_to(self, ply: int) -> tuple[tuple[dict, ...], int | None, tuple[int, int] | None]:
+        """
+        Go to the position after a number of moves, keeping the moves after it for redoing.
+
+        Arguments:
+            ply: The number of moves made, 0 for the starting position.
+
+        Returns:
+            The position at that ply.
+
+        Raises:
+            IndexError: If the ply isn't in the history.
+        """
+
+        if not 0 <= ply < len(self.entries):
+            raise IndexError(f'ply {ply} is not in the history of {len(self.entries) - 1} moves')
+
+        self.ply = ply
+
+        return self.current()
+
+
+    def get_moves(self) -> list[tuple[int, int]]:
+        """
+        Get the moves made up to the current position.
+
+        Returns:
+            The big and small index of every move, in order.
+        """
+
+        return [move for _, _, move in self.entries[1:self.ply + 1]]
+
+
+__all__ = ['GameHistory']
@@ -0,0 +1,405 @@
+import os
+
+import numpy as np
+
+from .state_checker import StateChecker
+from .evaluator_registry import Evaluator, EvaluatorRegistry
+from .board_table import BoardTable, BOARD_CODES
+
+
+StateChecker = StateChecker()
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'models', 'value_model.npz')
+
+SCORE_WIN = 100 * 10
+SCORE_TIE = 0
+
+# Evaluations stay below a won game, so the search always prefers an actual win.
+VALUE_SCALE = SCORE_WIN // 2
+
+MAX_CACHED_EVALUATIONS = 500_000
+
+POWERS = np.array([3 ** cell for cell in range(9)], dtype = np.int32)
+
+
+class ValueModel:
+    """
+    Class representing a small neural network predicting the chance of X winning a position.
+
+    The inputs of a position are:
+        - codes | (N, 9) BoardTable codes of the small boards, looked up in a shared embedding table.
+        - macro | (N, 9) small board statuses: 0 for open, 1 won by X, 2 won by O and 3 tied, one-hot encoded.
+        - targets | (N,) the board index (0-8) the next move is sent to or -1 for a free move, one-hot encoded.
+        - turns | (N,) 1 if X moves next, 2 if O does.
+
+    The features go through one hidden ReLU layer, or straight to the output for a linear model
+    when the hidden size is 0, and the output is a logit.
+    """
+
+    statuses = None
+
+
+    def __init__(self, embedding_size: int = 8, hidden_size: int = 32, seed: int = None, params: dict = None):
+        """
+        Create an instance of the ValueModel class.
+
+        Arguments:
+            embedding_size: Number of values every small board is embedded as.
+            hidden_size: Number of hidden units, 0 for a linear model.
+            seed: The seed for the initial parameters.
+            params: The parameters to use instead of initializing new ones.
+        """
+
+        if params is None:
+            rng = np.random.default_rng(seed)
+            num_features = 9 * embedding_size + 9 * 4 + 10 + 1
+            output_inputs = hidden_size or num_features
+
+            params = {'embeddings': rng.normal(0, 0.1, (BOARD_CODES, embedding_size))}
+            if hidden_size:
+                params['hidden_weights'] = rng.normal(0, np.sqrt(2 / num_features), (num_features, hidden_size))
+                params['hidden_bias'] = np.zeros(hidden_size)
+            params['output_weights'] = rng.normal(0, np.sqrt(1 / output_inputs), output_inputs)
+            params['output_bias'] = np.zeros(1)
+
+        self.params = {name: np.asarray(value, dtype = np.float32) for name, value in params.items()}
+        self.embedding_size = self.params['embeddings'].shape[1]
+        self.hidden_size = self.params['hidden_bias'].shape[0] if 'hidden_bias' in self.params else 0
+
+
+    @staticmethod
+    def get_inputs(cells: np.ndarray, targets: np.ndarray, turns: np.ndarray) -> tuple[np.ndarray, ...]:
+        """
+        Get the inputs of positions stored the way PlayoutBatch and the self-play shards hold them.
+
+        Arguments:
+            cells: (N, 81) cells with 0 for empty, 1 for X and 2 for O, indexed by move code.
+            targets: The board index (0-8) the next move is sent to, -1 for a free move.
+            turns: 1 if X moves next, 2 if O does.
+
+        Returns:
+            The codes, macro statuses, targets and turns of the positions.
+        """
+
+        codes = (cells.reshape(-1, 9, 9).astype(np.int32) * POWERS).sum(axis = 2)
+        return ValueModel.get_inputs_from_codes(codes, targets, turns)
+
+
+    @staticmethod
+    def get_inputs_from_codes(codes: np.ndarray, targets, turns) -> tuple[np.ndarray, ...]:
+        """
+        Get the inputs of positions from the codes of their small boards.
+
+        Arguments:
+            codes: (N, 9) BoardTable codes of the small boards.
+            targets: The board index (0-8) the next move is sent to, -1 for a free move.
+            turns: 1 if X moves next, 2 if O does.
+
+        Returns:
+            The codes, macro statuses, targets and turns of the positions.
+        """
+
+        if ValueModel.statuses is None:
+            ValueModel.statuses = np.frombuffer(bytes(BoardTable.get_default().statuses), dtype = np.uint8)
+
+        return codes, ValueModel.statuses[codes].astype(np.int64), np.asarray(targets), np.asarray(turns)
+
+
+    def get_features(self, inputs: tuple[np.ndarray, ...]) -> np.ndarray:
+        """
+        Turn the inputs of positions into the features fed to the network.
+
+        Arguments:
+            inputs: The codes, macro statuses, targets and turns of the positions.
+
+        Returns:
+            The (N, features) matrix.
+        """
+
+        codes, macro, targets, turns = inputs
+        num_positions = len(codes)
+
+        return np.concatenate((
+            self.params['embeddings'][codes].reshape(num_positions, -1),
+            np.eye(4, dtype = np.float32)[macro].reshape(num_positions, -1),
+            np.eye(10, dtype = np.float32)[np.asarray(targets) + 1],
+            (np.asarray(turns) == 1).astype(np.float32)[:, None],
+        ), axis = 1)
+
+
+    def forward(self, inputs: tuple[np.ndarray, ...]) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+        """
+        Run the network on the inputs of positions.
+
+        Arguments:
+            inputs: The codes, macro statuses, targets and turns of the positions.
+
+        Returns:
+            The logits, the features and the hidden activations, None for a linear model.
+        """
+
+        features = self.get_features(inputs)
+        hidden = None
+
+        if self.hidden_size:
+            hidden = np.maximum(features @ self.params['hidden_weights'] + self.params['hidden_bias'], 0)
+
+        logits = (features if hidden is None else hidden) @ self.params['output_weights'] + self.params['output_bias']
+
+        return logits, features, hidden
+
+
+    def predict(self, inputs: tuple[np.ndarray, ...]) -> np.ndarray:
+        """
+        Predict the chance of X winning every position.
+
+        Arguments:
+            inputs: The codes, macro statuses, targets and turns of the positions.
+
+        Returns:
+            The probabilities.
+        """
+
+        return 1 / (1 + np.exp(-self.forward(inputs)[0]))
+
+
+    def get_gradients(self, inputs: tuple[np.ndarray, ...], results: np.ndarray) -> tuple[float, dict]:
+        """
+        Get the cross-entropy loss of the predictions and its gradients.
+
+        Arguments:
+            inputs: The codes, macro statuses, targets and turns of the positions.
+            results: The results for X: 1 for a win, 0.5 for a tie and 0 for a loss.
+
+        Returns:
+            The loss and the gradient of every parameter.
+        """
+
+        logits, features, hidden = self.forward(inputs)
+        probabilities = 1 / (1 + np.exp(-logits))
+        loss = float(np.mean(np.logaddexp(0, logits) - results * logits))
+
+        errors = ((probabilities - results) / len(results)).astype(np.float32)
+        gradients = {'output_bias': np.array([errors.sum()], dtype = np.float32)}
+
+        if hidden is None:
+            gradients['output_weights'] = features.T @ errors
+            feature_errors = np.outer(errors, self.params['output_weights'])
+        else:
+            gradients['output_weights'] = hidden.T @ errors
+            hidden_errors = np.outer(errors, self.params['output_weights']) * (hidden > 0)
+            gradients['hidden_weights'] = features.T @ hidden_errors
+            gradients['hidden_bias'] = hidden_errors.sum(axis = 0)
+            feature_errors = hidden_errors @ self.params['hidden_weights'].T
+
+        embedding_errors = feature_errors[:, :9 * self.embedding_size].reshape(-1, self.embedding_size)
+        gradients['embeddings'] = np.zeros_like(self.params['embeddings'])
+        np.add.at(gradients['embeddings'], inputs[0].reshape(-1), embedding_errors)
+
+        return loss, gradients
+
+
+    def save(self, path: str):
+        """
+        Write the parameters to a file.
+
+        Arguments:
+            path: The file path.
+        """
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+        with open(path, 'wb') as model_file:
+            np.savez(model_file, **self.params)
+
+
+    @staticmethod
+    def load(path: str) -> 'ValueModel':
+        """
+        Read the parameters written by save.
+
+        Arguments:
+            path: The file path.
+
+        Returns:
+            The model.
+        """
+
+        with np.load(path) as params:
+            return ValueModel(params = {name: params[name] for name in params.files})
+
+
+@EvaluatorRegistry.register('learned')
+class LearnedEvaluator(Evaluator):
+    """
+    Helper class for evaluating game states with a trained ValueModel.
+
+    Evaluations are memoized by position, and heuristic_batch runs the network once for
+    all positions it hasn't seen, which is how MiniMaxPlayer evaluates the leaves of a node.
+    """
+
+    batched = True
+
+    # Evaluators of models loaded from other files than the default one, by absolute path.
+    loaded = {}
+
+
+    def __init__(self, model: ValueModel = None, model_path: str = None):
+        """
+        Create an instance of the LearnedEvaluator class.
+
+        Arguments:
+            model: The model to evaluate with, defaults to the one at model_path.
+            model_path: The file to load the model from, defaults to DEFAULT_MODEL_PATH.
+
+        Raises:
+            ValueError: If no model is given and none has been trained yet.
+        """
+
+        if model is None:
+            model_path = model_path or DEFAULT_MODEL_PATH
+            if not os.path.exists(model_path):
+                raise ValueError(f'no value model at {os.path.normpath(model_path)}, '
+                                 f'train one with python -m utils.tuning.train_value')
+            model = ValueModel.load(model_path)
+
+        self.model = model
+        self.model_path = model_path
+        self.board_codes = {}
+        self.evaluations = {}
+
+
+    @staticmethod
+    def from_path(model_path: str) -> 'LearnedEvaluator':
+        """
+        Get the evaluator of the model in the given file.
+
+        Arguments:
+            model_path: The file of the model.
+
+        Returns:
+            The evaluator, shared by everyone loading the same file.
+        """
+
+        model_path = os.path.abspath(model_path)
+        if model_path not in LearnedEvaluator.loaded:
+            LearnedEvaluator.loaded[model_path] = LearnedEvaluator(model_path = model_path)
+
+        return LearnedEvaluator.loaded[model_path]
+
+
+    def __reduce__(self):
+        # Only the default model is the registered instance, so other models are loaded from their file
+        # in the worker instead, and models that were never saved can't be sent at all.
+        if self.model_path is None:
+            raise TypeError('only a LearnedEvaluator with a model loaded from a file can be pickled')
+
+        if os.path.abspath(self.model_path) == os.path.abspath(DEFAULT_MODEL_PATH):
+            return super().__reduce__()
+
+        return LearnedEvaluator.from_path, (os.path.abspath(self.model_path),)
+
+
+    def get_key(self, state: tuple[dict, ...], next_big_idx: int | None, sign: str) -> tuple:
+        """
+        Get the cache key and the inputs of a state.
+
+        Arguments:
+            state: A game state.
+            next_big_idx: Board index where the next player makes a move, or None if any move is possible.
+            sign: The sign to move.
+
+        Returns:
+            The small board displays, the target board (0-8 or -1 for a free move) and the turn.
+        """
+
+        if next_big_idx is None or state[0]['display'][next_big_idx] != '-':
+            target = -1
+        else:
+            target = next_big_idx - 1
+
+        return tuple(board['display'] for board in state[1:]), target, 1 if sign == 'X' else 2
+
+
+    def get_inputs(self, keys: list[tuple]) -> tuple[np.ndarray, ...]:
+        """
+        Get the model inputs of many states.
+
+        Arguments:
+            keys: The keys of the states, see get_key.
+
+        Returns:
+            The codes, macro statuses, targets and turns of the states.
+        """
+
+        codes = np.empty((len(keys), 9), dtype = np.int32)
+
+        for n, (displays, _, _) in enumerate(keys):
+            for board, display in enumerate(displays):
+                code = self.board_codes.get(display)
+                if code is None:
+                    code = self.board_codes[display] = BoardTable.encode(display)
+                codes[n, board] = code
+
+        return ValueModel.get_inputs_from_codes(codes, [target for _, target, _ in keys],
+                                                [turn for _, _, turn in keys])
+
+
+    def heuristic(self, state: tuple[dict, ...], next_big_idx: int | None, sign: str) -> float:
+        """
+        Evaluate the given state.
+
+        Arguments:
+            state: A game state.
+            next_big_idx: Board index where the next player makes a move, or None if any move is possible.
+            sign: The sign to move.
+
+        Returns:
+            The heuristic value for the state being evaluated, positive if it favors X.
+        """
+
+        return self.heuristic_batch([(state, next_big_idx, sign)])[0]
+
+
+    def heuristic_batch(self, states: list[tuple[tuple[dict, ...], int | None, str]]) -> list[float]:
+        """
+        Evaluate several states, running the model once for all of them.
+
+        Arguments:
+            states: The states, each with its next board index and the sign to move.
+
+        Returns:
+            The heuristic values, in the order of the states.
+        """
+
+        scores = [None] * len(states)
+        missing = {}
+
+        for n, (state, next_big_idx, sign) in enumerate(states):
+            winner = StateChecker.check_win(state, big_idx = 0)
+
+            if winner == 'T':
+                scores[n] = SCORE_TIE
+            elif winner:
+                scores[n] = SCORE_WIN if winner == 'X' else -SCORE_WIN
+            else:
+                key = self.get_key(state, next_big_idx, sign)
+                scores[n] = self.evaluations.get(key)
+                if scores[n] is None:
+                    missing.setdefault(key, []).append(n)
+
+        if missing:
+            keys = list(missing)
+            probabilities = self.model.predict(self.get_inputs(keys))
+
+            if len(self.evaluations) + len(keys) > MAX_CACHED_EVALUATIONS:
+                self.evaluations.clear()
+
+            for key, probability in zip(keys, probabilities.tolist()):
+                self.evaluations[key] = score = (2 * probability - 1) * VALUE_SCALE
+                for n in missing[key]:
+                    scores[n] = score
+
+        return scores
+
+
+__all__ = ['ValueModel', 'LearnedEvaluator']
@@ -0,0 +1,180 @@
+# Move codes are (big_idx - 1) * 9 + (small_idx - 1), so every legal move fits in an 81-bit mask.
+MOVES = tuple((big_idx, small_idx) for big_idx in range(1, 10) for small_idx in range(1, 10))
+
+
+class MoveGenerator:
+    """ Helper class for generating legal moves straight from a state's occupancy masks. """
+
+    empty_masks = {}
+    board_moves = {}
+
+
+    @staticmethod
+    def encode_move(big_idx: int, small_idx: int) -> int:
+        """
+        Encode a move as a single integer.
+
+        Arguments:
+            big_idx: Board index.
+            small_idx: Position index.
+
+        Returns:
+            The move code in range 0-80.
+        """
+
+        return (big_idx - 1) * 9 + small_idx - 1
+
+
+    @staticmethod
+    def decode_move(move: int) -> tuple[int, int]:
+        """
+        Decode a move code.
+
+        Arguments:
+            move: The move code in range 0-80.
+
+        Returns:
+            The move in (big_idx, small_idx) format.
+        """
+
+        return MOVES[move]
+
+
+    @staticmethod
+    def get_empty_mask(board_display: tuple[str, ...]) -> int:
+        """
+        Get the occupancy mask of the empty spaces on a board.
+
+        Arguments:
+            board_display: The board display.
+
+        Returns:
+            A 9-bit mask where bit (small_idx - 1) is set if the position is empty.
+        """
+
+        mask = MoveGenerator.empty_masks.get(board_display)
+        if mask is None:
+            mask = 0
+            for small_idx in range(1, 10):
+                if board_display[small_idx] == '-':
+                    mask |= 1 << (small_idx - 1)
+
+            MoveGenerator.empty_masks[board_display] = mask
+
+        return mask
+
+
+    @staticmethod
+    def get_board_moves(big_idx: int, board_display: tuple[str, ...]) -> tuple[int, ...]:
+        """
+        Get the codes of all empty spaces on a board.
+
+        Arguments:
+            big_idx: Board index.
+            board_display: The display of the board at big_idx.
+
+        Returns:
+            The move codes in ascending order.
+        """
+
+        key = (big_idx, board_display)
+        moves = MoveGenerator.board_moves.get(key)
+        if moves is None:
+            offset = (big_idx - 1) * 9
+            moves = tuple(offset + small_idx - 1 for small_idx in range(1, 10) if board_display[small_idx] == '-')
+            MoveGenerator.board_moves[key] = moves
+
+        return moves
+
+
+    @staticmethod
+    def is_free_move(state: tuple[dict, ...], prev_small_idx: int | None) -> bool:
+        """
+        Check whether the next player may move on any uncompleted board.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made
+                or None if the previous move takes the next player to a completed board.
+
+        Returns:
+            True if the next move is a free move, otherwise False.
+        """
+
+        return prev_small_idx is None or state[0]['display'][prev_small_idx] != '-'
+
+
+    @staticmethod
+    def get_legal_moves_mask(state: tuple[dict, ...], prev_small_idx: int | None) -> int:
+        """
+        Get all legal moves for a state as a bitmask.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made
+                or None if the previous move takes the next player to a completed board.
+
+        Returns:
+            An 81-bit mask where bit (big_idx - 1) * 9 + (small_idx - 1) is set for every legal move.
+        """
+
+        if not MoveGenerator.is_free_move(state, prev_small_idx):
+            return MoveGenerator.get_empty_mask(state[prev_small_idx]['display']) << (prev_small_idx - 1) * 9
+
+        big_display = state[0]['display']
+        mask = 0
+        for big_idx in range(1, 10):
+            if big_display[big_idx] == '-':
+                mask |= MoveGenerator.get_empty_mask(state[big_idx]['display']) << (big_idx - 1) * 9
+
+        return mask
+
+
+    @staticmethod
+    def get_legal_moves(state: tuple[dict, ...], prev_small_idx: int | None) -> tuple[int, ...]:
+        """
+        Get all legal moves for a state as move codes.
+
+        Unlike Player.get_legal_moves_for_state, this only looks at the given state,
+        so it is safe to use on hypothetical states deep in a search.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made
+                or None if the previous move takes the next player to a completed board.
+
+        Returns:
+            The legal move codes in ascending order, decodable with MOVES or decode_move.
+        """
+
+        if not MoveGenerator.is_free_move(state, prev_small_idx):
+            return MoveGenerator.get_board_moves(prev_small_idx, state[prev_small_idx]['display'])
+
+        big_display = state[0]['display']
+        moves = ()
+        for big_idx in range(1, 10):
+            if big_display[big_idx] == '-':
+                moves += MoveGenerator.get_board_moves(big_idx, state[big_idx]['display'])
+
+        return moves
+
+
+    @staticmethod
+    def iter_mask(mask: int):
+        """
+        Iterate over the move codes set in a bitmask.
+
+        Arguments:
+            mask: A legal moves bitmask.
+
+        Yields:
+            The move codes in ascending order.
+        """
+
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+
+__all__ = ['MoveGenerator', 'MOVES']
@@ -0,0 +1,352 @@
+from .assets import magic_square
+from .board_table import BoardTable, BOARD_CODES, POWERS, X_WON, O_WON, STATUS_SIGNS
+
+
+# Next boards are stored as 0 for a free move and 1-9 for the board sent to.
+NEXT_BOARDS = 10
+POSITION_BYTES = 17
+
+EMPTY_DISPLAY = ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')
+
+# The base-3 code of every 9-bit mask, for turning bitboards into board codes.
+MASK_CODES = tuple(sum(POWERS[small_idx] for small_idx in range(1, 10) if mask >> (small_idx - 1) & 1)
+                   for mask in range(512))
+
+
+class PositionCodec:
+    """
+    Helper class for converting positions to and from compact forms.
+
+    A position is a state with the next board and the sign to move. Its forms are:
+        - integer | ((sum of code(board) * 3 ** (9 * (big_idx - 1))) * 10 + next board) * 2 + (sign == 'O'),
+          where code is the BoardTable code of a small board and the next board is 0 for a free move.
+        - bytes | The integer in 17 big-endian bytes. 81 cells with 3 values take just over 128 bits.
+        - text | The small boards in order separated by "/", each row-major with X, O and digits for runs
+          of empty spaces, then the next board ("-" for a free move) and the sign, e.g. "9/9/9/9/4X4/9/9/9/9 5 O".
+        - bitboard | Two 81-bit masks for the spaces of X and O, with bit (big_idx - 1) * 9 + (small_idx - 1)
+          like MoveGenerator's masks, and the next board and sign.
+
+    Decoded states are canonical: the positions of a board are listed in board order, like StateGenerator's,
+    instead of the order the moves were made in, and the big board is worked out from the small ones.
+    """
+
+    boards = None
+    codes = {}
+
+
+    @staticmethod
+    def get_boards() -> tuple[tuple[tuple, tuple, tuple], ...]:
+        """
+        Get the X positions, O positions and display of every board code, building them on first use.
+
+        Returns:
+            The boards, indexed by code.
+        """
+
+        if PositionCodec.boards is None:
+            boards = []
+            for code in range(BOARD_CODES):
+                display = BoardTable.decode(code)
+                boards.append((tuple(magic_square[idx] for idx in range(1, 10) if display[idx] == 'X'),
+                               tuple(magic_square[idx] for idx in range(1, 10) if display[idx] == 'O'),
+                               display))
+            PositionCodec.boards = tuple(boards)
+
+        return PositionCodec.boards
+
+
+    @staticmethod
+    def get_code(board_display: tuple[str, ...]) -> int:
+        """
+        Get the BoardTable code of a board display, cached by display.
+
+        Arguments:
+            board_display: The board display.
+
+        Returns:
+            The board code.
+        """
+
+        code = PositionCodec.codes.get(board_display)
+        if code is None:
+            code = PositionCodec.codes[board_display] = BoardTable.encode(board_display)
+
+        return code
+
+
+    @staticmethod
+    def get_next_board(state: tuple[dict, ...], prev_small_idx: int | None) -> int:
+        """
+        Get the board the next move is sent to.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+
+        Returns:
+            The board index, or 0 if any board can be played.
+        """
+
+        if prev_small_idx is None or state[0]['display'][prev_small_idx] != '-':
+            return 0
+
+        return prev_small_idx
+
+
+    @staticmethod
+    def build_state(codes: list[int]) -> tuple[dict, ...]:
+        """
+        Build the state with the given small boards.
+
+        Arguments:
+            codes: The codes of the small boards, in board order.
+
+        Returns:
+            The game state.
+        """
+
+        boards = PositionCodec.get_boards()
+        statuses = BoardTable.get_default().statuses
+
+        state = [None]
+        big_board = {'X': (), 'O': (), 'display': list(EMPTY_DISPLAY)}
+
+        for big_idx, code in enumerate(codes, start = 1):
+            x_positions, o_positions, display = boards[code]
+            state.append({'X': x_positions, 'O': o_positions, 'display': display})
+
+            status = statuses[code]
+            if status in (X_WON, O_WON):
+                big_board[STATUS_SIGNS[status]] += (magic_square[big_idx],)
+            if status:
+                big_board['display'][big_idx] = STATUS_SIGNS[status]
+
+        big_board['display'] = tuple(big_board['display'])
+        state[0] = big_board
+
+        return tuple(state)
+
+
+    @staticmethod
+    def encode(state: tuple[dict, ...], prev_small_idx: int | None, sign: str) -> int:
+        """
+        Encode a position as an integer.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+            sign: The sign to move.
+
+        Returns:
+            The position's integer.
+        """
+
+        number = 0
+        for big_idx in range(9, 0, -1):
+            number = number * BOARD_CODES + PositionCodec.get_code(state[big_idx]['display'])
+
+        return (number * NEXT_BOARDS + PositionCodec.get_next_board(state, prev_small_idx)) * 2 + (sign == 'O')
+
+
+    @staticmethod
+    def decode(number: int) -> tuple[tuple[dict, ...], int | None, str]:
+        """
+        Decode a position's integer.
+
+        Arguments:
+            number: The position's integer.
+
+        Returns:
+            The state, the small index of the previous move made and the sign to move.
+
+        Raises:
+            ValueError: If the number isn't a position's integer.
+        """
+
+        if not 0 <= number < BOARD_CODES ** 9 * NEXT_BOARDS * 2:
+            raise ValueError(f'{number} is not a position')
+
+        number, is_o = divmod(number, 2)
+        number, next_board = divmod(number, NEXT_BOARDS)
+
+        codes = []
+        for _ in range(9):
+            number, code = divmod(number, BOARD_CODES)
+            codes.append(code)
+
+        return PositionCodec.build_state(codes), next_board or None, 'O' if is_o else 'X'
+
+
+    @staticmethod
+    def to_bytes(state: tuple[dict, ...], prev_small_idx: int | None, sign: str) -> bytes:
+        """
+        Encode a position as bytes.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+            sign: The sign to move.
+
+        Returns:
+            The position's integer in 17 bytes.
+        """
+
+        return PositionCodec.encode(state, prev_small_idx, sign).to_bytes(POSITION_BYTES, 'big')
+
+
+    @staticmethod
+    def from_bytes(data: bytes) -> tuple[tuple[dict, ...], int | None, str]:
+        """
+        Decode a position's bytes.
+
+        Arguments:
+            data: The position's 17 bytes.
+
+        Returns:
+            The state, the small index of the previous move made and the sign to move.
+
+        Raises:
+            ValueError: If the bytes aren't a position's.
+        """
+
+        if len(data) != POSITION_BYTES:
+            raise ValueError(f'a position takes {POSITION_BYTES} bytes, got {len(data)}')
+
+        return PositionCodec.decode(int.from_bytes(data, 'big'))
+
+
+    @staticmethod
+    def format(state: tuple[dict, ...], prev_small_idx: int | None, sign: str) -> str:
+        """
+        Write a position in text notation.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+            sign: The sign to move.
+
+        Returns:
+            The position's text.
+        """
+
+        boards = []
+        for big_idx in range(1, 10):
+            board, empty = '', 0
+            for cell in state[big_idx]['display'][1:]:
+                if cell == '-':
+                    empty += 1
+                    continue
+                if empty:
+                    board += str(empty)
+                    empty = 0
+                board += cell
+            boards.append(board + (str(empty) if empty else ''))
+
+        next_board = PositionCodec.get_next_board(state, prev_small_idx)
+
+        return f'{"/".join(boards)} {next_board or "-"} {sign}'
+
+
+    @staticmethod
+    def parse(text: str) -> tuple[tuple[dict, ...], int | None, str]:
+        """
+        Read a position written in text notation.
+
+        Arguments:
+            text: The position's text.
+
+        Returns:
+            The state, the small index of the previous move made and the sign to move.
+
+        Raises:
+            ValueError: If the text isn't a valid position.
+        """
+
+        try:
+            boards, next_board, sign = text.split()
+        except ValueError:
+            raise ValueError(f'{text!r} should have the boards, the next board and the sign') from None
+
+        boards = boards.split('/')
+        if len(boards) != 9 or sign not in ('X', 'O') or next_board not in ('-', *'123456789'):
+            raise ValueError(f'{text!r} is not a position')
+
+        codes = []
+        for board in boards:
+            code, small_idx = 0, 1
+            for cell in board:
+                if cell in '123456789':
+                    small_idx += int(cell)
+                    continue
+                if cell not in ('X', 'O') or small_idx > 9:
+                    raise ValueError(f'{text!r} has an invalid board {board!r}')
+                code += (1 if cell == 'X' else 2) * POWERS[small_idx]
+                small_idx += 1
+
+            if small_idx != 10:
+                raise ValueError(f'{text!r} has a board {board!r} without 9 spaces')
+            codes.append(code)
+
+        state = PositionCodec.build_state(codes)
+        prev_small_idx = None if next_board == '-' else int(next_board)
+
+        return state, PositionCodec.get_next_board(state, prev_small_idx) or None, sign
+
+
+    @staticmethod
+    def to_bitboard(state: tuple[dict, ...], prev_small_idx: int | None, sign: str) -> tuple[int, int, int, str]:
+        """
+        Convert a position to bitboards.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+            sign: The sign to move.
+
+        Returns:
+            The masks of X and O, the next board (0 for a free move) and the sign to move.
+        """
+
+        x_mask = o_mask = 0
+
+        for big_idx in range(9, 0, -1):
+            display = state[big_idx]['display']
+            x_mask <<= 9
+            o_mask <<= 9
+            for small_idx in range(1, 10):
+                if display[small_idx] == 'X':
+                    x_mask |= 1 << (small_idx - 1)
+                elif display[small_idx] == 'O':
+                    o_mask |= 1 << (small_idx - 1)
+
+        return x_mask, o_mask, PositionCodec.get_next_board(state, prev_small_idx), sign
+
+
+    @staticmethod
+    def from_bitboard(x_mask: int, o_mask: int, next_board: int, sign: str) -> tuple[tuple[dict, ...], int | None, str]:
+        """
+        Convert bitboards to a position.
+
+        Arguments:
+            x_mask: The 81-bit mask of X's spaces.
+            o_mask: The 81-bit mask of O's spaces.
+            next_board: The board the next move is sent to, 0 for a free move.
+            sign: The sign to move.
+
+        Returns:
+            The state, the small index of the previous move made and the sign to move.
+
+        Raises:
+            ValueError: If a space is taken by both signs.
+        """
+
+        if x_mask & o_mask:
+            raise ValueError('a space is taken by both X and O')
+
+        codes = [MASK_CODES[x_mask >> shift & 0x1FF] + 2 * MASK_CODES[o_mask >> shift & 0x1FF]
+                 for shift in range(0, 81, 9)]
+
+        return PositionCodec.build_state(codes), next_board or None, sign
+
+
+__all__ = ['PositionCodec']
@@ -1,4 +1,5 @@
 from .state_checker import StateChecker
+from .evaluator_registry import Evaluator, EvaluatorRegistry
 from .assets import inverse_board_display
 
 
@@ -22,16 +23,21 @@ SCALE_CORNER = 0.15
 SCALE_MIDDLE = 0.05
 SCALE_CENTER = 0.2
 
+FORMATIONS = ('center', 'corner', 'two_in_row', 'fork', 'blocking')
+FORMATION_WEIGHTS = (SCORE_CENTER, SCORE_CORNER, SCORE_TWO_IN_ROW, SCORE_FORK, SCORE_BLOCKING)
+
 # Board Positions
 CORNERS = MS_MIDDLES = {1, 3, 7, 9}
 MIDDLES = MS_CORNERS = {2, 4, 6, 8}
 MS_FORKS = {2, 4, 6, 8, 5}
 
 
-class StateEvaluator:
+@EvaluatorRegistry.register('v1')
+class StateEvaluator(Evaluator):
     """ Helper singleton class for evaluating game states. """
 
     _instance = None
+    table_based = True
 
 
     def __new__(cls) -> 'StateEvaluator':
@@ -50,28 +56,22 @@ class StateEvaluator:
 
 
     @staticmethod
-    def get_row_score(ms_idx: int, sign_pos: list[int], calc_for: str) -> int:
+    def get_row_count(ms_idx: int, sign_pos: list[int]) -> int:
         """
-        Get the score for the given magic square position depending on what's being calculated.
-
-        Calculation Options:
-            - "blocking" | Calculates score for blocking opponent's two in a row.
-            - "two_row" | Calculates score for placing two signs in a row.
+        Count the lines through the given magic square position completed by pairs of the other positions.
 
         Arguments:
             ms_idx: A magic square index of the position (given sign or empty space).
-            sign_pos: Magic square positions of the other sign (opposing or given signs).
-            calc_for: What's being calculated.
+            sign_pos: Sorted magic square positions of the other sign (opposing or given signs).
 
         Returns:
-            The score gain based on the calculation option.
+            The number of lines, each position is used in at most one of them.
         """
 
         if len(sign_pos) < 2:
             return 0
 
-        score_addition = SCORE_BLOCKING if calc_for == 'blocking' else SCORE_TWO_IN_ROW
-        score_gain = 0
+        count = 0
         blocks_found = True
         sign_pos = sign_pos.copy()
 
@@ -87,7 +87,7 @@ class StateEvaluator:
                 elif temp_score > 15:
                     right -= 1
                 else:
-                    score_gain += score_addition
+                    count += 1
                     sign_pos.pop(right)
                     sign_pos.pop(left)
                     break
@@ -99,7 +99,57 @@ class StateEvaluator:
             if not blocks_found:
                 break
 
-        return score_gain
+        return count
+
+
+    @staticmethod
+    def get_row_score(ms_idx: int, sign_pos: list[int], calc_for: str) -> int:
+        """
+        Get the score for the given magic square position depending on what's being calculated.
+
+        Calculation Options:
+            - "blocking" | Calculates score for blocking opponent's two in a row.
+            - "two_row" | Calculates score for placing two signs in a row.
+
+        Arguments:
+            ms_idx: A magic square index of the position (given sign or empty space).
+            sign_pos: Magic square positions of the other sign (opposing or given signs).
+            calc_for: What's being calculated.
+
+        Returns:
+            The score gain based on the calculation option.
+        """
+
+        score_addition = SCORE_BLOCKING if calc_for == 'blocking' else SCORE_TWO_IN_ROW
+
+        return StateEvaluator.get_row_count(ms_idx, sign_pos) * score_addition
+
+
+    @staticmethod
+    def count_formations(state: tuple[dict, ...], big_idx: int, sign: str) -> tuple[int, ...]:
+        """
+        Count the formations of the given sign on an unfinished board.
+
+        Arguments:
+            state: The game state.
+            big_idx: Board index, 0 for big board.
+            sign: The sign to count for.
+
+        Returns:
+            The number of formations of every kind, in the order of FORMATIONS.
+        """
+
+        given_sign_pos = sorted(state[big_idx][sign])
+        other_sign_pos = sorted(state[big_idx]['X' if sign == 'O' else 'O'])
+        empty_sign_pos = set(range(1, 10)) - set(given_sign_pos) - set(other_sign_pos)
+
+        centers = 1 if 5 in given_sign_pos else 0
+        corners = len([ms_idx for ms_idx in given_sign_pos if ms_idx in MS_CORNERS])
+        blocks = sum(StateEvaluator.get_row_count(ms_idx, other_sign_pos) for ms_idx in given_sign_pos)
+        two_rows = sum(StateEvaluator.get_row_count(ms_idx, given_sign_pos) for ms_idx in empty_sign_pos)
+        forks = 1 if len([pos for pos in given_sign_pos if pos in MS_FORKS]) >= 3 else 0
+
+        return centers, corners, two_rows, forks, blocks
 
 
     def evaluate_board(self, state: tuple[dict, ...], big_idx: int, sign: str = None) -> int:
@@ -125,31 +175,8 @@ class StateEvaluator:
         if winner:
             return SCORE_WIN // 2 if winner == 'X' else -SCORE_WIN // 2
 
-        score = 0
-        given_sign_pos = sorted(list(state[big_idx][sign]))
-        other_sign_pos = sorted(state[big_idx]['X' if sign == 'O' else 'O'])
-        empty_sign_pos = set(range(1, 10)) - set(given_sign_pos) - set(other_sign_pos)
-
-        for ms_idx in given_sign_pos:
-
-            # Check for sign in corner
-            if ms_idx in MS_CORNERS:
-                score += SCORE_CORNER
-
-            # Check for sign in center
-            elif ms_idx == 5:
-                score += SCORE_CENTER
-
-            # Check for blocking opponent's two in a row
-            score += self.get_row_score(ms_idx, other_sign_pos, calc_for = 'blocking')
-
-        # Check for placing two in a row
-        for ms_idx in empty_sign_pos:
-            score += self.get_row_score(ms_idx, given_sign_pos, calc_for = 'two_row')
-
-        # Check for forks
-        if len([pos for pos in given_sign_pos if pos in MS_FORKS]) >= 3:
-            score += SCORE_FORK
+        counts = self.count_formations(state, big_idx, sign)
+        score = sum(count * weight for count, weight in zip(counts, FORMATION_WEIGHTS))
 
         return score if sign == 'X' else -score
 
@@ -1,4 +1,5 @@
 from .state_checker import StateChecker
+from .evaluator_registry import Evaluator, EvaluatorRegistry
 from .assets import inverse_board_display
 
 
@@ -36,10 +37,12 @@ THRESHOLD_TROLL = 50
 MODIFIER_TROLL = 5
 
 
-class StateEvaluatorV2:
+@EvaluatorRegistry.register('v2')
+class StateEvaluatorV2(Evaluator):
     """ Helper singleton class for evaluating game states. """
 
     _instance = None
+    table_based = True
 
 
     def __new__(cls) -> 'StateEvaluatorV2':
@@ -12,6 +12,7 @@ class StateUpdater:
     def update_state(state: tuple[dict, ...], big_idx: int, small_idx: int, sign: str) -> tuple[tuple[dict, ...], bool]:
         """
         Update the given state based on the last move made.
+        The given state is left untouched and shares its unchanged boards with the updated one.
 
         Arguments:
             state: The board state to update.
@@ -23,23 +24,26 @@ class StateUpdater:
             The updated state and whether the board at big_idx is complete.
         """
 
-        updated_state = list(dict(d) for d in state)
-        updated_state[big_idx]['display'] = list(updated_state[big_idx]['display'])
+        # Only the boards the move changes are copied. Every other board dict is shared with the
+        # given state, so older states stay valid and a game's history costs one or two dicts per move.
+        updated_state = list(state)
+        board = state[big_idx]
+        display = list(board['display'])
+        display[small_idx] = sign
+        updated_state[big_idx] = {**board, sign: board[sign] + (magic_square[small_idx],), 'display': tuple(display)}
 
-        updated_state[big_idx][sign] = updated_state[big_idx][sign] + (magic_square[small_idx],)
-        updated_state[big_idx]['display'][small_idx] = sign
-
-        updated_state[big_idx]['display'] = tuple(updated_state[big_idx]['display'])
         winning_sign = StateChecker.check_win(tuple(updated_state), big_idx)
 
         board_is_complete = False
         if winning_sign:
+            big_board = dict(state[0])
             if winning_sign != 'T':
-                updated_state[0][winning_sign] = updated_state[0][winning_sign] + (magic_square[big_idx],)
+                big_board[winning_sign] = big_board[winning_sign] + (magic_square[big_idx],)
 
-            updated_state[0]['display'] = list(updated_state[0]['display'])
-            updated_state[0]['display'][big_idx] = winning_sign
-            updated_state[0]['display'] = tuple(updated_state[0]['display'])
+            big_display = list(big_board['display'])
+            big_display[big_idx] = winning_sign
+            big_board['display'] = tuple(big_display)
+            updated_state[0] = big_board
 
             board_is_complete = True
 
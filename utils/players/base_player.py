@@ -7,6 +7,9 @@ class Player(ABC):
     legal_moves = []
     _initialized = False
 
+    # Attributes changing with every move the player makes, e.g. the depth of a dynamic search.
+    search_state_attributes = ()
+
 
     def __init__(self):
         """ Create an instance of the Player class. """
@@ -16,6 +19,7 @@ class Player(ABC):
             Player._initialized = True
 
         self.sign = None
+        self.search_cancelled = False
 
 
     def set_sign(self, sign: str):
@@ -29,6 +33,46 @@ class Player(ABC):
         self.sign = sign
 
 
+    def set_context(self, context: 'EngineContext'):
+        """
+        Track legal moves through the given engine context instead of the shared class list.
+
+        Arguments:
+            context: The engine context of the game the player takes part in.
+        """
+
+        self.legal_moves = context.legal_moves
+
+
+    def cancel_search(self):
+        """ Ask a running search to stop early. Its result should be discarded. """
+
+        self.search_cancelled = True
+
+
+    def get_search_state(self) -> dict:
+        """
+        Get the attributes changing with every move the player makes, to go back to them later.
+
+        Returns:
+            The values of search_state_attributes, by name.
+        """
+
+        return {name: getattr(self, name) for name in self.search_state_attributes}
+
+
+    def set_search_state(self, search_state: dict):
+        """
+        Go back to the attributes returned by get_search_state, e.g. when a move is taken back.
+
+        Arguments:
+            search_state: The values of search_state_attributes, by name.
+        """
+
+        for name, value in search_state.items():
+            setattr(self, name, value)
+
+
     @staticmethod
     def reset_legal_moves():
         """ Reset the legal moves list. """
@@ -53,8 +97,7 @@ class Player(ABC):
         return self.get_current_legal_moves(prev_small_idx)[0]
 
 
-    @classmethod
-    def update_legal_moves(cls, big_idx: int, small_idx: int, board_is_complete: bool = False):
+    def update_legal_moves(self, big_idx: int, small_idx: int, board_is_complete: bool = False):
         """
         Remove all moves that will be illegal for the rest of the game.
 
@@ -65,10 +108,10 @@ class Player(ABC):
         """
 
         if board_is_complete:
-            cls.legal_moves[big_idx].clear()
+            self.legal_moves[big_idx].clear()
 
         else:
-            cls.legal_moves[big_idx].remove(small_idx)
+            self.legal_moves[big_idx].remove(small_idx)
 
 
     def get_current_legal_moves(self, prev_small_idx: int | None) -> list[tuple[int, int]]:
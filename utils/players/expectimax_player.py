@@ -2,10 +2,9 @@ import time
 import random
 
 from .base_player import Player
-from utils.helpers import StateEvaluator, StateChecker, StateUpdater
+from utils.helpers import EvaluatorRegistry, StateChecker, StateUpdater, MoveGenerator, MOVES, DEFAULT_EVALUATOR
 
 
-StateEvaluator = StateEvaluator()
 StateChecker = StateChecker()
 
 INIT_DYNAMIC_DEPTH = 5
@@ -19,7 +18,11 @@ TIME_BREAK = 0.085
 class ExpectiMaxPlayer(Player):
     """ Class representing a player that uses the ExpectiMax algorithm. """
 
-    def __init__(self, target_depth: int | str = 'dynamic', use_randomness: bool = False):
+    search_state_attributes = ('moves_made', 'target_depth', 'counter')
+
+
+    def __init__(self, target_depth: int | str = 'dynamic', use_randomness: bool = False,
+                 evaluator: str = DEFAULT_EVALUATOR):
         """
         Create an instance of the ExpectiMaxPlayer class.
 
@@ -31,6 +34,7 @@ class ExpectiMaxPlayer(Player):
         Arguments:
             target_depth: The target depth value or option.
             use_randomness: Whether to randomize the first move.
+            evaluator: The name of the registered evaluator to score states with.
         """
 
         super().__init__()
@@ -53,10 +57,14 @@ class ExpectiMaxPlayer(Player):
 
         self.sign = None
         self.use_randomness = use_randomness
+        self.evaluator = EvaluatorRegistry.get_evaluator(evaluator)
         self.moves_made = -1
         self.counter = INIT_COUNTER
         self.start_time = None
 
+        # Score of the move chosen by the last search, None if the move was predefined.
+        self.last_score = None
+
 
     def expectimax(self, state: tuple[dict, ...], prev_small_idx: int, curr_depth: int,
                    is_maximizing: bool, is_averaging: bool) -> float:
@@ -74,22 +82,26 @@ class ExpectiMaxPlayer(Player):
             The score for the best move from the starting state.
         """
 
+        if self.search_cancelled:
+            return 0
+
         is_won = StateChecker.check_win(state, 0)
         sign = 'X' if is_maximizing else 'O'
 
         if is_won:
-            return StateEvaluator.heuristic(state, prev_small_idx, sign)
+            return self.evaluator.heuristic(state, prev_small_idx, sign)
 
         elif self.use_timed_depth and time.time() - self.start_time >= TIME_BREAK:
-            return StateEvaluator.heuristic(state, prev_small_idx, sign)
+            return self.evaluator.heuristic(state, prev_small_idx, sign)
 
         elif curr_depth == self.target_depth:
-            return StateEvaluator.heuristic(state, prev_small_idx, sign)
+            return self.evaluator.heuristic(state, prev_small_idx, sign)
 
         if is_averaging:
             avg_score, num_scores = 0, 0
 
-            for big_idx, small_idx in self.get_legal_moves_for_state(state, prev_small_idx):
+            for move in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move]
                 updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
                 avg_score += self.expectimax(updated_state, small_idx, curr_depth + 1, not is_maximizing, False)
                 num_scores += 1
@@ -99,7 +111,8 @@ class ExpectiMaxPlayer(Player):
         if is_maximizing:
             max_score = float('-inf')
 
-            for big_idx, small_idx in self.get_legal_moves_for_state(state, prev_small_idx):
+            for move in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move]
                 updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, 'X')
                 score = self.expectimax(updated_state, small_idx, curr_depth + 1, False, True)
                 max_score = max(max_score, score)
@@ -109,7 +122,8 @@ class ExpectiMaxPlayer(Player):
         else:
             min_score = float('inf')
 
-            for big_idx, small_idx in self.get_legal_moves_for_state(state, prev_small_idx):
+            for move in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move]
                 updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, 'O')
                 score = self.expectimax(updated_state, small_idx, curr_depth + 1, True, True)
                 min_score = min(min_score, score)
@@ -157,6 +171,8 @@ class ExpectiMaxPlayer(Player):
 
         is_maximizing = True if self.sign == 'X' else False
 
+        self.last_score = None
+
         premove = self.get_premove(state, prev_small_idx, is_maximizing)
         if premove:
             return premove
@@ -166,8 +182,9 @@ class ExpectiMaxPlayer(Player):
         best_score = float('-inf') if is_maximizing else float('inf')
         best_move = None
 
-        for big_idx, small_idx in self.get_current_legal_moves(prev_small_idx):
-            move = (big_idx, small_idx)
+        for move_code in MoveGenerator.get_legal_moves(state, prev_small_idx):
+            move = MOVES[move_code]
+            big_idx, small_idx = move
 
             updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, self.sign)
             curr_score = self.expectimax(updated_state, small_idx, 1, not is_maximizing, True)
@@ -181,6 +198,7 @@ class ExpectiMaxPlayer(Player):
                     best_score = curr_score
                     best_move = move
 
+        self.last_score = best_score
         return best_move
 
 
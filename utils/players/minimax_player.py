@@ -2,11 +2,9 @@ import time
 import random
 
 from .base_player import Player
-from utils.helpers import StateEvaluator, StateEvaluatorV2, StateChecker, StateUpdater
+from utils.helpers import EvaluatorRegistry, StateChecker, StateUpdater, MoveGenerator, MOVES, DEFAULT_EVALUATOR
 
 
-StateEvaluator = StateEvaluator()
-StateEvaluatorV2 = StateEvaluatorV2()
 StateChecker = StateChecker()
 
 INIT_DYNAMIC_DEPTH = 5
@@ -16,11 +14,17 @@ STEP = 3
 BASE = 2
 TIME_BREAK = 0.085
 
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
 
 class MiniMaxPlayer(Player):
     """ Class representing a player that uses the MiniMaxPlayer algorithm. """
 
-    def __init__(self, target_depth: int | str = 'dynamic', use_randomness: bool = False):
+    search_state_attributes = ('moves_made', 'target_depth', 'counter')
+
+
+    def __init__(self, target_depth: int | str = 'dynamic', use_randomness: bool = False,
+                 evaluator: str = DEFAULT_EVALUATOR):
         """
         Create an instance of the MiniMax class.
 
@@ -32,6 +36,7 @@ class MiniMaxPlayer(Player):
         Arguments:
             target_depth: The target depth value or option.
             use_randomness: Whether to randomize the first move.
+            evaluator: The name of the registered evaluator to score states with.
         """
 
         super().__init__()
@@ -54,10 +59,18 @@ class MiniMaxPlayer(Player):
 
         self.sign = None
         self.use_randomness = use_randomness
+        self.evaluator = EvaluatorRegistry.get_evaluator(evaluator)
         self.moves_made = -1
         self.counter = INIT_COUNTER
         self.start_time = None
 
+        # Score of the move chosen by the last search, None if the move was predefined.
+        self.last_score = None
+
+        # Scores of searched states, keyed by state, remaining depth and turn. Set by whoever runs
+        # the searches (e.g. the MoveBatcher), so the table can be shared by many players.
+        self.transposition_table = None
+
 
     def minimax_ab(self, state: tuple[dict, ...], prev_small_idx: int, curr_depth: int,
                    alpha: float, beta: float, is_maximizing: bool) -> float:
@@ -76,22 +89,89 @@ class MiniMaxPlayer(Player):
             The score for the best move from the starting state.
         """
 
+        if self.search_cancelled:
+            return 0
+
         is_won = StateChecker.check_win(state, 0)
         sign = 'X' if is_maximizing else 'O'
 
         if is_won:
-            return StateEvaluator.heuristic(state, prev_small_idx, sign)
+            return self.evaluator.heuristic(state, prev_small_idx, sign)
 
         elif self.use_timed_depth and time.time() - self.start_time >= TIME_BREAK:
-            return StateEvaluator.heuristic(state, prev_small_idx, sign)
+            return self.evaluator.heuristic(state, prev_small_idx, sign)
 
         elif curr_depth == self.target_depth:
-            return StateEvaluator.heuristic(state, prev_small_idx, sign)
+            return self.evaluator.heuristic(state, prev_small_idx, sign)
+
+        table = None if self.use_timed_depth else self.transposition_table
+        if table is not None:
+            key = (tuple(board['display'] for board in state), prev_small_idx,
+                   self.target_depth - curr_depth, is_maximizing)
+            entry = table.get(key)
+
+            if entry is not None:
+                score, bound = entry
+                if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or \
+                        (bound == UPPER_BOUND and score <= alpha):
+                    return score
+
+            score = self.search_children(state, prev_small_idx, curr_depth, alpha, beta, is_maximizing)
+
+            if self.search_cancelled:
+                return score
+
+            if score <= alpha:
+                table[key] = (score, UPPER_BOUND)
+            elif score >= beta:
+                table[key] = (score, LOWER_BOUND)
+            else:
+                table[key] = (score, EXACT)
+
+            return score
+
+        return self.search_children(state, prev_small_idx, curr_depth, alpha, beta, is_maximizing)
+
+
+    def search_children(self, state: tuple[dict, ...], prev_small_idx: int, curr_depth: int,
+                        alpha: float, beta: float, is_maximizing: bool) -> float:
+        """
+        Search every legal move from a state that isn't a leaf of the MiniMax tree.
+
+        Arguments:
+            state: The current state.
+            prev_small_idx: The index of the previous move made.
+            curr_depth: The current depth of the MiniMax tree.
+            alpha: The alpha value.
+            beta: The beta value.
+            is_maximizing: Whether the current move is maximizing.
+
+        Returns:
+            The score for the best move from the given state.
+        """
+
+        sign = 'X' if is_maximizing else 'O'
+
+        # The children are all leaves, so a batched evaluator scores them in one go. Pruning would only
+        # skip leaves, and the best of all of them leads to the same decisions above.
+        if self.evaluator.batched and curr_depth + 1 == self.target_depth and not self.use_timed_depth:
+            if self.search_cancelled:
+                return 0
+
+            children = []
+            for move in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move]
+                updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+                children.append((updated_state, small_idx, 'O' if is_maximizing else 'X'))
+
+            scores = self.evaluator.heuristic_batch(children)
+            return max(scores) if is_maximizing else min(scores)
 
         if is_maximizing:
             max_score = float('-inf')
 
-            for big_idx, small_idx in self.get_legal_moves_for_state(state, prev_small_idx):
+            for move in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move]
                 updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
                 score = self.minimax_ab(updated_state, small_idx, curr_depth + 1, alpha, beta, False)
                 max_score = max(max_score, score)
@@ -105,7 +185,8 @@ class MiniMaxPlayer(Player):
         else:
             min_score = float('inf')
 
-            for big_idx, small_idx in self.get_legal_moves_for_state(state, prev_small_idx):
+            for move in MoveGenerator.get_legal_moves(state, prev_small_idx):
+                big_idx, small_idx = MOVES[move]
                 updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
                 score = self.minimax_ab(updated_state, small_idx, curr_depth + 1, alpha, beta, True)
                 min_score = min(min_score, score)
@@ -152,6 +233,28 @@ class MiniMaxPlayer(Player):
             self.counter += 1
 
 
+    @staticmethod
+    def get_dynamic_depth(moves_made: int) -> int:
+        """
+        Get the dynamic target depth reached by calling update_target_depth once for every move made.
+
+        Arguments:
+            moves_made: The number of moves made.
+
+        Returns:
+            The target depth.
+        """
+
+        target_depth, counter = INIT_DYNAMIC_DEPTH, INIT_COUNTER
+
+        for move_number in range(moves_made + 1):
+            if move_number > THRESHOLD and move_number % STEP == 0:
+                target_depth += BASE ** counter
+                counter += 1
+
+        return target_depth
+
+
     def make_move(self, state: tuple[dict, ...], prev_small_idx: int) -> tuple[int, int]:
         self.moves_made += 1
 
@@ -160,6 +263,8 @@ class MiniMaxPlayer(Player):
 
         is_maximizing = True if self.sign == 'X' else False
 
+        self.last_score = None
+
         premove = self.get_premove(state, prev_small_idx, is_maximizing)
         if premove:
             return premove
@@ -169,8 +274,9 @@ class MiniMaxPlayer(Player):
         best_score = init_alpha if is_maximizing else init_beta
         best_move = None
 
-        for big_idx, small_idx in self.get_current_legal_moves(prev_small_idx):
-            move = (big_idx, small_idx)
+        for move_code in MoveGenerator.get_legal_moves(state, prev_small_idx):
+            move = MOVES[move_code]
+            big_idx, small_idx = move
 
             updated_state, _ = StateUpdater.update_state(state, big_idx, small_idx, self.sign)
             curr_score = self.minimax_ab(updated_state, small_idx, 1, init_alpha, init_beta, not is_maximizing)
@@ -184,6 +290,7 @@ class MiniMaxPlayer(Player):
                     best_score = curr_score
                     best_move = move
 
+        self.last_score = best_score
         return best_move
 
 
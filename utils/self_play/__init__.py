@@ -0,0 +1 @@
+from .self_play_generator import *
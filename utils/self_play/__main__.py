@@ -0,0 +1,25 @@
+import argparse
+
+from .self_play_generator import SelfPlayGenerator
+
+
+parser = argparse.ArgumentParser(description = 'Generate positions labelled with search scores and game results '
+                                               'from self-play games.')
+parser.add_argument('output', help = 'directory to write the shards of positions to')
+parser.add_argument('--games', type = int, default = 1000, help = 'number of self-play games')
+parser.add_argument('--players', nargs = 2, default = ['minimax:3', 'minimax:3'], metavar = 'PLAYER',
+                    help = 'the two players, e.g. "minimax:4", "minimax:dynamic:v2", "expectimax:3" or "random"')
+parser.add_argument('--opening-moves', type = int, default = 4, help = 'random moves every game starts with')
+parser.add_argument('--shard-size', type = int, default = 65536, help = 'positions per shard')
+parser.add_argument('--workers', type = int, default = None, help = 'number of worker processes')
+parser.add_argument('--seed', type = int, default = None, help = 'seed for the random moves')
+args = parser.parse_args()
+
+generator = SelfPlayGenerator(
+    players = tuple(args.players),
+    opening_moves = args.opening_moves,
+    max_workers = args.workers,
+    shard_size = args.shard_size,
+    seed = args.seed
+)
+print(f'[ SELF-PLAY ] : {generator.generate_shards(args.games, args.output)}')
@@ -0,0 +1,310 @@
+import collections
+import glob
+import os
+import random
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterator
+
+import numpy as np
+
+from utils.players import Player, MiniMaxPlayer, ExpectiMaxPlayer
+from utils.helpers import StateChecker, StateUpdater, MoveGenerator, MOVES, EvaluatorRegistry, DEFAULT_EVALUATOR
+
+
+StateChecker = StateChecker()
+
+PLAYERS = {'minimax': MiniMaxPlayer, 'expectimax': ExpectiMaxPlayer, 'random': None}
+RESULTS = {'X': 1.0, 'O': 0.0, 'T': 0.5}
+
+MAX_TABLE_ENTRIES = 2_000_000
+
+# Columns of the shards, with their types. Positions are stored the way PlayoutBatch holds games.
+COLUMNS = {
+    'cells': np.int8,       # (positions, 81) with 0 for empty, 1 for X and 2 for O, indexed by move code.
+    'targets': np.int8,     # The board index (0-8) the next move is sent to, -1 for a free move.
+    'turns': np.int8,       # 1 if X moves next, 2 if O does.
+    'plies': np.int16,      # Number of moves made before the position.
+    'scores': np.float32,   # The search score of the move made from the position, NaN if it wasn't searched.
+    'results': np.float32,  # The result of the game for X: 1 for a win, 0.5 for a tie and 0 for a loss.
+    'games': np.int32,      # Index of the game the position was reached in.
+}
+
+transposition_tables = {}
+
+
+def create_player(spec: str) -> Player | None:
+    """
+    Create a player from its description.
+
+    Descriptions:
+        - "minimax:<depth>[:<evaluator>]" | A MiniMaxPlayer, the depth being a number, "dynamic" or "timed".
+        - "expectimax:<depth>[:<evaluator>]" | An ExpectiMaxPlayer, with the same depths.
+        - "random" | Uniformly random moves.
+
+    Arguments:
+        spec: The description of the player.
+
+    Returns:
+        The player, or None for random moves.
+
+    Raises:
+        ValueError: If the description doesn't match any player.
+    """
+
+    name, *options = spec.split(':')
+    if name not in PLAYERS:
+        raise ValueError(f'unknown player {name!r}, choose one of {", ".join(PLAYERS)}')
+
+    if PLAYERS[name] is None:
+        return None
+
+    depth = options[0] if options else 'dynamic'
+    evaluator = options[1] if len(options) > 1 else DEFAULT_EVALUATOR
+    EvaluatorRegistry.get_evaluator(evaluator)
+
+    return PLAYERS[name](target_depth = int(depth) if depth.isdigit() else depth, evaluator = evaluator)
+
+
+def play_game(players: tuple[str, str], opening_moves: int, seed: int, game: int) -> dict:
+    """
+    Play a game between two players, starting with random moves, and record every position.
+
+    Arguments:
+        players: Descriptions of the players moving as X and as O.
+        opening_moves: Number of random moves the game starts with.
+        seed: The seed for the random moves.
+        game: Index of the game.
+
+    Returns:
+        The columns of the positions reached before every move.
+    """
+
+    rng = random.Random(seed)
+    searchers = {}
+
+    for sign, spec in zip(('X', 'O'), players):
+        searchers[sign] = create_player(spec)
+        if searchers[sign] is not None:
+            searchers[sign].set_sign(sign)
+
+            # Scores from different evaluators can't be mixed, so each one gets its own table.
+            if isinstance(searchers[sign], MiniMaxPlayer):
+                searchers[sign].transposition_table = transposition_tables.setdefault(
+                    searchers[sign].evaluator.name, {})
+
+    state = tuple(
+        {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+    )
+    prev_small_idx = None
+    sign = 'X'
+
+    cells = np.zeros(81, dtype = np.int8)
+    rows, targets, scores = [], [], []
+
+    while not StateChecker.check_win(state, 0):
+        player = searchers[sign]
+
+        if player is None or len(rows) < opening_moves:
+            big_idx, small_idx = MOVES[rng.choice(MoveGenerator.get_legal_moves(state, prev_small_idx))]
+            score = None
+            if player is not None:
+                player.moves_made += 1
+        else:
+            big_idx, small_idx = player.make_move(state, prev_small_idx)
+            score = player.last_score
+
+        rows.append(cells.copy())
+        targets.append(-1 if prev_small_idx is None else prev_small_idx - 1)
+        scores.append(np.nan if score is None else score)
+
+        state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+        cells[(big_idx - 1) * 9 + small_idx - 1] = 1 if sign == 'X' else 2
+        prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+        sign = 'O' if sign == 'X' else 'X'
+
+    num_positions = len(rows)
+    plies = np.arange(num_positions)
+
+    return {
+        'cells': np.array(rows, dtype = COLUMNS['cells']).reshape(num_positions, 81),
+        'targets': np.array(targets, dtype = COLUMNS['targets']),
+        'turns': (plies % 2 + 1).astype(COLUMNS['turns']),
+        'plies': plies.astype(COLUMNS['plies']),
+        'scores': np.array(scores, dtype = COLUMNS['scores']),
+        'results': np.full(num_positions, RESULTS[StateChecker.check_win(state, 0)], dtype = COLUMNS['results']),
+        'games': np.full(num_positions, game, dtype = COLUMNS['games']),
+    }
+
+
+def play_games(players: tuple[str, str], opening_moves: int, seeds: list[int], first_game: int) -> dict:
+    """
+    Play several games, one after another. Runs inside a worker process.
+
+    The players swap signs every game, so both descriptions play as X equally often.
+
+    Arguments:
+        players: Descriptions of the two players.
+        opening_moves: Number of random moves every game starts with.
+        seeds: The seed of every game.
+        first_game: Index of the first game.
+
+    Returns:
+        The columns of the positions of all games, in the order of the games.
+    """
+
+    if sum(len(table) for table in transposition_tables.values()) > MAX_TABLE_ENTRIES:
+        transposition_tables.clear()
+
+    games = []
+    for game, seed in enumerate(seeds, start = first_game):
+        pairing = players if game % 2 == 0 else players[::-1]
+        games.append(play_game(pairing, opening_moves, seed, game))
+
+    return {column: np.concatenate([game[column] for game in games]) for column in COLUMNS}
+
+
+def load_shards(directory: str) -> dict:
+    """
+    Read every shard written by SelfPlayGenerator.generate_shards.
+
+    Arguments:
+        directory: The directory the shards were written to.
+
+    Returns:
+        The columns of all positions, in the order of the shards.
+
+    Raises:
+        FileNotFoundError: If the directory has no shards.
+    """
+
+    paths = sorted(glob.glob(os.path.join(directory, 'shard-*.npz')))
+    if not paths:
+        raise FileNotFoundError(f'no shards in {directory}')
+
+    shards = []
+    for path in paths:
+        with np.load(path) as shard:
+            shards.append({column: shard[column] for column in COLUMNS})
+
+    return {column: np.concatenate([shard[column] for shard in shards]) for column in COLUMNS}
+
+
+class SelfPlayGenerator:
+    """
+    Class for generating positions from self-play games across a pool of worker processes.
+
+    Every position is recorded with the search score of the move made from it and the result
+    of its game, and the positions are written to disk in shards of NumPy columns. Games are
+    sent to the workers in chunks, and only a few chunks per worker are in flight, so memory
+    use stays flat no matter how many games are played.
+    """
+
+    def __init__(self, players: tuple[str, str] = ('minimax:3', 'minimax:3'), opening_moves: int = 4,
+                 max_workers: int = None, chunk_size: int = 4, shard_size: int = 65536, seed: int = None,
+                 executor: Executor = None):
+        """
+        Create an instance of the SelfPlayGenerator class.
+
+        Arguments:
+            players: Descriptions of the two players, see create_player.
+            opening_moves: Number of random moves every game starts with.
+            max_workers: Number of worker processes, defaults to the CPU count.
+            chunk_size: Number of games sent to a worker at once.
+            shard_size: Number of positions to collect before writing a shard.
+            seed: The seed for the random moves.
+            executor: An executor to use instead of creating a process pool.
+
+        Raises:
+            ValueError: If a description doesn't match any player.
+        """
+
+        for spec in players:
+            create_player(spec)
+
+        self.players = tuple(players)
+        self.opening_moves = opening_moves
+        self.workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.shard_size = shard_size
+        self.rng = random.Random(seed)
+        self.executor = executor
+        self.owns_executor = executor is None
+
+
+    def generate(self, num_games: int) -> Iterator[dict]:
+        """
+        Play the given number of games.
+
+        Arguments:
+            num_games: Number of games.
+
+        Yields:
+            The columns of the positions of every chunk of games, in the order of the games.
+        """
+
+        executor = self.executor or ProcessPoolExecutor(max_workers = self.workers)
+        in_flight = collections.deque()
+        next_game = 0
+
+        try:
+            while True:
+                while len(in_flight) < self.workers * 2 and next_game < num_games:
+                    seeds = [self.rng.getrandbits(64) for _ in range(min(self.chunk_size, num_games - next_game))]
+                    in_flight.append(executor.submit(play_games, self.players, self.opening_moves, seeds, next_game))
+                    next_game += len(seeds)
+
+                if not in_flight:
+                    break
+
+                yield in_flight.popleft().result()
+
+        finally:
+            if self.owns_executor:
+                executor.shutdown(cancel_futures = True)
+
+
+    def generate_shards(self, num_games: int, directory: str) -> dict:
+        """
+        Play the given number of games and write their positions to shards in a directory.
+
+        Arguments:
+            num_games: Number of games.
+            directory: The directory to write the shards to, created if it doesn't exist.
+
+        Returns:
+            The number of games, positions and shards, the time taken and the positions per second.
+        """
+
+        start_time = time.perf_counter()
+        os.makedirs(directory, exist_ok = True)
+
+        stats = {'games': 0, 'positions': 0, 'shards': 0}
+        buffer, buffered = [], 0
+
+        def write_shard():
+            columns = {column: np.concatenate([chunk[column] for chunk in buffer]) for column in COLUMNS}
+            np.savez(os.path.join(directory, f'shard-{stats["shards"]:05d}.npz'), **columns)
+            stats['shards'] += 1
+            buffer.clear()
+
+        for chunk in self.generate(num_games):
+            stats['games'] += len(np.unique(chunk['games']))
+            stats['positions'] += len(chunk['games'])
+
+            buffer.append(chunk)
+            buffered += len(chunk['games'])
+            if buffered >= self.shard_size:
+                write_shard()
+                buffered = 0
+
+        if buffer:
+            write_shard()
+
+        stats['seconds'] = round(time.perf_counter() - start_time, 2)
+        stats['positions_per_second'] = round(stats['positions'] / stats['seconds'], 1) if stats['seconds'] else None
+        return stats
+
+
+__all__ = ['SelfPlayGenerator', 'create_player', 'load_shards', 'play_game', 'play_games']
@@ -0,0 +1,2 @@
+from .game_server import *
+from .move_batcher import *
@@ -0,0 +1,475 @@
+import asyncio
+import collections
+import itertools
+import json
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from utils.players import Player, RandomPlayer, MiniMaxPlayer, ExpectiMaxPlayer
+from utils.helpers import StateChecker, StateUpdater, MoveGenerator, MOVES, EngineContext, DEFAULT_EVALUATOR
+from .move_batcher import MoveBatcher
+
+
+StateChecker = StateChecker()
+
+PLAYER_TYPES = {
+    'random': RandomPlayer,
+    'minimax': MiniMaxPlayer,
+    'expectimax': ExpectiMaxPlayer,
+}
+
+LATENCY_WINDOW = 10000
+
+# Deepest static search a client can ask for, deeper searches would tie up a worker for minutes.
+MAX_DEPTH = 8
+SEARCH_OPTIONS = ('dynamic', 'timed')
+
+
+class GameSession:
+    """ Class representing a single game between a client and an AI player. """
+
+    def __init__(self, session_id: int, ai_player: Player, client_sign: str = 'X'):
+        """
+        Create an instance of the GameSession class.
+
+        Arguments:
+            session_id: The unique session id.
+            ai_player: The AI player object.
+            client_sign: The sign the client plays with, X or O.
+        """
+
+        self.session_id = session_id
+        self.client_sign = client_sign
+        self.context = EngineContext()
+
+        self.ai_player = ai_player
+        self.ai_player.set_sign('O' if client_sign == 'X' else 'X')
+        self.context.bind_players(self.ai_player)
+
+        self.state = tuple(
+            {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+        )
+        self.prev_small_idx = None
+        self.sign = 'X'
+        self.moves = []
+        self.lock = asyncio.Lock()
+
+
+    @property
+    def winner(self) -> str | bool:
+        """ The winning sign ("T" if it's a tie) or False if the game is still going. """
+
+        return StateChecker.check_win(self.state, 0)
+
+
+    def apply_move(self, big_idx: int, small_idx: int):
+        """
+        Apply a move for the sign whose turn it is.
+
+        Arguments:
+            big_idx: Board index.
+            small_idx: Position index.
+
+        Raises:
+            ValueError: If the game is over or the move is illegal.
+        """
+
+        if self.winner:
+            raise ValueError('the game is over')
+
+        if big_idx not in range(1, 10) or small_idx not in range(1, 10):
+            raise ValueError('indices must be in range 1-9')
+
+        legal_mask = MoveGenerator.get_legal_moves_mask(self.state, self.prev_small_idx)
+        if not legal_mask >> MoveGenerator.encode_move(big_idx, small_idx) & 1:
+            raise ValueError(f'illegal move ({big_idx}, {small_idx})')
+
+        self.state, board_is_complete = StateUpdater.update_state(self.state, big_idx, small_idx, self.sign)
+        self.context.update_legal_moves(big_idx, small_idx, board_is_complete)
+
+        self.prev_small_idx = None if self.state[0]['display'][small_idx] != '-' else small_idx
+        self.moves.append((big_idx, small_idx))
+        self.sign = 'O' if self.sign == 'X' else 'X'
+
+
+    def get_position(self) -> tuple[tuple[dict, ...], int | None, str, int]:
+        """
+        Get what restore_position needs to go back to the current position.
+
+        Returns:
+            The state, the small index of the previous move, the sign to move and the number of moves made.
+        """
+
+        return self.state, self.prev_small_idx, self.sign, len(self.moves)
+
+
+    def restore_position(self, position: tuple[tuple[dict, ...], int | None, str, int]):
+        """
+        Go back to a position of this session, e.g. when the AI fails to answer a move.
+
+        Arguments:
+            position: The position, as returned by get_position.
+        """
+
+        self.state, self.prev_small_idx, self.sign, num_moves = position
+        del self.moves[num_moves:]
+        self.context.sync_legal_moves(self.state)
+
+
+    def set_ai_player(self, ai_player: Player):
+        """
+        Replace the AI player with the copy returned from a worker process.
+
+        Arguments:
+            ai_player: The AI player object.
+        """
+
+        self.ai_player = ai_player
+        self.context.bind_players(self.ai_player)
+
+
+    def to_dict(self) -> dict:
+        """
+        Get a JSON serializable view of the session.
+
+        Returns:
+            The session id, boards, turn, next board, legal moves and winner.
+        """
+
+        winner = self.winner
+
+        return {
+            'session': self.session_id,
+            'boards': [''.join(board['display'][1:]) for board in self.state],
+            'turn': self.sign,
+            'next_board': self.prev_small_idx,
+            'legal_moves': [] if winner else [MOVES[move] for move in
+                                              MoveGenerator.get_legal_moves(self.state, self.prev_small_idx)],
+            'winner': winner or None,
+            'moves': len(self.moves),
+        }
+
+
+class GameServer:
+    """
+    Class for hosting many concurrent games against the AI over TCP.
+
+    Protocol:
+        Clients send one JSON object per line and receive one JSON object per line.
+        - {"cmd": "new", "player": "minimax", "depth": 5, "sign": "X", "evaluator": "v1"} | Start a session.
+        - {"cmd": "move", "session": 1, "move": [5, 5]} | Make a move, the AI answers in the same reply.
+        - {"cmd": "state", "session": 1} | Get the session state.
+        - {"cmd": "close", "session": 1} | End a session.
+        - {"cmd": "stats"} | Get the server's session count, per-move AI latency and batching stats.
+        The depth is a whole number from 1 to MAX_DEPTH, "dynamic" or "timed". Every reply has an "ok" field,
+        failed requests also have an "error" field, and session replies list the legal moves.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, max_workers: int = None,
+                 executor: Executor = None, batch_window: float = 0.002, max_batch_size: int = 64):
+        """
+        Create an instance of the GameServer class.
+
+        Arguments:
+            host: The host to listen on.
+            port: The port to listen on, 0 picks a free one.
+            max_workers: Number of worker processes for AI moves, defaults to the CPU count.
+            executor: An executor to use instead of creating a process pool.
+            batch_window: Seconds to collect AI move requests before sending them to the workers as a batch.
+            max_batch_size: Number of collected AI move requests that sends a batch right away.
+        """
+
+        self.host = host
+        self.port = port
+        self.executor = executor or ProcessPoolExecutor(max_workers = max_workers)
+        self.owns_executor = executor is None
+        self.batcher = MoveBatcher(self.executor, max_workers, max_batch_size, batch_window)
+
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.move_latencies = collections.deque(maxlen = LATENCY_WINDOW)
+        self.moves_served = 0
+        self.server = None
+
+
+    async def start(self):
+        """ Start listening for clients. """
+
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+
+    async def serve_forever(self):
+        """ Start the server and serve clients until cancelled. """
+
+        await self.start()
+        print(f'[ SERVER ] : Listening on {self.host}:{self.port}')
+
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+
+    async def close(self):
+        """ Stop the server and shut down the worker processes. """
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+        if self.owns_executor:
+            self.executor.shutdown(wait = False, cancel_futures = True)
+
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve requests from a single client connection.
+
+        Arguments:
+            reader: The connection's stream reader.
+            writer: The connection's stream writer.
+        """
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+
+                try:
+                    reply = await self.handle_request(json.loads(line))
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {'ok': False, 'error': str(error)}
+
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+
+        except (ConnectionError, asyncio.CancelledError):
+            # Connections still open when the server shuts down end here as well.
+            pass
+
+        finally:
+            writer.close()
+
+
+    async def handle_request(self, request: dict) -> dict:
+        """
+        Dispatch a single request.
+
+        Arguments:
+            request: The decoded request.
+
+        Returns:
+            The reply to send back.
+        """
+
+        match request['cmd']:
+            case 'new':
+                session = await self.new_session(request.get('player', 'minimax'), request.get('depth', 5),
+                                                 request.get('sign', 'X'), request.get('evaluator', DEFAULT_EVALUATOR))
+                return {'ok': True, **session.to_dict()}
+
+            case 'move':
+                session = self.get_session(request['session'])
+                async with session.lock:
+                    big_idx, small_idx = map(int, request['move'])
+                    position = session.get_position()
+                    session.apply_move(big_idx, small_idx)
+
+                    # A failed AI move takes back the client's as well, so it's still the client's turn.
+                    try:
+                        ai_move = await self.play_ai_move(session)
+                    except Exception:
+                        session.restore_position(position)
+                        raise
+                return {'ok': True, 'ai_move': ai_move, **session.to_dict()}
+
+            case 'state':
+                return {'ok': True, **self.get_session(request['session']).to_dict()}
+
+            case 'close':
+                self.sessions.pop(request['session'], None)
+                return {'ok': True}
+
+            case 'stats':
+                return {'ok': True, 'sessions': len(self.sessions), 'moves': self.moves_served,
+                        **self.get_latency_stats(), **self.batcher.get_stats()}
+
+        raise ValueError(f'unknown command {request["cmd"]!r}')
+
+
+    async def new_session(self, player_type: str, depth: int | str, client_sign: str,
+                          evaluator: str = DEFAULT_EVALUATOR) -> GameSession:
+        """
+        Start a new session, letting the AI open the game if the client plays O.
+
+        Arguments:
+            player_type: The AI player type, one of PLAYER_TYPES.
+            depth: The target depth for searching players, from 1 to MAX_DEPTH, or one of SEARCH_OPTIONS.
+            client_sign: The sign the client plays with, X or O.
+            evaluator: The name of the registered evaluator for searching players.
+
+        Returns:
+            The new session.
+
+        Raises:
+            ValueError: If the player type, depth or sign isn't supported.
+        """
+
+        if player_type not in PLAYER_TYPES:
+            raise ValueError(f'unknown player type {player_type!r}')
+
+        if client_sign not in ('X', 'O'):
+            raise ValueError('sign must be X or O')
+
+        player_class = PLAYER_TYPES[player_type]
+        if player_class is RandomPlayer:
+            ai_player = player_class()
+        else:
+            if depth not in SEARCH_OPTIONS and not (type(depth) is int and 1 <= depth <= MAX_DEPTH):
+                raise ValueError(f'depth must be "dynamic", "timed" or a whole number from 1 to {MAX_DEPTH}')
+            ai_player = player_class(target_depth = depth, evaluator = evaluator)
+
+        session = GameSession(next(self.session_ids), ai_player, client_sign)
+        self.sessions[session.session_id] = session
+
+        if client_sign == 'O':
+            async with session.lock:
+                try:
+                    await self.play_ai_move(session)
+                except Exception:
+                    self.sessions.pop(session.session_id, None)
+                    raise
+
+        return session
+
+
+    def get_session(self, session_id: int) -> GameSession:
+        """
+        Get a running session.
+
+        Arguments:
+            session_id: The session id.
+
+        Returns:
+            The session.
+
+        Raises:
+            KeyError: If there's no session with the given id.
+        """
+
+        if session_id not in self.sessions:
+            raise KeyError(f'unknown session {session_id}')
+
+        return self.sessions[session_id]
+
+
+    async def play_ai_move(self, session: GameSession) -> tuple[int, int] | None:
+        """
+        Compute the AI's move in a worker process, batched with other sessions' moves, and apply it.
+
+        Arguments:
+            session: The session whose AI is moving.
+
+        Returns:
+            The AI's move or None if the game is already over.
+        """
+
+        if session.winner:
+            return None
+
+        start_time = time.perf_counter()
+        move, ai_player = await self.batcher.submit(session.ai_player, session.state, session.prev_small_idx)
+
+        self.move_latencies.append(time.perf_counter() - start_time)
+        self.moves_served += 1
+
+        session.set_ai_player(ai_player)
+        session.apply_move(*move)
+
+        return move
+
+
+    def get_latency_stats(self) -> dict:
+        """
+        Summarize the latency of the most recent AI moves.
+
+        Returns:
+            The mean, median, tail percentiles and maximum in milliseconds.
+        """
+
+        if not self.move_latencies:
+            return {'latency_ms': None}
+
+        latencies = sorted(self.move_latencies)
+        last = len(latencies) - 1
+
+        def percentile(p: float) -> float:
+            return round(latencies[round(p * last)] * 1000, 3)
+
+        return {'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3),
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': percentile(1.0),
+        }}
+
+
+class GameClient:
+    """ Class for driving games on a GameServer from a local asyncio program. """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765):
+        """
+        Create an instance of the GameClient class.
+
+        Arguments:
+            host: The server host.
+            port: The server port.
+        """
+
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+
+    async def connect(self):
+        """ Open the connection to the server. """
+
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+
+    async def request(self, cmd: str, **kwargs) -> dict:
+        """
+        Send a request and wait for its reply.
+
+        Arguments:
+            cmd: The command name.
+            kwargs: The command arguments.
+
+        Returns:
+            The decoded reply.
+        """
+
+        self.writer.write(json.dumps({'cmd': cmd, **kwargs}).encode() + b'\n')
+        await self.writer.drain()
+
+        return json.loads(await self.reader.readline())
+
+
+    async def close(self):
+        """ Close the connection to the server. """
+
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+__all__ = ['GameServer', 'GameSession', 'GameClient']
+
+
+if __name__ == '__main__':
+    asyncio.run(GameServer().serve_forever())
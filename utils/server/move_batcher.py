@@ -0,0 +1,200 @@
+import asyncio
+import math
+import os
+
+from concurrent.futures import Executor
+
+from utils.players import Player, MiniMaxPlayer
+
+
+MAX_TABLE_ENTRIES = 2_000_000
+
+# Searches up to this depth take about as long as sending a task to a worker, deeper ones get a task of their own.
+CHEAP_DEPTH = 2
+
+transposition_tables = {}
+
+
+def compute_moves(requests: list[tuple[Player, tuple[dict, ...], int | None]]) -> list[tuple[tuple[int, int], Player]]:
+    """
+    Let several AI players make a move, one after another. Runs inside a worker process.
+
+    Every search in the worker shares the process' StateChecker and evaluator caches
+    and a transposition table per evaluator, so positions reached by more than one game
+    are only evaluated once.
+
+    Arguments:
+        requests: The players with the state and previous small index to move from.
+
+    Returns:
+        The chosen moves and the players, in the order of the requests.
+    """
+
+    if sum(len(table) for table in transposition_tables.values()) > MAX_TABLE_ENTRIES:
+        transposition_tables.clear()
+
+    results = []
+
+    for player, state, prev_small_idx in requests:
+        uses_table = isinstance(player, MiniMaxPlayer)
+
+        if uses_table:
+            # Scores from different evaluators can't be mixed, so each one gets its own table.
+            player.transposition_table = transposition_tables.setdefault(player.evaluator.name, {})
+
+        try:
+            move = player.make_move(state, prev_small_idx)
+
+        finally:
+            # The table stays in the worker, it shouldn't be sent back with the player.
+            if uses_table:
+                player.transposition_table = None
+
+        results.append((move, player))
+
+    return results
+
+
+def is_cheap(player: Player) -> bool:
+    """
+    Check whether a player's move is too quick to be worth a worker task of its own.
+
+    Arguments:
+        player: The AI player.
+
+    Returns:
+        True for players that don't search or search at most CHEAP_DEPTH moves ahead, False otherwise.
+    """
+
+    return getattr(player, 'target_depth', 0) <= CHEAP_DEPTH and not getattr(player, 'use_timed_depth', False)
+
+
+class MoveBatcher:
+    """
+    Class for batching move requests from many games into shared worker tasks.
+
+    Requests that arrive within the batch window are collected and dispatched together. Every search
+    deeper than CHEAP_DEPTH is a task of its own, so a slow search only delays itself, while the quick
+    moves are split into one chunk per worker instead of paying the task overhead for every single one.
+    Each worker process keeps its caches and transposition tables between tasks.
+    """
+
+    def __init__(self, executor: Executor, workers: int = None, max_batch_size: int = 64,
+                 batch_window: float = 0.002):
+        """
+        Create an instance of the MoveBatcher class.
+
+        Arguments:
+            executor: The executor running the searches.
+            workers: Number of chunks to split the quick moves of a batch into, defaults to the CPU count.
+            max_batch_size: Number of pending requests that dispatches a batch right away.
+            batch_window: Seconds to wait for more requests after the first pending one.
+        """
+
+        self.executor = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+
+        self.pending = []
+        self.flush_handle = None
+        self.batches_dispatched = 0
+        self.requests_dispatched = 0
+
+
+    async def submit(self, player: Player, state: tuple[dict, ...],
+                     prev_small_idx: int | None) -> tuple[tuple[int, int], Player]:
+        """
+        Queue a move request and wait for its batch to be computed.
+
+        Arguments:
+            player: The AI player, carrying its own search state.
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+
+        Returns:
+            The chosen move and the player with its updated search state.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((future, (player, state, prev_small_idx)))
+
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_window, self.flush)
+
+        return await future
+
+
+    def flush(self):
+        """ Dispatch all pending requests to the executor. """
+
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        cheap = [item for item in batch if is_cheap(item[1][0])]
+        chunks = [[item] for item in batch if not is_cheap(item[1][0])]
+
+        if cheap:
+            chunk_size = math.ceil(len(cheap) / self.workers)
+            chunks += [cheap[start:start + chunk_size] for start in range(0, len(cheap), chunk_size)]
+
+        for chunk in chunks:
+            task = loop.run_in_executor(self.executor, compute_moves, [request for _, request in chunk])
+            task.add_done_callback(lambda done, chunk = chunk: self.resolve(chunk, done))
+
+        self.batches_dispatched += 1
+        self.requests_dispatched += len(batch)
+
+
+    @staticmethod
+    def resolve(chunk: list[tuple[asyncio.Future, tuple]], task: asyncio.Future):
+        """
+        Hand the results of a finished chunk to the requests waiting for them.
+
+        Arguments:
+            chunk: The waiting futures with their requests.
+            task: The finished executor task.
+        """
+
+        if task.cancelled():
+            for future, _ in chunk:
+                future.cancel()
+            return
+
+        if task.exception() is not None:
+            for future, _ in chunk:
+                if not future.done():
+                    future.set_exception(task.exception())
+            return
+
+        for (future, _), result in zip(chunk, task.result()):
+            if not future.done():
+                future.set_result(result)
+
+
+    def get_stats(self) -> dict:
+        """
+        Summarize how the requests were batched.
+
+        Returns:
+            The number of batches and requests dispatched and the average batch size.
+        """
+
+        return {
+            'batches': self.batches_dispatched,
+            'average_batch_size': round(self.requests_dispatched / self.batches_dispatched, 2)
+                                  if self.batches_dispatched else None,
+        }
+
+
+__all__ = ['MoveBatcher', 'compute_moves', 'is_cheap']
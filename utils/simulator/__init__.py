@@ -1 +1,3 @@
 from .simulator import *
+from .sampling_profiler import *
+from .latency_histogram import *
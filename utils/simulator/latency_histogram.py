@@ -0,0 +1,305 @@
+import array
+import math
+
+from utils.game import Game
+from utils.helpers import PositionCodec
+
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Class for counting latencies in a fixed number of log-spaced buckets.
+
+    Every bucket is growth times wider than the one before, so percentiles are within the same relative
+    error, about half of growth - 1, from a microsecond to many seconds, while memory stays the same no
+    matter how many latencies are recorded. Histograms with the same buckets can be merged, e.g. the
+    histograms of several worker processes. The count, total, minimum and maximum are exact.
+    """
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 1e3, growth: float = 1.05):
+        """
+        Create an instance of the LatencyHistogram class.
+
+        Arguments:
+            min_value: The upper bound of the first bucket, in seconds. Smaller latencies are counted in it.
+            max_value: The smallest latency counted in the last bucket, in seconds.
+            growth: The ratio between the bounds of consecutive buckets.
+        """
+
+        self.min_value = min_value
+        self.growth = growth
+        self.log_growth = math.log(growth)
+        self.counts = array.array('q', bytes(8 * (self.get_bucket(max_value) + 1)))
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+
+    def get_bucket(self, value: float) -> int:
+        """
+        Get the bucket a latency is counted in.
+
+        Arguments:
+            value: The latency in seconds.
+
+        Returns:
+            The index of the bucket.
+        """
+
+        if value <= self.min_value:
+            return 0
+
+        return math.ceil(math.log(value / self.min_value) / self.log_growth - 1e-9)
+
+
+    def get_bound(self, bucket: int) -> float:
+        """
+        Get the upper bound of a bucket.
+
+        Arguments:
+            bucket: The index of the bucket.
+
+        Returns:
+            The largest latency counted in the bucket, in seconds.
+        """
+
+        return self.min_value * self.growth ** bucket
+
+
+    def record(self, value: float):
+        """
+        Count a latency.
+
+        Arguments:
+            value: The latency in seconds.
+        """
+
+        self.counts[min(self.get_bucket(value), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        Add the latencies of another histogram to this one.
+
+        Arguments:
+            other: A histogram with the same buckets.
+
+        Raises:
+            ValueError: If the buckets of the histograms differ.
+        """
+
+        if (other.min_value, other.growth, len(other.counts)) != (self.min_value, self.growth, len(self.counts)):
+            raise ValueError('only histograms with the same buckets can be merged')
+
+        for bucket, count in enumerate(other.counts):
+            self.counts[bucket] += count
+
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+    def get_percentile(self, percentile: float) -> float | None:
+        """
+        Get the latency below which the given share of latencies falls.
+
+        Arguments:
+            percentile: The share, in percent.
+
+        Returns:
+            The upper bound of the bucket holding that latency, kept within the smallest and largest latencies,
+            or None if nothing was recorded.
+        """
+
+        if not self.count:
+            return None
+
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts[:-1]):
+            seen += count
+            if seen >= rank:
+                return min(max(self.get_bound(bucket), self.min), self.max)
+
+        # The last bucket has no upper bound.
+        return self.max
+
+
+    def count_above(self, threshold: float) -> int:
+        """
+        Count the latencies above a threshold, to the precision of the buckets.
+
+        Arguments:
+            threshold: The threshold in seconds.
+
+        Returns:
+            The number of latencies in buckets above the threshold's bucket.
+        """
+
+        return sum(self.counts[self.get_bucket(threshold) + 1:])
+
+
+    def get_summary(self) -> dict:
+        """
+        Get the statistics of the recorded latencies.
+
+        Returns:
+            The count, the total, mean, minimum and maximum latencies and the percentiles in PERCENTILES.
+        """
+
+        summary = {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+        for percentile in PERCENTILES:
+            summary[f'p{percentile:g}'] = self.get_percentile(percentile)
+
+        return summary
+
+
+class MoveLatencies:
+    """
+    Class for collecting the thinking times of both players in LatencyHistograms.
+
+    Every time is counted for the player's sign under "all", under the group of move numbers it falls in
+    (e.g. "moves 11-20") and under "free" or "constrained", depending on whether the player could move
+    on any open board. Moves slower than the budget are counted exactly.
+    """
+
+    def __init__(self, budget: float = 0.1, move_group_size: int = 10):
+        """
+        Create an instance of the MoveLatencies class.
+
+        Arguments:
+            budget: The time a move should take at most, in seconds, e.g. CodinGame's 100ms.
+            move_group_size: Number of consecutive move numbers counted together.
+        """
+
+        self.budget = budget
+        self.move_group_size = move_group_size
+        self.histograms = {}
+        self.over_budget = {'X': 0, 'O': 0}
+
+
+    def get_histogram(self, sign: str, category: str) -> LatencyHistogram:
+        """
+        Get the histogram of a category, creating it on first use.
+
+        Arguments:
+            sign: The sign of the player.
+            category: "all", "free", "constrained" or a group of move numbers.
+
+        Returns:
+            The histogram.
+        """
+
+        if (sign, category) not in self.histograms:
+            self.histograms[(sign, category)] = LatencyHistogram()
+
+        return self.histograms[(sign, category)]
+
+
+    def get_move_group(self, ply: int) -> str:
+        """
+        Get the group of move numbers a move falls in.
+
+        Arguments:
+            ply: The move number, starting at 1.
+
+        Returns:
+            The group, e.g. "moves 01-10".
+        """
+
+        first = (ply - 1) // self.move_group_size * self.move_group_size + 1
+        return f'moves {first:02d}-{first + self.move_group_size - 1:02d}'
+
+
+    def record(self, sign: str, ply: int, free_move: bool, seconds: float):
+        """
+        Count the thinking time of a move.
+
+        Arguments:
+            sign: The sign of the player making the move.
+            ply: The move number, starting at 1.
+            free_move: Whether the player could move on any open board.
+            seconds: The thinking time.
+        """
+
+        for category in ('all', 'free' if free_move else 'constrained', self.get_move_group(ply)):
+            self.get_histogram(sign, category).record(seconds)
+
+        if seconds > self.budget:
+            self.over_budget[sign] += 1
+
+
+    def record_game(self, game: Game):
+        """
+        Count the thinking times of a game played with measure_thinking_time turned on.
+
+        Arguments:
+            game: The game.
+        """
+
+        entries = game.history.entries
+        for sign, thinking_times, first_ply in (('X', game.player1_thinking_times, 1),
+                                                ('O', game.player2_thinking_times, 2)):
+            for ply, seconds in zip(range(first_ply, len(entries), 2), thinking_times):
+                state, prev_small_idx, _ = entries[ply - 1]
+                self.record(sign, ply, PositionCodec.get_next_board(state, prev_small_idx) == 0, seconds)
+
+
+    def merge(self, other: 'MoveLatencies'):
+        """
+        Add the thinking times collected by another instance, e.g. in a worker process.
+
+        Arguments:
+            other: The other instance.
+        """
+
+        for (sign, category), histogram in other.histograms.items():
+            self.get_histogram(sign, category).merge(histogram)
+
+        for sign, count in other.over_budget.items():
+            self.over_budget[sign] += count
+
+
+    def format_report(self) -> str:
+        """
+        Write the percentiles of every category as a table.
+
+        Returns:
+            The table, a row per sign and category, in milliseconds.
+        """
+
+        def ms(value: float | None) -> str:
+            return f'{value * 1000:.1f}' if value is not None else '-'
+
+        columns = ('count', 'mean', *(f'p{percentile:g}' for percentile in PERCENTILES), 'max')
+        lines = [f'{"":<24}' + ''.join(f'{column:>9}' for column in columns)]
+
+        for (sign, category), histogram in sorted(self.histograms.items(),
+                                                   key = lambda item: (item[0][0] == 'O', item[0][1] != 'all',
+                                                                       item[0][1].startswith('moves'), item[0][1])):
+            summary = histogram.get_summary()
+            lines.append(f'{f"* {sign} {category}":<24}{summary["count"]:>9}' +
+                         ''.join(f'{ms(summary[column]):>9}' for column in columns[1:]))
+
+        lines.append(f'* Moves over {ms(self.budget)}ms budget : X {self.over_budget["X"]} / O {self.over_budget["O"]}')
+
+        return '\n'.join(lines)
+
+
+__all__ = ['LatencyHistogram', 'MoveLatencies', 'PERCENTILES']
@@ -0,0 +1,232 @@
+import numpy as np
+
+from utils.helpers import BoardTable, StateChecker
+
+
+StateChecker = StateChecker()
+
+DIGITS = {'-': 0, 'X': 1, 'O': 2, 'T': 3}
+POWERS = np.array([3 ** cell for cell in range(9)], dtype = np.int32)
+WIN_LINES = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8], [0, 3, 6], [1, 4, 7], [2, 5, 8], [0, 4, 8], [2, 4, 6]])
+
+ONGOING, X_WON, O_WON, TIED = 0, 1, 2, 3
+RESULT_SIGNS = (None, 'X', 'O', 'T')
+
+
+class PlayoutBatch:
+    """
+    Class holding many games that are played out with uniformly random moves, all at once.
+
+    Every game is a row of the arrays:
+        - cells | (N, 81) with 0 for empty, 1 for X and 2 for O, indexed by move code.
+        - codes | (N, 9) BoardTable codes of the small boards.
+        - macro | (N, 9) small board statuses: 0 for open, 1 won by X, 2 won by O and 3 tied.
+        - targets | (N,) the board index (0-8) the next move is sent to, -1 for a free move.
+        - turns | (N,) 1 if X moves next, 2 if O does.
+        - winners | (N,) 0 while the game is going, otherwise 1 for X, 2 for O and 3 for a tie.
+    """
+
+    def __init__(self, cells: np.ndarray, macro: np.ndarray, targets: np.ndarray, turns: np.ndarray,
+                 seed: int | None = None):
+        """
+        Create an instance of the PlayoutBatch class.
+
+        Arguments:
+            cells: The cells of every game.
+            macro: The small board statuses of every game.
+            targets: The board every game's next move is sent to, -1 for a free move.
+            turns: The sign moving next in every game.
+            seed: The seed for the random moves.
+        """
+
+        self.cells = cells
+        self.macro = macro
+        self.targets = targets
+        self.turns = turns
+        self.codes = (cells.reshape(-1, 9, 9).astype(np.int32) * POWERS).sum(axis = 2, dtype = np.int32)
+        self.winners = self.get_winners(macro)
+        self.plies = np.zeros(len(cells), dtype = np.int32)
+        self.rng = np.random.default_rng(seed)
+
+        # Board statuses by BoardTable code, so finishing a board is a single lookup.
+        self.statuses = np.frombuffer(bytes(BoardTable.get_default().statuses), dtype = np.uint8).astype(np.int8)
+
+
+    @staticmethod
+    def from_state(state: tuple[dict, ...], prev_small_idx: int | None, sign: str, num_games: int,
+                   seed: int | None = None) -> 'PlayoutBatch':
+        """
+        Create a batch of copies of the same game.
+
+        Arguments:
+            state: The game state.
+            prev_small_idx: The small index of the previous move made.
+            sign: The sign moving next.
+            num_games: Number of copies.
+            seed: The seed for the random moves.
+
+        Returns:
+            The batch of games.
+        """
+
+        cells = np.array([DIGITS[state[big_idx]['display'][small_idx]]
+                          for big_idx in range(1, 10) for small_idx in range(1, 10)], dtype = np.int8)
+        macro = np.array([DIGITS[state[0]['display'][big_idx]] for big_idx in range(1, 10)], dtype = np.int8)
+
+        target = -1
+        if prev_small_idx is not None and macro[prev_small_idx - 1] == 0:
+            target = prev_small_idx - 1
+
+        return PlayoutBatch(np.tile(cells, (num_games, 1)), np.tile(macro, (num_games, 1)),
+                            np.full(num_games, target, dtype = np.int8),
+                            np.full(num_games, DIGITS[sign], dtype = np.int8), seed)
+
+
+    @staticmethod
+    def empty(num_games: int, seed: int | None = None) -> 'PlayoutBatch':
+        """
+        Create a batch of games that haven't started yet.
+
+        Arguments:
+            num_games: Number of games.
+            seed: The seed for the random moves.
+
+        Returns:
+            The batch of games.
+        """
+
+        return PlayoutBatch(np.zeros((num_games, 81), dtype = np.int8), np.zeros((num_games, 9), dtype = np.int8),
+                            np.full(num_games, -1, dtype = np.int8), np.ones(num_games, dtype = np.int8), seed)
+
+
+    @staticmethod
+    def get_winners(macro: np.ndarray) -> np.ndarray:
+        """
+        Check the big boards of many games.
+
+        Arguments:
+            macro: The small board statuses of the games.
+
+        Returns:
+            The result of every game, following StateChecker.check_win.
+        """
+
+        lines = macro[:, WIN_LINES]
+        x_won = (lines == X_WON).all(axis = 2).any(axis = 1)
+        o_won = (lines == O_WON).all(axis = 2).any(axis = 1)
+        tied = (macro != 0).all(axis = 1)
+
+        return np.select((x_won, o_won, tied), (X_WON, O_WON, TIED), ONGOING).astype(np.int8)
+
+
+    def get_legal_masks(self, games: np.ndarray = None) -> np.ndarray:
+        """
+        Get the legal moves of many games.
+
+        Arguments:
+            games: Indices of the games, defaults to all of them.
+
+        Returns:
+            A (games, 81) boolean mask, set for every legal move code.
+        """
+
+        if games is None:
+            games = np.arange(len(self.cells))
+
+        legal = (self.cells[games] == 0).reshape(-1, 9, 9) & (self.macro[games] == 0)[:, :, None]
+
+        targets = self.targets[games]
+        forced = targets >= 0
+        legal[forced] &= (np.arange(9) == targets[forced, None])[:, :, None]
+
+        return legal.reshape(-1, 81)
+
+
+    def step(self, games: np.ndarray = None) -> int:
+        """
+        Make a random legal move in every game that isn't over.
+
+        Arguments:
+            games: Indices of the games to move, defaults to every game that isn't over.
+                They all need to be ongoing.
+
+        Returns:
+            The number of games that moved.
+        """
+
+        if games is None:
+            games = np.flatnonzero(self.winners == ONGOING)
+        if len(games) == 0:
+            return 0
+
+        # The highest random key among the legal moves is a uniform choice between them.
+        keys = self.rng.random((len(games), 81), dtype = np.float32)
+        keys[~self.get_legal_masks(games)] = -1
+        self.apply_moves(games, keys.argmax(axis = 1))
+
+        return len(games)
+
+
+    def apply_moves(self, games: np.ndarray, moves: np.ndarray):
+        """
+        Make the given moves, e.g. to replay a game in the batch.
+
+        Arguments:
+            games: Indices of the games. They all need to be ongoing.
+            moves: The legal move code of every game.
+        """
+
+        boards, cells = moves // 9, moves % 9
+        turns = self.turns[games]
+
+        self.cells[games, moves] = turns
+        self.codes[games, boards] += turns * POWERS[cells]
+        self.macro[games, boards] = self.statuses[self.codes[games, boards]]
+
+        self.targets[games] = np.where(self.macro[games, cells] == 0, cells, -1)
+        self.turns[games] = 3 - turns
+        self.plies[games] += 1
+        self.winners[games] = self.get_winners(self.macro[games])
+
+
+    def play_out(self) -> np.ndarray:
+        """
+        Play every game to the end.
+
+        Returns:
+            The result of every game: 1 for X, 2 for O and 3 for a tie.
+        """
+
+        while self.step():
+            pass
+
+        return self.winners
+
+
+def estimate_win_probabilities(state: tuple[dict, ...], prev_small_idx: int | None, sign: str,
+                               num_playouts: int = 10000, seed: int | None = None) -> dict:
+    """
+    Estimate the chances of each result from a position with random playouts.
+
+    Arguments:
+        state: The game state.
+        prev_small_idx: The small index of the previous move made.
+        sign: The sign moving next.
+        num_playouts: Number of random games to play out.
+        seed: The seed for the random moves.
+
+    Returns:
+        The share of playouts won by X, won by O and tied.
+    """
+
+    winner = StateChecker.check_win(state, 0)
+    if winner:
+        return {result: float(result == winner) for result in ('X', 'O', 'T')}
+
+    counts = np.bincount(PlayoutBatch.from_state(state, prev_small_idx, sign, num_playouts, seed).play_out(),
+                         minlength = 4)
+
+    return {result: counts[digit] / num_playouts for digit, result in enumerate(RESULT_SIGNS) if result}
+
+
+__all__ = ['PlayoutBatch', 'estimate_win_probabilities']
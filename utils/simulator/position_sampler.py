@@ -0,0 +1,149 @@
+import numpy as np
+
+from utils.helpers import PositionCodec
+from .playout_engine import PlayoutBatch, ONGOING, WIN_LINES
+
+
+RESULT_SIGNS = (None, 'X', 'O')
+
+
+class PositionSampler:
+    """
+    Class for sampling positions that can be reached with legal moves, for fuzzing and benchmarks.
+
+    Positions are reached by playing uniformly random moves from the empty board, many games at a time
+    with PlayoutBatch. Every game is stopped at the ply it was drawn for, and games that end before it
+    are replayed, so each ply gets exactly the number of positions asked for. Sharp positions can be
+    asked for with min_threats: the number of open small boards that one more move would win.
+    """
+
+    def __init__(self, seed: int | None = None, min_threats: int = 0, batch_size: int = 4096,
+                 max_tries: int = 1000):
+        """
+        Create an instance of the PositionSampler class.
+
+        Arguments:
+            seed: The seed for the random moves. The same seed gives the same positions.
+            min_threats: The least number of open small boards in a sampled position that
+                either sign could win with its next move.
+            batch_size: The most games played at a time.
+            max_tries: The most games played for every position asked for, before giving up on a ply.
+        """
+
+        self.rng = np.random.default_rng(seed)
+        self.min_threats = min_threats
+        self.batch_size = batch_size
+        self.max_tries = max_tries
+
+
+    @staticmethod
+    def get_threats(batch: PlayoutBatch) -> np.ndarray:
+        """
+        Count the open small boards one move away from being won, in every game of a batch.
+
+        Arguments:
+            batch: The games.
+
+        Returns:
+            The number of such boards in every game.
+        """
+
+        lines = batch.cells.reshape(-1, 9, 9)[:, :, WIN_LINES]
+        has_gap = (lines == 0).any(axis = 3)
+        threatened = ((lines == 1).sum(axis = 3) == 2) & has_gap | ((lines == 2).sum(axis = 3) == 2) & has_gap
+
+        return (threatened.any(axis = 2) & (batch.macro == 0)).sum(axis = 1)
+
+
+    def sample_batch(self, plies: np.ndarray) -> list[tuple[int, tuple[tuple[dict, ...], int | None, str]]]:
+        """
+        Play one game up to each of the given plies, keeping the games that reach them as wanted.
+
+        Arguments:
+            plies: The ply every game is stopped at.
+
+        Returns:
+            The ply and position of every kept game.
+        """
+
+        batch = PlayoutBatch.empty(len(plies), seed = self.rng.integers(2 ** 63))
+
+        while True:
+            games = np.flatnonzero((batch.winners == ONGOING) & (batch.plies < plies))
+            if not batch.step(games):
+                break
+
+        kept = (batch.winners == ONGOING) & (batch.plies == plies)
+        if self.min_threats:
+            kept &= self.get_threats(batch) >= self.min_threats
+
+        return [(int(plies[game]), (PositionCodec.build_state(batch.codes[game].tolist()),
+                                    int(batch.targets[game]) + 1 or None, RESULT_SIGNS[batch.turns[game]]))
+                for game in np.flatnonzero(kept)]
+
+
+    def sample(self, plies: list[int], per_ply: int) -> dict[int, list[tuple[tuple[dict, ...], int | None, str]]]:
+        """
+        Sample the same number of ongoing positions after each number of moves.
+
+        Arguments:
+            plies: The numbers of moves made.
+            per_ply: Number of positions for every ply.
+
+        Returns:
+            The positions of every ply as (state, prev_small_idx, sign) tuples, where prev_small_idx
+            is None for a free move.
+
+        Raises:
+            ValueError: If a ply can't be reached by an ongoing game, or is reached by less than one in
+                max_tries games.
+        """
+
+        if any(not 0 <= ply < 81 for ply in plies):
+            raise ValueError('a game is over by ply 81, plies should be between 0 and 80')
+
+        positions = {ply: [] for ply in plies}
+        missing = {ply: per_ply for ply in plies}
+        tries = dict.fromkeys(plies, 0)
+
+        while any(missing.values()):
+            wanted = np.repeat(list(missing), list(missing.values()))
+
+            # Late plies and sharp positions are rarely reached, so more games are played than are missing.
+            wanted = np.resize(self.rng.permutation(wanted), min(self.batch_size, 4 * len(wanted)))
+
+            for ply, count in zip(*np.unique(wanted, return_counts = True)):
+                ply = int(ply)
+                tries[ply] += int(count)
+                if missing[ply] and tries[ply] > self.max_tries * per_ply:
+                    raise ValueError(f'only {per_ply - missing[ply]} of {tries[ply]} games reached ply {ply}')
+
+            for ply, position in self.sample_batch(wanted):
+                if missing[ply]:
+                    positions[ply].append(position)
+                    missing[ply] -= 1
+
+        return positions
+
+
+    def sample_list(self, num_positions: int, min_ply: int = 0, max_ply: int = 60) -> list[tuple[tuple[dict, ...], int | None, str]]:
+        """
+        Sample positions spread evenly over a range of plies, in a random order.
+
+        Arguments:
+            num_positions: Number of positions.
+            min_ply: The least number of moves made.
+            max_ply: The most number of moves made.
+
+        Returns:
+            The positions as (state, prev_small_idx, sign) tuples.
+        """
+
+        plies = list(range(min_ply, max_ply + 1))
+        positions = [position for ply_positions in self.sample(plies, -(-num_positions // len(plies))).values()
+                     for position in ply_positions]
+
+        return [positions[idx] for idx in self.rng.permutation(len(positions))[:num_positions]]
+
+
+__all__ = ['PositionSampler']
@@ -0,0 +1,232 @@
+import collections
+import functools
+import sys
+import threading
+import time
+
+from typing import Any, Callable
+
+
+UNLABELLED = 'game'
+
+
+class SamplingProfiler:
+    """
+    Class for profiling a thread by sampling its stack at a fixed rate.
+
+    A background thread wakes up every interval and records the call stack the profiled thread is in,
+    so the profiled code runs at close to its normal speed, unlike with cProfile's tracing of every call.
+    Stacks are counted per label, which is set for the duration of labelled calls (see wrap), so the
+    time of each player can be told apart. Results can be written as collapsed stacks, the input
+    format of flamegraph.pl, speedscope and most other flame graph tools, or summed up per function.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Create an instance of the SamplingProfiler class.
+
+        Arguments:
+            interval: Seconds between samples.
+        """
+
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+
+        self.labels = {}
+        self.names = {}
+        self.thread_id = None
+        self.sampler = None
+        self.stopped = threading.Event()
+
+
+    def get_name(self, frame) -> str:
+        """
+        Get the name a frame's function is shown with, cached by code object.
+
+        Arguments:
+            frame: The frame.
+
+        Returns:
+            The module and qualified name of the function, e.g. "utils.players.minimax_player:MiniMaxPlayer.minimax_ab".
+        """
+
+        code = frame.f_code
+        name = self.names.get(code)
+        if name is None:
+            name = self.names[code] = f'{frame.f_globals.get("__name__", "?")}:{code.co_qualname}'
+
+        return name
+
+
+    def sample(self):
+        """ Record the current stack of the profiled thread. """
+
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+
+        stack = []
+        while frame is not None:
+            stack.append(self.get_name(frame))
+            frame = frame.f_back
+
+        self.stacks[(self.labels.get(self.thread_id, UNLABELLED), tuple(reversed(stack)))] += 1
+        self.samples += 1
+
+
+    def run_sampler(self):
+        """ Take samples until stopped. """
+
+        next_sample = time.perf_counter()
+
+        while not self.stopped.is_set():
+            self.sample()
+
+            # Sleeping until the next tick instead of a fixed time keeps the rate steady while sampling is slow.
+            next_sample = max(next_sample + self.interval, time.perf_counter())
+            self.stopped.wait(next_sample - time.perf_counter())
+
+
+    def start(self):
+        """ Start sampling the calling thread. """
+
+        self.thread_id = threading.get_ident()
+        self.stopped.clear()
+        self.sampler = threading.Thread(target = self.run_sampler, name = 'sampling-profiler', daemon = True)
+        self.sampler.start()
+
+
+    def stop(self):
+        """ Stop sampling. """
+
+        self.stopped.set()
+        if self.sampler is not None:
+            self.sampler.join()
+            self.sampler = None
+
+
+    def runcall(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Profile a function call.
+
+        Arguments:
+            function: The function to call.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            The return value of the call.
+        """
+
+        self.start()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.stop()
+
+
+    def wrap(self, function: Callable, label: str) -> Callable:
+        """
+        Label the samples taken during every call of a function, e.g. a player's make_move.
+
+        Arguments:
+            function: The function.
+            label: The label of its samples.
+
+        Returns:
+            The labelled function.
+        """
+
+        @functools.wraps(function)
+        def labelled(*args, **kwargs):
+            thread_id = threading.get_ident()
+            previous = self.labels.get(thread_id, UNLABELLED)
+            self.labels[thread_id] = label
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.labels[thread_id] = previous
+
+        return labelled
+
+
+    def get_collapsed(self) -> list[str]:
+        """
+        Get the samples as collapsed stacks, with the label as the root frame.
+
+        Returns:
+            A "label;outer function;...;inner function count" line for every distinct stack.
+        """
+
+        return [f'{";".join((label, *stack))} {count}'
+                for (label, stack), count in sorted(self.stacks.items(), key = lambda item: -item[1])]
+
+
+    def write_collapsed(self, path: str):
+        """
+        Write the samples as collapsed stacks, for flame graph tools.
+
+        Arguments:
+            path: The file to write to.
+        """
+
+        with open(path, 'w') as file:
+            file.write('\n'.join(self.get_collapsed()) + '\n')
+
+
+    def get_top(self, n: int = 20, label: str = None) -> list[dict]:
+        """
+        Get the functions most samples were taken in.
+
+        Arguments:
+            n: Number of functions.
+            label: Only count the samples with this label, defaults to all of them.
+
+        Returns:
+            The function name, the samples in the function itself, the samples in it or anything it
+            called and both as percentages of all counted samples, ordered by samples in the function itself.
+        """
+
+        own, total = collections.Counter(), collections.Counter()
+
+        for (stack_label, stack), count in self.stacks.items():
+            if label is not None and stack_label != label:
+                continue
+            own[stack[-1]] += count
+            for name in set(stack):
+                total[name] += count
+
+        samples = sum(own.values()) or 1
+
+        return [{'function': name, 'own': own[name], 'total': total[name],
+                 'own_percent': round(100 * own[name] / samples, 1), 'total_percent': round(100 * total[name] / samples, 1)}
+                for name, _ in own.most_common(n)]
+
+
+    def format_summary(self, n: int = 20) -> str:
+        """
+        Write the samples per label and the top functions as a table.
+
+        Arguments:
+            n: Number of functions.
+
+        Returns:
+            The summary.
+        """
+
+        labels = collections.Counter()
+        for (label, _), count in self.stacks.items():
+            labels[label] += count
+
+        lines = [f'--- Sampling Profile      : {self.samples} samples every {self.interval * 1000:g}ms']
+        lines += [f'* {label:<24}: {count} samples ({round(100 * count / (self.samples or 1), 1)}%)'
+                  for label, count in labels.most_common()]
+        lines += ['', f'{"own":>6} {"own%":>6} {"total":>6} {"total%":>6}  function']
+        lines += [f'{row["own"]:>6} {row["own_percent"]:>6} {row["total"]:>6} {row["total_percent"]:>6}  {row["function"]}'
+                  for row in self.get_top(n)]
+
+        return '\n'.join(lines)
+
+
+__all__ = ['SamplingProfiler']
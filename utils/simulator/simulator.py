@@ -5,6 +5,8 @@ import copy
 from utils.game import Game
 from utils.players import Player
 from utils.helpers import StateChecker
+from .sampling_profiler import SamplingProfiler
+from .latency_histogram import MoveLatencies
 
 
 StateChecker = StateChecker()
@@ -14,18 +16,37 @@ class Simulator:
     """ Class for simulating games and collecting results. """
 
     def __init__(self, num_simulations: int, player1: Player, player2: Player,
-                 print_games: bool = False, measure_performance: bool = True):
+                 print_games: bool = False, measure_performance: bool = True, profiler: str = 'cprofile',
+                 sampling_interval: float = 0.005, profile_output: str = None, top_functions: int = 20,
+                 move_budget: float = 0.1):
         """
         Create an instance of the Simulator class.
 
+        Profilers:
+            - "cprofile" | Traces every call with cProfile. Exact call counts, but slows the search down
+              several times and inflates the share of small, often called functions.
+            - "sampling" | Samples the call stack every sampling_interval seconds with SamplingProfiler,
+              at close to normal speed. Samples are split by the player making a move.
+
         Arguments:
             num_simulations: Number of simulations to run.
             player1: The first player object.
             player2: The second player object.
             print_games: Whether to print the game states. Leave disabled for faster simulations.
             measure_performance: Whether to measure the performance of the code.
+            profiler: Which profiler measures the performance.
+            sampling_interval: Seconds between the samples of the sampling profiler.
+            profile_output: A file to write the sampled stacks to in collapsed format, for flame graph tools.
+            top_functions: Number of functions in the sampling profiler's summary.
+            move_budget: The time a move should take at most, in seconds. Slower moves are counted in the results.
+
+        Raises:
+            ValueError: If the profiler isn't one of the above.
         """
 
+        if profiler not in ('cprofile', 'sampling'):
+            raise ValueError(f'unknown profiler {profiler!r}, choose "cprofile" or "sampling"')
+
         self.num_simulations = num_simulations
         self.player1 = player1
         self.player2 = player2
@@ -33,6 +54,13 @@ class Simulator:
         self.wait_after_move = 0.5 if print_games else None
         self.show_evaluation = False
         self.measure_performance = measure_performance
+        self.profiler = profiler
+        self.sampling_interval = sampling_interval
+        self.profile_output = profile_output
+        self.top_functions = top_functions
+        self.sampling_profiler = None
+        self.move_budget = move_budget
+        self.latencies = None
 
 
     def run_simulations(self):
@@ -41,7 +69,7 @@ class Simulator:
         total_sim_time = time.time()
         game_times = []
         games_tied, games_won_x, games_won_o = 0, 0, 0
-        thinking_times_x, thinking_times_o = [], []
+        self.latencies = MoveLatencies(self.move_budget)
 
         for n in range(1, self.num_simulations + 1):
 
@@ -65,9 +93,13 @@ class Simulator:
 
             game_start_time = time.time()
 
-            self.player1.reset_legal_moves()
+            player1, player2 = copy.deepcopy(self.player1), copy.deepcopy(self.player2)
+            if self.sampling_profiler is not None:
+                player1.make_move = self.sampling_profiler.wrap(player1.make_move, f'X {type(player1).__name__}')
+                player2.make_move = self.sampling_profiler.wrap(player2.make_move, f'O {type(player2).__name__}')
+
             game = Game(
-                copy.deepcopy(self.player1), copy.deepcopy(self.player2),
+                player1, player2,
                 printing = self.print_games,
                 wait_after_move = self.wait_after_move,
                 show_evaluation = self.show_evaluation,
@@ -77,11 +109,7 @@ class Simulator:
 
             game_times.append(time.time() - game_start_time)
 
-            for t in game.player1_thinking_times:
-                thinking_times_x.append(t)
-
-            for t in game.player2_thinking_times:
-                thinking_times_o.append(t)
+            self.latencies.record_game(game)
 
             winner = StateChecker.check_win(game.state, big_idx = 0)
             match winner:
@@ -92,6 +120,9 @@ class Simulator:
                 case 'O':
                     games_won_o += 1
 
+        thinking_x = self.latencies.get_histogram('X', 'all').get_summary()
+        thinking_o = self.latencies.get_histogram('O', 'all').get_summary()
+
         print(
             f'\n'
             f'    SIMULATOR : RESULTS \n'
@@ -109,15 +140,18 @@ class Simulator:
             f'* Games Won/Lost O        : {games_won_o} / {games_won_x} \n'
             f'============================ \n'
             f'--- Thinking Time Stats   : \n'
-            f'* Total TT X              : {round(sum(thinking_times_x), 2)}s \n'
-            f'* Average TT X            : {round(sum(thinking_times_x) / len(thinking_times_x), 2)}s \n'
-            f'* Shortest TT X           : {round(min(thinking_times_x), 2)}s \n'
-            f'* Longest TT X            : {round(max(thinking_times_x), 2)}s \n'
+            f'* Total TT X              : {round(thinking_x["total"], 2)}s \n'
+            f'* Average TT X            : {round(thinking_x["mean"], 2)}s \n'
+            f'* Shortest TT X           : {round(thinking_x["min"], 2)}s \n'
+            f'* Longest TT X            : {round(thinking_x["max"], 2)}s \n'
             f' \n'
-            f'* Total TT O              : {round(sum(thinking_times_o), 2)}s \n'
-            f'* Average TT O            : {round(sum(thinking_times_o) / len(thinking_times_o), 2)}s \n'
-            f'* Shortest TT O           : {round(min(thinking_times_o), 2)}s \n'
-            f'* Longest TT O            : {round(max(thinking_times_o), 2)}s \n'
+            f'* Total TT O              : {round(thinking_o["total"], 2)}s \n'
+            f'* Average TT O            : {round(thinking_o["mean"], 2)}s \n'
+            f'* Shortest TT O           : {round(thinking_o["min"], 2)}s \n'
+            f'* Longest TT O            : {round(thinking_o["max"], 2)}s \n'
+            f'============================ \n'
+            f'--- Move Latency (ms)     : \n'
+            f'{self.latencies.format_report()} \n'
             f'============================ \n'
             f'\n'
         )
@@ -126,10 +160,18 @@ class Simulator:
     def start(self):
         """ Start the simulator. """
 
-        if self.measure_performance:
+        if self.measure_performance and self.profiler == 'sampling':
+            self.sampling_profiler = SamplingProfiler(self.sampling_interval)
+            self.sampling_profiler.runcall(self.run_simulations)
+
+            print(self.sampling_profiler.format_summary(self.top_functions))
+            if self.profile_output:
+                self.sampling_profiler.write_collapsed(self.profile_output)
+
+        elif self.measure_performance:
             profile = cProfile.Profile()
             profile.runcall(self.run_simulations)
-            profile.print_stats()
+            profile.print_stats(sort = 'cumulative')
 
         else:
             self.run_simulations()
@@ -0,0 +1,2 @@
+from .weight_tuner import *
+from .value_trainer import *
@@ -0,0 +1,42 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from .weight_tuner import FeatureExtractor, WeightTuner, generate_positions, get_initial_weights
+
+
+parser = argparse.ArgumentParser(description = 'Tune the StateEvaluator weights to the results of self-play games.')
+parser.add_argument('--games', type = int, default = 200, help = 'number of self-play games')
+parser.add_argument('--depth', type = int, default = 2, help = 'search depth of the self-play players')
+parser.add_argument('--random-moves', type = float, default = 0.1, help = 'chance of a self-play move being random')
+parser.add_argument('--epochs', type = int, default = 200, help = 'passes over the positions')
+parser.add_argument('--learning-rate', type = float, default = 0.02, help = 'step size of the optimizer')
+parser.add_argument('--seed', type = int, default = None, help = 'seed for the games and the shuffling')
+parser.add_argument('--output', default = None, help = 'JSON file to write the tuned weights to')
+args = parser.parse_args()
+
+start_time = time.perf_counter()
+positions, results = generate_positions(args.games, args.depth, args.random_moves, seed = args.seed)
+features, results = FeatureExtractor().extract(positions), np.array(results)
+print(f'[ TUNER ] : {len(positions)} positions from {args.games} games '
+      f'in {round(time.perf_counter() - start_time, 2)}s')
+
+# The last tenth of the positions is held out to check the weights on games they weren't fitted to.
+split = len(results) * 9 // 10
+tuner = WeightTuner(learning_rate = args.learning_rate, epochs = args.epochs, seed = args.seed)
+
+initial_weights = get_initial_weights()
+tuner.fit_scaling(features[:split], results[:split], initial_weights)
+weights = tuner.fit(features[:split], results[:split], initial_weights)
+
+for name, tuned in (('initial', initial_weights), ('tuned', weights)):
+    print(f'[ TUNER ] : {name:<7} loss train {tuner.get_loss(features[:split], results[:split], tuned):.5f} '
+          f'| held out {tuner.get_loss(features[split:], results[split:], tuned):.5f}')
+
+print(WeightTuner.format_constants(weights))
+
+if args.output:
+    with open(args.output, 'w') as output_file:
+        json.dump(weights, output_file, indent = 4)
@@ -0,0 +1,45 @@
+import argparse
+import time
+
+import numpy as np
+
+from .value_trainer import ValueTrainer
+from utils.helpers.learned_evaluator import ValueModel, DEFAULT_MODEL_PATH
+from utils.self_play import load_shards
+
+
+parser = argparse.ArgumentParser(description = 'Train the value model of the "learned" evaluator on self-play positions.')
+parser.add_argument('shards', help = 'directory of shards written by python -m utils.self_play')
+parser.add_argument('--output', default = DEFAULT_MODEL_PATH, help = 'file to write the trained model to')
+parser.add_argument('--embedding-size', type = int, default = 8, help = 'values every small board is embedded as')
+parser.add_argument('--hidden-size', type = int, default = 32, help = 'hidden units, 0 for a linear model')
+parser.add_argument('--epochs', type = int, default = 5, help = 'passes over the positions')
+parser.add_argument('--learning-rate', type = float, default = 0.001, help = 'step size of the optimizer')
+parser.add_argument('--weight-decay', type = float, default = 10.0, help = 'shrinkage of the weights every step')
+parser.add_argument('--seed', type = int, default = None, help = 'seed for the initial parameters and the shuffling')
+args = parser.parse_args()
+
+columns = load_shards(args.shards)
+train_positions, held_out_positions = ValueTrainer.split_games(columns)
+train_inputs, train_results = ValueTrainer.get_inputs(columns, train_positions)
+held_out_inputs, held_out_results = ValueTrainer.get_inputs(columns, held_out_positions)
+
+model = ValueModel(embedding_size = args.embedding_size, hidden_size = args.hidden_size, seed = args.seed)
+trainer = ValueTrainer(learning_rate = args.learning_rate, epochs = args.epochs,
+                       weight_decay = args.weight_decay, seed = args.seed)
+
+start_time = time.perf_counter()
+history = trainer.fit(model, train_inputs, train_results)
+
+print(f'[ VALUE ] : {len(train_results)} positions, {args.epochs} epochs '
+      f'in {round(time.perf_counter() - start_time, 2)}s')
+print(f'[ VALUE ] : loss train {history[-1]:.5f} '
+      f'| held out {ValueTrainer.get_loss(model, held_out_inputs, held_out_results):.5f}')
+
+# Always predicting the average result is what the model has to beat.
+mean_result = np.clip(train_results.mean(), 1e-6, 1 - 1e-6)
+print(f'[ VALUE ] : held out loss of always predicting {mean_result:.3f}: '
+      f'{-np.mean(held_out_results * np.log(mean_result) + (1 - held_out_results) * np.log(1 - mean_result)):.5f}')
+
+model.save(args.output)
+print(f'[ VALUE ] : model written to {args.output}')
@@ -0,0 +1,139 @@
+import numpy as np
+
+from utils.helpers.learned_evaluator import ValueModel
+
+
+class ValueTrainer:
+    """
+    Class for fitting a ValueModel to the results of self-play games.
+
+    Positions are read from the columns written by SelfPlayGenerator, and the model is fitted
+    with mini-batch Adam steps on the cross-entropy between its predictions and the results.
+    """
+
+    def __init__(self, learning_rate: float = 0.001, batch_size: int = 512, epochs: int = 5,
+                 weight_decay: float = 10.0, seed: int = None):
+        """
+        Create an instance of the ValueTrainer class.
+
+        Arguments:
+            learning_rate: The step size of the Adam optimizer.
+            batch_size: Number of positions per gradient step.
+            epochs: Number of passes over the positions.
+            weight_decay: How much the weights shrink every step, relative to the learning rate. Without it
+                the board embeddings memorize the games they were seen in.
+            seed: The seed for shuffling the positions.
+        """
+
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.weight_decay = weight_decay
+        self.rng = np.random.default_rng(seed)
+
+
+    @staticmethod
+    def get_inputs(columns: dict, positions: np.ndarray = None) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+        """
+        Get the model inputs and results of stored positions.
+
+        Arguments:
+            columns: The columns of the positions, as returned by load_shards.
+            positions: Indices of the positions to use, defaults to all of them.
+
+        Returns:
+            The inputs and the results for X.
+        """
+
+        if positions is None:
+            positions = np.arange(len(columns['results']))
+
+        inputs = ValueModel.get_inputs(columns['cells'][positions], columns['targets'][positions],
+                                       columns['turns'][positions])
+
+        return inputs, columns['results'][positions].astype(np.float32)
+
+
+    @staticmethod
+    def split_games(columns: dict, holdout: float = 0.1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Split the positions into a training and a held out set by game, so positions of the same
+        game never end up in both.
+
+        Arguments:
+            columns: The columns of the positions, as returned by load_shards.
+            holdout: The share of games to hold out.
+
+        Returns:
+            The indices of the training and the held out positions.
+        """
+
+        games = np.unique(columns['games'])
+        held_out = games[:int(len(games) * holdout)]
+        is_held_out = np.isin(columns['games'], held_out)
+
+        return np.flatnonzero(~is_held_out), np.flatnonzero(is_held_out)
+
+
+    @staticmethod
+    def get_loss(model: ValueModel, inputs: tuple[np.ndarray, ...], results: np.ndarray) -> float:
+        """
+        Get the cross-entropy of the model's predictions.
+
+        Arguments:
+            model: The model.
+            inputs: The inputs of the positions.
+            results: The results for X of the games the positions were reached in.
+
+        Returns:
+            The loss.
+        """
+
+        logits = model.forward(inputs)[0]
+        return float(np.mean(np.logaddexp(0, logits) - results * logits))
+
+
+    def fit(self, model: ValueModel, inputs: tuple[np.ndarray, ...], results: np.ndarray) -> list[float]:
+        """
+        Fit the model's parameters in place.
+
+        Arguments:
+            model: The model.
+            inputs: The inputs of the positions.
+            results: The results for X of the games the positions were reached in.
+
+        Returns:
+            The average training loss of every epoch.
+        """
+
+        moments = {name: np.zeros_like(value) for name, value in model.params.items()}
+        velocities = {name: np.zeros_like(value) for name, value in model.params.items()}
+        beta1, beta2, step = 0.9, 0.999, 0
+        history = []
+
+        for _ in range(self.epochs):
+            order = self.rng.permutation(len(results))
+            losses = []
+
+            for start in range(0, len(results), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                loss, gradients = model.get_gradients(tuple(column[batch] for column in inputs), results[batch])
+                losses.append(loss * len(batch))
+
+                step += 1
+                for name, gradient in gradients.items():
+                    moments[name] = beta1 * moments[name] + (1 - beta1) * gradient
+                    velocities[name] = beta2 * velocities[name] + (1 - beta2) * gradient ** 2
+                    model.params[name] -= self.learning_rate * (moments[name] / (1 - beta1 ** step)) / \
+                                          (np.sqrt(velocities[name] / (1 - beta2 ** step)) + 1e-8)
+
+                    # Decoupled from the gradients (AdamW), so rarely seen boards shrink as much as common ones.
+                    if not name.endswith('bias'):
+                        model.params[name] *= 1 - self.learning_rate * self.weight_decay
+
+            history.append(sum(losses) / len(results))
+
+        return history
+
+
+__all__ = ['ValueTrainer']
@@ -0,0 +1,330 @@
+import random
+
+import numpy as np
+
+from utils.players import MiniMaxPlayer
+from utils.helpers import StateChecker, StateEvaluator, StateUpdater, MoveGenerator, MOVES, DEFAULT_EVALUATOR
+from utils.helpers import state_evaluator
+
+
+StateChecker = StateChecker()
+
+# Boards of the big board grouped by the scale their scores get, in the order of SCALES.
+BOARD_GROUPS = (state_evaluator.CORNERS, state_evaluator.MIDDLES, {5})
+
+WEIGHTS = ('SCORE_CENTER', 'SCORE_CORNER', 'SCORE_TWO_IN_ROW', 'SCORE_FORK', 'SCORE_BLOCKING')
+SCALES = ('SCALE_CORNER', 'SCALE_MIDDLE', 'SCALE_CENTER')
+
+RESULTS = {'X': 1.0, 'O': 0.0, 'T': 0.5}
+
+# A won board is worth half of SCORE_WIN when evaluated for either sign, so its fixed weight is the sum of both.
+BOARD_WIN_WEIGHT = state_evaluator.SCORE_WIN // 2 * 2
+
+
+def get_initial_weights() -> dict:
+    """
+    Get the weights StateEvaluator currently uses.
+
+    Returns:
+        The value of every tuned constant, by its name in state_evaluator.py.
+    """
+
+    return {name: float(getattr(state_evaluator, name)) for name in WEIGHTS + SCALES}
+
+
+def play_self_play_game(depth: int = 2, random_move_rate: float = 0.1, evaluator: str = DEFAULT_EVALUATOR,
+                        rng: random.Random = None) -> tuple[list[tuple[dict, ...]], float]:
+    """
+    Play a game between two MiniMax players, with some random moves to diversify the positions.
+
+    Arguments:
+        depth: The target depth of both players.
+        random_move_rate: The chance of any move being random instead of searched.
+        evaluator: The name of the registered evaluator the players search with.
+        rng: The random number generator to pick random moves with.
+
+    Returns:
+        The states after every move that didn't end the game, and the result for X.
+    """
+
+    rng = rng or random.Random()
+    players = {sign: MiniMaxPlayer(target_depth = depth, evaluator = evaluator) for sign in ('X', 'O')}
+    for sign, player in players.items():
+        player.set_sign(sign)
+
+    state = tuple(
+        {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+    )
+    prev_small_idx = None
+    sign = 'X'
+    states = []
+
+    while True:
+        if rng.random() < random_move_rate:
+            big_idx, small_idx = MOVES[rng.choice(list(MoveGenerator.get_legal_moves(state, prev_small_idx)))]
+            players[sign].moves_made += 1
+        else:
+            big_idx, small_idx = players[sign].make_move(state, prev_small_idx)
+
+        state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+        prev_small_idx = None if state[0]['display'][small_idx] != '-' else small_idx
+        sign = 'O' if sign == 'X' else 'X'
+
+        winner = StateChecker.check_win(state, 0)
+        if winner:
+            return states, RESULTS[winner]
+
+        states.append(state)
+
+
+def generate_positions(num_games: int, depth: int = 2, random_move_rate: float = 0.1,
+                       evaluator: str = DEFAULT_EVALUATOR, seed: int = None) -> tuple[list[tuple[dict, ...]], list[float]]:
+    """
+    Collect positions labelled with the result of the self-play game they were reached in.
+
+    Arguments:
+        num_games: Number of games to play.
+        depth: The target depth of both players.
+        random_move_rate: The chance of any move being random instead of searched.
+        evaluator: The name of the registered evaluator the players search with.
+        seed: The seed for the random moves.
+
+    Returns:
+        The positions and their results for X.
+    """
+
+    rng = random.Random(seed)
+    positions, results = [], []
+
+    for _ in range(num_games):
+        states, result = play_self_play_game(depth, random_move_rate, evaluator, rng)
+        positions.extend(states)
+        results.extend([result] * len(states))
+
+    return positions, results
+
+
+class FeatureExtractor:
+    """
+    Class for turning positions into the features StateEvaluator weighs.
+
+    The features of a position have the shape (board groups, formations + 1). For every group of boards
+    sharing a scale they hold the formation counts of X minus those of O, and lastly the number of boards
+    won by X minus those won by O, whose weight stays fixed.
+    """
+
+    def __init__(self):
+        """ Create an instance of the FeatureExtractor class. """
+
+        self.board_features = {}
+
+
+    def get_board_features(self, state: tuple[dict, ...], big_idx: int) -> np.ndarray:
+        """
+        Get the features of a single small board, cached by its display.
+
+        Arguments:
+            state: The game state.
+            big_idx: Board index.
+
+        Returns:
+            The formation counts of X minus those of O, and the sign of the board's winner.
+        """
+
+        display = state[big_idx]['display']
+        features = self.board_features.get(display)
+
+        if features is None:
+            winner = StateChecker.check_win(state, big_idx)
+            features = np.zeros(len(WEIGHTS) + 1)
+
+            if winner in ('X', 'O'):
+                features[-1] = 1 if winner == 'X' else -1
+
+            elif not winner:
+                features[:-1] = np.subtract(StateEvaluator.count_formations(state, big_idx, 'X'),
+                                            StateEvaluator.count_formations(state, big_idx, 'O'))
+
+            self.board_features[display] = features
+
+        return features
+
+
+    def extract(self, positions: list[tuple[dict, ...]]) -> np.ndarray:
+        """
+        Get the features of many positions at once.
+
+        Arguments:
+            positions: The game states.
+
+        Returns:
+            The features, with the shape (positions, board groups, formations + 1).
+        """
+
+        features = np.zeros((len(positions), len(BOARD_GROUPS), len(WEIGHTS) + 1))
+
+        for n, state in enumerate(positions):
+            for group, boards in enumerate(BOARD_GROUPS):
+                for big_idx in boards:
+                    features[n, group] += self.get_board_features(state, big_idx)
+
+        return features
+
+
+class WeightTuner:
+    """
+    Class for fitting StateEvaluator's weights to game results (Texel tuning).
+
+    The heuristic of a position is mapped to the probability of X winning with a sigmoid, and the weights
+    are fitted to minimize the squared error between that probability and the actual results. Weights are
+    optimized on a log scale, so small scales and large scores move at the same relative pace.
+    """
+
+    def __init__(self, learning_rate: float = 0.02, batch_size: int = 4096, epochs: int = 200, seed: int = None):
+        """
+        Create an instance of the WeightTuner class.
+
+        Arguments:
+            learning_rate: The step size of the Adam optimizer.
+            batch_size: Number of positions per gradient step.
+            epochs: Number of passes over the positions.
+            seed: The seed for shuffling the positions.
+        """
+
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.rng = np.random.default_rng(seed)
+        self.scaling = None
+
+
+    @staticmethod
+    def predict(features: np.ndarray, weights: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """
+        Get the heuristic of every position.
+
+        Arguments:
+            features: The features of the positions.
+            weights: The formation weights.
+            scales: The board group scales.
+
+        Returns:
+            The heuristics, the same as StateEvaluator's for the given weights.
+        """
+
+        return np.einsum('ngf,g,f->n', features, scales, np.append(weights, BOARD_WIN_WEIGHT))
+
+
+    def get_loss(self, features: np.ndarray, results: np.ndarray, weights: dict) -> float:
+        """
+        Get the mean squared error of the predicted results.
+
+        Arguments:
+            features: The features of the positions.
+            results: The results for X of the games the positions were reached in.
+            weights: The value of every tuned constant.
+
+        Returns:
+            The error.
+        """
+
+        heuristics = self.predict(features, np.array([weights[name] for name in WEIGHTS]),
+                                  np.array([weights[name] for name in SCALES]))
+
+        return float(np.mean((1 / (1 + np.exp(-self.scaling * heuristics)) - results) ** 2))
+
+
+    def fit_scaling(self, features: np.ndarray, results: np.ndarray, weights: dict) -> float:
+        """
+        Find how steeply heuristics map to winning chances for the given weights.
+
+        Arguments:
+            features: The features of the positions.
+            results: The results for X of the games the positions were reached in.
+            weights: The value of every tuned constant.
+
+        Returns:
+            The sigmoid's scaling, which is then kept while tuning.
+        """
+
+        best_loss = float('inf')
+
+        for scaling in np.geomspace(1e-4, 1, 81):
+            self.scaling = scaling
+            loss = self.get_loss(features, results, weights)
+            if loss < best_loss:
+                best_scaling, best_loss = scaling, loss
+
+        self.scaling = float(best_scaling)
+        return self.scaling
+
+
+    def fit(self, features: np.ndarray, results: np.ndarray, weights: dict = None) -> dict:
+        """
+        Fit the weights with mini-batch gradient steps.
+
+        Arguments:
+            features: The features of the positions.
+            results: The results for X of the games the positions were reached in.
+            weights: The starting value of every tuned constant, defaults to the current ones.
+
+        Returns:
+            The tuned value of every constant.
+        """
+
+        weights = weights or get_initial_weights()
+        results = np.asarray(results, dtype = float)
+
+        if self.scaling is None:
+            self.fit_scaling(features, results, weights)
+
+        params = np.log(np.array([weights[name] for name in WEIGHTS + SCALES]))
+        moment, velocity = np.zeros_like(params), np.zeros_like(params)
+        beta1, beta2, step = 0.9, 0.999, 0
+
+        for _ in range(self.epochs):
+            order = self.rng.permutation(len(results))
+
+            for start in range(0, len(results), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                batch_features, batch_results = features[batch], results[batch]
+
+                values = np.exp(params)
+                formation_weights, scales = values[:len(WEIGHTS)], values[len(WEIGHTS):]
+
+                probabilities = 1 / (1 + np.exp(-self.scaling * self.predict(batch_features, formation_weights, scales)))
+                errors = 2 * (probabilities - batch_results) * probabilities * (1 - probabilities) * self.scaling
+                errors /= len(batch)
+
+                weights_gradient = np.einsum('n,ngf,g->f', errors, batch_features[:, :, :-1], scales)
+                scales_gradient = np.einsum('n,ngf,f->g', errors, batch_features,
+                                            np.append(formation_weights, BOARD_WIN_WEIGHT))
+
+                # Gradients on the log scale, followed by an Adam step.
+                gradient = np.concatenate((weights_gradient, scales_gradient)) * values
+                step += 1
+                moment = beta1 * moment + (1 - beta1) * gradient
+                velocity = beta2 * velocity + (1 - beta2) * gradient ** 2
+                params -= self.learning_rate * (moment / (1 - beta1 ** step)) / \
+                          (np.sqrt(velocity / (1 - beta2 ** step)) + 1e-12)
+
+        return dict(zip(WEIGHTS + SCALES, np.exp(params).round(4).tolist()))
+
+
+    @staticmethod
+    def format_constants(weights: dict) -> str:
+        """
+        Format the weights the way state_evaluator.py declares them.
+
+        Arguments:
+            weights: The value of every tuned constant.
+
+        Returns:
+            The constants, one assignment per line.
+        """
+
+        return '\n'.join(f'{name} = {round(value, 2) if name in WEIGHTS else round(value, 4)}'
+                         for name, value in weights.items())
+
+
+__all__ = ['FeatureExtractor', 'WeightTuner', 'generate_positions', 'get_initial_weights', 'play_self_play_game']
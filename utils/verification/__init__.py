@@ -0,0 +1,2 @@
+from .engine_backends import *
+from .differential_tester import *
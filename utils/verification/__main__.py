@@ -0,0 +1,34 @@
+import argparse
+import sys
+
+from utils.helpers import DEFAULT_EVALUATOR
+from .engine_backends import BACKENDS
+from .differential_tester import DifferentialTester
+
+
+parser = argparse.ArgumentParser(description = 'Play random games with alternative engine backends and check them '
+                                               'against the reference implementation after every move.')
+parser.add_argument('--games', type = int, default = 100000, help = 'number of random games')
+parser.add_argument('--backends', nargs = '+', default = None, choices = [name for name in BACKENDS if name != 'reference'],
+                    help = 'the backends to check, defaults to all of them')
+parser.add_argument('--evaluator', default = DEFAULT_EVALUATOR, help = 'the evaluator scoring the positions')
+parser.add_argument('--workers', type = int, default = None, help = 'number of worker processes')
+parser.add_argument('--seed', type = int, default = None, help = 'seed for the random moves')
+args = parser.parse_args()
+
+tester = DifferentialTester(
+    backends = args.backends,
+    evaluator = args.evaluator,
+    max_workers = args.workers,
+    seed = args.seed
+)
+stats = tester.run(args.games)
+divergence = stats.pop('divergence')
+print(f'[ DIFFERENTIAL ] : {stats}')
+
+if divergence:
+    print(f'[ DIVERGENCE ] : {divergence["backend"]} reports a different {divergence["observation"]} after the moves '
+          f'{divergence["moves"]}\n'
+          f'    expected: {divergence["expected"]}\n'
+          f'    actual:   {divergence["actual"]}')
+    sys.exit(1)
@@ -0,0 +1,311 @@
+import collections
+import os
+import random
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from utils.helpers import DEFAULT_EVALUATOR
+from .engine_backends import BACKENDS, EngineBackend
+
+
+def create_backends(names: tuple[str, ...], evaluator: str = DEFAULT_EVALUATOR) -> list[EngineBackend]:
+    """
+    Create the reference backend followed by the backends with the given names.
+
+    Arguments:
+        names: Names of the backends to check.
+        evaluator: Name of the evaluator scoring the positions.
+
+    Returns:
+        The backends, the reference first.
+
+    Raises:
+        ValueError: If a name doesn't match any backend.
+    """
+
+    for name in names:
+        if name not in BACKENDS:
+            raise ValueError(f'unknown backend {name!r}, choose one of {", ".join(BACKENDS)}')
+
+    return [BACKENDS['reference'](evaluator)] + [BACKENDS[name](evaluator) for name in names if name != 'reference']
+
+
+def compare(backends: list[EngineBackend], prev_small_idx: int | None, sign: str) -> tuple[dict, dict | None]:
+    """
+    Compare what every backend reports about the current position with the reference.
+
+    Arguments:
+        backends: The backends, the reference first.
+        prev_small_idx: The small index of the previous move made, None before the first move.
+        sign: The sign to move.
+
+    Returns:
+        The reference's observations and the first difference, or None if every backend agrees.
+    """
+
+    expected = backends[0].observe(prev_small_idx, sign)
+
+    for backend in backends[1:]:
+        try:
+            observations = backend.observe(prev_small_idx, sign)
+        except Exception as error:
+            return expected, {'backend': backend.name, 'observation': 'error', 'expected': None,
+                              'actual': f'{type(error).__name__}: {error}'}
+
+        for observation, actual in observations.items():
+            # Backends may disagree on the moves of a finished game, it has none.
+            if observation == 'legal_moves' and expected['winner']:
+                continue
+            if actual != expected[observation]:
+                return expected, {'backend': backend.name, 'observation': observation,
+                                  'expected': expected[observation], 'actual': actual}
+
+    return expected, None
+
+
+def play_move(backends: list[EngineBackend], move: tuple[int, int], sign: str) -> dict | None:
+    """
+    Make a move with every backend.
+
+    Arguments:
+        backends: The backends, the reference first.
+        move: The move in (big_idx, small_idx) format.
+        sign: Sign of the player making the move.
+
+    Returns:
+        The error of the first backend failing to make the move, or None.
+    """
+
+    backends[0].play(*move, sign)
+
+    for backend in backends[1:]:
+        try:
+            backend.play(*move, sign)
+        except Exception as error:
+            return {'backend': backend.name, 'observation': 'error', 'expected': None,
+                    'actual': f'{type(error).__name__}: {error}'}
+
+    return None
+
+
+def replay(backends: list[EngineBackend], moves: list[tuple[int, int]]) -> tuple[dict | None, bool]:
+    """
+    Play the given moves from the empty board, comparing the backends after each one.
+
+    Arguments:
+        backends: The backends, the reference first.
+        moves: The moves in (big_idx, small_idx) format, X moving first.
+
+    Returns:
+        The first divergence with the moves leading to it, or None, and whether the moves made up to it
+        are legal. Replaying stops at the first illegal move.
+    """
+
+    for backend in backends:
+        backend.reset()
+
+    prev_small_idx, sign = None, 'X'
+    expected, divergence = compare(backends, prev_small_idx, sign)
+
+    for ply, move in enumerate(moves):
+        if divergence:
+            return {**divergence, 'moves': list(moves[:ply])}, True
+        if expected['winner'] or tuple(move) not in expected['legal_moves']:
+            return None, False
+
+        divergence = play_move(backends, move, sign)
+        if divergence:
+            return {**divergence, 'moves': list(moves[:ply + 1])}, True
+
+        prev_small_idx, sign = move[1], 'O' if sign == 'X' else 'X'
+        expected, divergence = compare(backends, prev_small_idx, sign)
+
+    return ({**divergence, 'moves': list(moves)} if divergence else None), True
+
+
+def shrink(divergence: dict, evaluator: str = DEFAULT_EVALUATOR) -> dict:
+    """
+    Find a shorter legal game that diverges the same way. The game is first cut at the earliest move that
+    can be swapped for one diverging right away, then single moves are dropped for as long as it still does.
+
+    Arguments:
+        divergence: The divergence, with the moves leading to it.
+        evaluator: Name of the evaluator scoring the positions.
+
+    Returns:
+        The divergence with the fewest moves found. No single move can be dropped from them.
+    """
+
+    backends = create_backends((divergence['backend'],), evaluator)
+    moves = divergence['moves']
+
+    def diverges_the_same(found: dict | None) -> bool:
+        return found is not None and \
+            (found['backend'], found['observation']) == (divergence['backend'], divergence['observation'])
+
+    for idx in range(len(moves) - 1):
+        # The moves before idx never diverge, or the divergence would have been found earlier.
+        replay(backends, moves[:idx])
+        expected = backends[0].observe(moves[idx - 1][1] if idx else None, 'X' if idx % 2 == 0 else 'O')
+        alternatives = [] if expected['winner'] else expected['legal_moves']
+
+        found = next((found for found, legal in (replay(backends, moves[:idx] + [move]) for move in alternatives)
+                      if legal and diverges_the_same(found)), None)
+        if found:
+            divergence = {**divergence, **found}
+            moves = found['moves']
+            break
+
+    # Dropping a move can make an earlier one droppable, so passes are repeated until none is dropped.
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        idx = len(moves) - 1
+
+        while idx >= 0:
+            found, legal = replay(backends, moves[:idx] + moves[idx + 1:])
+
+            if legal and diverges_the_same(found):
+                divergence = {**divergence, **found}
+                moves = found['moves']
+                shrunk = True
+
+            idx = min(idx - 1, len(moves) - 1)
+
+    return divergence
+
+
+def check_games(names: tuple[str, ...], seeds: list[int], evaluator: str = DEFAULT_EVALUATOR) -> dict:
+    """
+    Play random games with the reference and the given backends, comparing them after every move.
+    Stops at the first divergence.
+
+    Arguments:
+        names: Names of the backends to check.
+        seeds: The seed for the random moves of every game.
+        evaluator: Name of the evaluator scoring the positions.
+
+    Returns:
+        The number of games and moves played and the shrunk first divergence, or None.
+    """
+
+    backends = create_backends(names, evaluator)
+    stats = {'games': 0, 'moves': 0, 'divergence': None}
+
+    for seed in seeds:
+        rng = random.Random(seed)
+        moves = []
+
+        for backend in backends:
+            backend.reset()
+
+        prev_small_idx, sign = None, 'X'
+        expected, divergence = compare(backends, prev_small_idx, sign)
+
+        while not divergence and not expected['winner']:
+            move = rng.choice(expected['legal_moves'])
+            moves.append(move)
+
+            divergence = play_move(backends, move, sign)
+            if divergence:
+                break
+
+            prev_small_idx, sign = move[1], 'O' if sign == 'X' else 'X'
+            expected, divergence = compare(backends, prev_small_idx, sign)
+
+        stats['games'] += 1
+        stats['moves'] += len(moves)
+
+        if divergence:
+            stats['divergence'] = shrink({**divergence, 'moves': moves, 'seed': seed}, evaluator)
+            break
+
+    return stats
+
+
+class DifferentialTester:
+    """
+    Class for checking engine backends against the reference implementation across a pool of worker processes.
+
+    Every worker plays random games with the reference and the backends at once and compares what they
+    report after every move. The first divergence stops the run, and is shrunk to a short legal game that
+    still diverges the same way, so it can be replayed with replay.
+    """
+
+    def __init__(self, backends: tuple[str, ...] = None, evaluator: str = DEFAULT_EVALUATOR, max_workers: int = None,
+                 chunk_size: int = 100, seed: int = None, executor: Executor = None):
+        """
+        Create an instance of the DifferentialTester class.
+
+        Arguments:
+            backends: Names of the backends to check, defaults to all of them.
+            evaluator: Name of the evaluator scoring the positions.
+            max_workers: Number of worker processes, defaults to the CPU count.
+            chunk_size: Number of games sent to a worker at once.
+            seed: The seed for the random moves.
+            executor: An executor to use instead of creating a process pool.
+
+        Raises:
+            ValueError: If a name doesn't match any backend or evaluator.
+        """
+
+        self.backends = tuple(backends or (name for name in BACKENDS if name != 'reference'))
+        create_backends(self.backends, evaluator)
+
+        self.evaluator = evaluator
+        self.workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.rng = random.Random(seed)
+        self.executor = executor
+        self.owns_executor = executor is None
+
+
+    def run(self, num_games: int) -> dict:
+        """
+        Play the given number of games, or until the first divergence.
+
+        Arguments:
+            num_games: Number of games.
+
+        Returns:
+            The number of games and moves played, the time taken, the games per second and the first
+            divergence, or None.
+        """
+
+        start_time = time.perf_counter()
+        executor = self.executor or ProcessPoolExecutor(max_workers = self.workers)
+        in_flight = collections.deque()
+        stats = {'games': 0, 'moves': 0, 'divergence': None}
+        next_game = 0
+
+        try:
+            while True:
+                while len(in_flight) < self.workers * 2 and next_game < num_games:
+                    seeds = [self.rng.getrandbits(64) for _ in range(min(self.chunk_size, num_games - next_game))]
+                    in_flight.append(executor.submit(check_games, self.backends, seeds, self.evaluator))
+                    next_game += len(seeds)
+
+                if not in_flight:
+                    break
+
+                result = in_flight.popleft().result()
+                stats['games'] += result['games']
+                stats['moves'] += result['moves']
+
+                if result['divergence']:
+                    stats['divergence'] = result['divergence']
+                    break
+
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if self.owns_executor:
+                executor.shutdown(cancel_futures = True)
+
+        stats['seconds'] = round(time.perf_counter() - start_time, 2)
+        stats['games_per_second'] = round(stats['games'] / stats['seconds'], 1) if stats['seconds'] else None
+        return stats
+
+
+__all__ = ['DifferentialTester', 'create_backends', 'check_games', 'replay', 'shrink']
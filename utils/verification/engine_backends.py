@@ -0,0 +1,249 @@
+from abc import ABC, abstractmethod
+from typing import Callable
+
+import numpy as np
+
+from utils.players import RandomPlayer
+from utils.helpers import StateChecker, StateUpdater, MoveGenerator, MOVES, BoardTable, PositionCodec, \
+    EngineContext, EvaluatorRegistry, DEFAULT_EVALUATOR, OPEN, X_WON, O_WON, STATUS_SIGNS
+from utils.simulator.playout_engine import PlayoutBatch
+
+
+StateChecker = StateChecker()
+
+EMPTY_STATE = tuple(
+    {'X': (), 'O': (), 'display': ('/', '-', '-', '-', '-', '-', '-', '-', '-', '-')} for _ in range(10)
+)
+BIG_SIGNS = ('-', 'X', 'O', 'T')
+POWERS = tuple(3 ** cell for cell in range(9))
+
+# What backends report about a position, every one optional except for the reference backend:
+#   - boards | The displays of the big board and the nine small boards.
+#   - winner | The result of StateChecker.check_win on the big board.
+#   - next_board | The board the next move is sent to, 0 for a free move.
+#   - legal_moves | The sorted legal moves in (big_idx, small_idx) format, only compared while the game is going.
+#   - heuristic | The evaluator's score for the sign to move.
+OBSERVATIONS = ('boards', 'winner', 'next_board', 'legal_moves', 'heuristic')
+
+BACKENDS = {}
+
+
+def register_backend(name: str) -> Callable[[type], type]:
+    """
+    Register a backend class under the given name.
+
+    Arguments:
+        name: The name to select the backend with.
+
+    Returns:
+        A class decorator that registers the class and returns it unchanged.
+    """
+
+    def register(backend_class: type) -> type:
+        backend_class.name = name
+        BACKENDS[name] = backend_class
+        return backend_class
+
+    return register
+
+
+def get_boards(state: tuple[dict, ...]) -> tuple[tuple[str, ...], ...]:
+    """
+    Get the displays of every board of a state.
+
+    Arguments:
+        state: The game state.
+
+    Returns:
+        The displays, the big board first.
+    """
+
+    return tuple(board['display'] for board in state)
+
+
+class EngineBackend(ABC):
+    """
+    Abstract class representing a way of playing games, checked against the reference implementation.
+
+    A backend holds a single game, which it updates in place with every move made.
+    """
+
+    name = None
+
+
+    def __init__(self, evaluator: str = DEFAULT_EVALUATOR):
+        """
+        Create an instance of the backend.
+
+        Arguments:
+            evaluator: Name of the evaluator scoring the positions, for backends reporting scores.
+        """
+
+        self.evaluator = EvaluatorRegistry.get_evaluator(evaluator)
+        self.reset()
+
+
+    @abstractmethod
+    def reset(self):
+        """ Start a new game from the empty board. """
+
+
+    @abstractmethod
+    def play(self, big_idx: int, small_idx: int, sign: str):
+        """
+        Make a move.
+
+        Arguments:
+            big_idx: Board index.
+            small_idx: Position index.
+            sign: Sign of the player making the move.
+        """
+
+
+    @abstractmethod
+    def observe(self, prev_small_idx: int | None, sign: str) -> dict:
+        """
+        Report on the current position.
+
+        Arguments:
+            prev_small_idx: The small index of the previous move made, None before the first move.
+            sign: The sign to move.
+
+        Returns:
+            Some of the OBSERVATIONS, by name.
+        """
+
+
+@register_backend('reference')
+class ReferenceBackend(EngineBackend):
+    """ The state tuples, updated with StateUpdater and checked with StateChecker and a player's legal moves. """
+
+    def reset(self):
+        self.state = EMPTY_STATE
+        self.context = EngineContext()
+        self.player = RandomPlayer()
+        self.context.bind_players(self.player)
+
+
+    def play(self, big_idx: int, small_idx: int, sign: str):
+        self.state, board_is_complete = StateUpdater.update_state(self.state, big_idx, small_idx, sign)
+        self.context.update_legal_moves(big_idx, small_idx, board_is_complete = board_is_complete)
+
+
+    def observe(self, prev_small_idx: int | None, sign: str) -> dict:
+        return {
+            'boards': get_boards(self.state),
+            'winner': StateChecker.check_win(self.state, big_idx = 0),
+            'next_board': PositionCodec.get_next_board(self.state, prev_small_idx),
+            'legal_moves': sorted(self.player.get_legal_moves_for_state(self.state, prev_small_idx)),
+            'heuristic': self.evaluator.heuristic(self.state, prev_small_idx, sign),
+        }
+
+
+@register_backend('move_generator')
+class MoveGeneratorBackend(ReferenceBackend):
+    """ Legal moves generated from the occupancy masks of MoveGenerator. """
+
+    def observe(self, prev_small_idx: int | None, sign: str) -> dict:
+        return {'legal_moves': sorted(MOVES[move] for move in MoveGenerator.get_legal_moves(self.state, prev_small_idx))}
+
+
+@register_backend('board_table')
+class BoardTableBackend(EngineBackend):
+    """ Boards as BoardTable codes, moved with its transition table and checked with its statuses. """
+
+    def reset(self):
+        self.table = BoardTable.get_default()
+        self.codes = [0] * 9
+        self.statuses = [OPEN] * 9
+        self.next_board = 0
+
+
+    def play(self, big_idx: int, small_idx: int, sign: str):
+        self.codes[big_idx - 1], self.statuses[big_idx - 1] = self.table.apply_move(self.codes[big_idx - 1],
+                                                                                     small_idx, sign)
+        self.next_board = small_idx if self.statuses[small_idx - 1] == OPEN else 0
+
+
+    def get_winner(self) -> str | bool:
+        """
+        Check the big board through the status of the boards won by each sign.
+
+        Returns:
+            The winning sign, "T" for a tie or False if the game is going.
+        """
+
+        for status, digit in ((X_WON, 1), (O_WON, 2)):
+            code = sum(digit * POWERS[cell] for cell in range(9) if self.statuses[cell] == status)
+            if self.table.statuses[code] == status:
+                return STATUS_SIGNS[status]
+
+        return 'T' if OPEN not in self.statuses else False
+
+
+    def observe(self, prev_small_idx: int | None, sign: str) -> dict:
+        boards = [self.next_board] if self.next_board else [big_idx for big_idx in range(1, 10)
+                                                           if self.statuses[big_idx - 1] == OPEN]
+
+        return {
+            'boards': (('/', *(BIG_SIGNS[status] for status in self.statuses)),
+                       *(BoardTable.decode(code) for code in self.codes)),
+            'winner': self.get_winner(),
+            'next_board': self.next_board,
+            'legal_moves': [(big_idx, small_idx) for big_idx in boards for small_idx in range(1, 10)
+                            if self.table.empty_masks[self.codes[big_idx - 1]] >> (small_idx - 1) & 1],
+        }
+
+
+@register_backend('position_codec')
+class PositionCodecBackend(EngineBackend):
+    """ Positions kept as PositionCodec bytes, and read back through its text and bitboard forms. """
+
+    def reset(self):
+        self.data = PositionCodec.to_bytes(EMPTY_STATE, None, 'X')
+
+
+    def play(self, big_idx: int, small_idx: int, sign: str):
+        state, _, _ = PositionCodec.from_bytes(self.data)
+        state, _ = StateUpdater.update_state(state, big_idx, small_idx, sign)
+        self.data = PositionCodec.to_bytes(state, small_idx, 'O' if sign == 'X' else 'X')
+
+
+    def observe(self, prev_small_idx: int | None, sign: str) -> dict:
+        position = PositionCodec.parse(PositionCodec.format(*PositionCodec.from_bytes(self.data)))
+        state, next_small_idx, _ = PositionCodec.from_bitboard(*PositionCodec.to_bitboard(*position))
+
+        return {
+            'boards': get_boards(state),
+            'winner': StateChecker.check_win(state, big_idx = 0),
+            'next_board': next_small_idx or 0,
+            'heuristic': self.evaluator.heuristic(state, next_small_idx, sign),
+        }
+
+
+@register_backend('playout_batch')
+class PlayoutBatchBackend(EngineBackend):
+    """ A game held in the NumPy arrays of a PlayoutBatch. """
+
+    def reset(self):
+        self.batch = PlayoutBatch.empty(1)
+
+
+    def play(self, big_idx: int, small_idx: int, sign: str):
+        self.batch.apply_moves(np.zeros(1, dtype = np.intp), np.array([MoveGenerator.encode_move(big_idx, small_idx)]))
+
+
+    def observe(self, prev_small_idx: int | None, sign: str) -> dict:
+        cells, macro = self.batch.cells[0].tolist(), self.batch.macro[0].tolist()
+
+        return {
+            'boards': (('/', *(BIG_SIGNS[status] for status in macro)),
+                       *(('/', *(BIG_SIGNS[cell] for cell in cells[board * 9:board * 9 + 9])) for board in range(9))),
+            'winner': BIG_SIGNS[self.batch.winners[0]] if self.batch.winners[0] else False,
+            'next_board': int(self.batch.targets[0]) + 1,
+            'legal_moves': [MOVES[move] for move in np.flatnonzero(self.batch.get_legal_masks()[0])],
+        }
+
+
+__all__ = ['EngineBackend', 'BACKENDS', 'OBSERVATIONS', 'register_backend', 'ReferenceBackend', 'MoveGeneratorBackend',
+           'BoardTableBackend', 'PositionCodecBackend', 'PlayoutBatchBackend']